@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of `SimpleClient.create_email_campaigns` with N campaigns against local mock server
+
+Usage: python -m benchmarks.bench_campaigns [--size 10 --size 50] [--latency 0.05] [--json]
+"""
+from benchmarks.common import LatencyRecorder, measure, parse_args, report
+from benchmarks.mock_server import MockUniSenderServer
+from unisender import SimpleClient
+
+DEFAULT_SIZES = [1, 10, 50]
+RECIPIENTS = 1000
+
+
+def run(size: int, latency: float = 0.0, error_rate: float = 0.0, rate_limit=None) -> dict:
+    recipients = [{'email': f'contact_{i}@example.com', 'name': f'Contact {i}'} for i in range(RECIPIENTS)]
+    campaigns = [{'email_data': {'subject': f'Subject {i}', 'body': f'<html>{i}</html>'}} for i in range(size)]
+    with MockUniSenderServer(latency=latency, error_rate=error_rate, rate_limit=rate_limit, seed=1) as server:
+        recorder = LatencyRecorder()
+        client = SimpleClient('api_key', 'benchmark', base_url=server.url, instrumentation=recorder,
+                              retry_backoff=0.01)
+        result = measure(
+            'create_email_campaigns', size, 'campaigns',
+            lambda: client.create_email_campaigns(
+                campaigns, recipients,
+                default_email_data={'sender_name': 'Benchmark', 'sender_email': 'benchmark@example.com'}
+            ),
+            recorder.durations
+        )
+        client.close()
+        assert server.campaigns == size, f'created {server.campaigns} of {size} campaigns'
+    return result
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES)
+    report((run(size, args.latency, args.error_rate, args.rate_limit) for size in args.size), args.json)
+
+
+if __name__ == '__main__':
+    main()
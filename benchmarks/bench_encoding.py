@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark of request body encoding
+
+Compares the previous recursive `_build_request_data` + `requests` urlencoding
+with `Client._encode_request_data` for `importContacts` matrix of ROWS x COLUMNS
+given by row lists and by `FormMatrix` columns, then body compression with gzip levels 1 and 6.
+
+Usage: python -m benchmarks.bench_encoding [rows] [columns]
+"""
+import sys
+import timeit
+from requests.models import RequestEncodingMixin
+from unisender import Client
+from unisender.encoding import FormMatrix, compress_body
+
+
+def build_request_data_recursive(client: Client, data: dict, extra_key=None) -> dict:
+
+    """ Previous recursive implementation of `Client._build_request_data` """
+
+    result = client._get_default_request_data()
+    for key, val in data.items():
+        _key = f'{extra_key}[{key}]' if isinstance(extra_key, str) else key
+        if isinstance(val, dict):
+            result.update(build_request_data_recursive(client, val, _key))
+        elif isinstance(val, list):
+            result.update(build_request_data_recursive(client, dict(enumerate(val)), _key))
+        elif val is not None:
+            result[_key] = val
+    return result
+
+
+def make_import_data(rows: int, columns: int) -> dict:
+    return {
+        'field_names': [f'field_{j}' for j in range(columns)],
+        'data': [[f'value {i}/{j}@example.com' for j in range(columns)] for i in range(rows)],
+        'overwrite_lists': 1,
+    }
+
+
+def main(rows: int = 500, columns: int = 20, number: int = 20) -> None:
+    client = Client('api_key', 'benchmark')
+    data = make_import_data(rows, columns)
+
+    def before():
+        return RequestEncodingMixin._encode_params(build_request_data_recursive(client, data)).encode()
+
+    def after():
+        return client._encode_request_data(data)
+
+    columns_data = dict(data, data=FormMatrix([list(column) for column in zip(*data['data'])]))
+
+    def columnar():
+        return client._encode_request_data(columns_data)
+
+    assert before() == after() == columnar(), 'encoded bodies differ'
+    before_time = min(timeit.repeat(before, number=number, repeat=3)) / number
+    after_time = min(timeit.repeat(after, number=number, repeat=3)) / number
+    columnar_time = min(timeit.repeat(columnar, number=number, repeat=3)) / number
+    print(f'importContacts body {rows}x{columns}, {len(after())} bytes')
+    print(f'  recursive dict + requests urlencode: {before_time * 1000:8.2f} ms')
+    print(f'  encode_request_data:                 {after_time * 1000:8.2f} ms')
+    print(f'  encode_request_data, FormMatrix:     {columnar_time * 1000:8.2f} ms')
+    print(f'  speedup: x{before_time / after_time:.1f}, FormMatrix x{before_time / columnar_time:.1f}')
+    body = after()
+    for level in (1, 6):
+        compressed = compress_body(body, 'gzip', level)
+        compress_time = min(timeit.repeat(lambda: compress_body(body, 'gzip', level), number=number, repeat=3)) / number
+        print(f'  gzip level {level}: {len(compressed)} bytes (x{len(body) / len(compressed):.1f} smaller), '
+              f'{compress_time * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of `SimpleClient.iter_export_contacts` against local mock server
+
+Usage: python -m benchmarks.bench_export [--size 10000 --size 100000] [--latency 0.05] [--json]
+"""
+from benchmarks.common import LatencyRecorder, measure, parse_args, report
+from benchmarks.mock_server import MockUniSenderServer
+from unisender import SimpleClient
+
+DEFAULT_SIZES = [10000, 100000]
+
+
+def run(size: int, latency: float = 0.0, error_rate: float = 0.0, rate_limit=None) -> dict:
+    with MockUniSenderServer(latency=latency, error_rate=error_rate, rate_limit=rate_limit,
+                             export_size=size, seed=1) as server:
+        recorder = LatencyRecorder()
+        client = SimpleClient('api_key', 'benchmark', base_url=server.url, instrumentation=recorder,
+                              retry_backoff=0.01)
+        exported = []
+
+        def func():
+            exported.append(sum(1 for _ in client.iter_export_contacts(['email', 'name'], list_id=1)))
+
+        result = measure('export_contacts', size, 'contacts', func, recorder.durations)
+        client.close()
+        assert exported == [size], f'exported {exported} of {size}'
+    return result
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES)
+    report((run(size, args.latency, args.error_rate, args.rate_limit) for size in args.size), args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of `utils.get_unique_hash`, `utils.get_fingerprint` and `utils.get_chunked_fingerprint`
+for recipient lists
+
+Usage: python -m benchmarks.bench_hash [--size 1000 --size 100000] [--json]
+"""
+import time
+from benchmarks.common import measure, parse_args, report
+from unisender.utils import get_chunked_fingerprint, get_fingerprint, get_unique_hash
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+REPEAT = 5
+
+
+def run(name: str, size: int, func) -> dict:
+    recipients = [{'email': f'contact_{i}@example.com', 'name': f'Contact {i}'} for i in range(size)]
+    latencies = []
+
+    def repeat():
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            func(recipients)
+            latencies.append(time.perf_counter() - started)
+
+    result = measure(name, size * REPEAT, 'recipients', repeat, latencies)
+    result['size'] = size
+    return result
+
+
+def iter_results(sizes):
+    for size in sizes:
+        yield run('get_unique_hash', size, get_unique_hash)
+        yield run('get_fingerprint', size, get_fingerprint)
+        yield run('get_chunked_fingerprint', size, get_chunked_fingerprint)
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES, server=False)
+    report(iter_results(args.size), args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of `SimpleClient.import_contacts_stream` against local mock server
+
+Usage: python -m benchmarks.bench_import [--size 1000 --size 100000] [--latency 0.05] [--json]
+"""
+from benchmarks.common import LatencyRecorder, measure, parse_args, report
+from benchmarks.mock_server import MockUniSenderServer
+from unisender import SimpleClient
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+
+def generate_contacts(size: int):
+    for i in range(size):
+        yield {'email': f'contact_{i}@example.com', 'name': f'Contact {i}', 'city': 'Kazan'}
+
+
+def run(size: int, latency: float = 0.0, error_rate: float = 0.0, rate_limit=None) -> dict:
+    with MockUniSenderServer(latency=latency, error_rate=error_rate, rate_limit=rate_limit, seed=1) as server:
+        recorder = LatencyRecorder()
+        client = SimpleClient('api_key', 'benchmark', base_url=server.url, instrumentation=recorder,
+                              retry_backoff=0.01)
+        result = measure(
+            'import_contacts', size, 'contacts',
+            lambda: client.import_contacts_stream(generate_contacts(size), email_list_ids=[1]),
+            recorder.durations
+        )
+        client.close()
+        assert server.imported == size, f'imported {server.imported} of {size}'
+    return result
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES)
+    report((run(size, args.latency, args.error_rate, args.rate_limit) for size in args.size), args.json)
+
+
+if __name__ == '__main__':
+    main()
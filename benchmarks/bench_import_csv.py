@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of `SimpleClient.import_contacts_csv` against local mock server
+
+Usage: python -m benchmarks.bench_import_csv [--size 1000 --size 100000] [--latency 0.05] [--json]
+"""
+import os
+import tempfile
+from benchmarks.common import LatencyRecorder, measure, parse_args, report
+from benchmarks.mock_server import MockUniSenderServer
+from unisender import SimpleClient
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+
+def write_contacts(path: str, size: int) -> None:
+    with open(path, 'w') as fh:
+        fh.write('email,name,city\n')
+        for i in range(size):
+            fh.write(f'contact_{i}@example.com,Contact {i},Kazan\n')
+
+
+def run(size: int, latency: float = 0.0, error_rate: float = 0.0, rate_limit=None) -> dict:
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        write_contacts(path, size)
+        with MockUniSenderServer(latency=latency, error_rate=error_rate, rate_limit=rate_limit, seed=1) as server:
+            recorder = LatencyRecorder()
+            client = SimpleClient('api_key', 'benchmark', base_url=server.url, instrumentation=recorder,
+                                  retry_backoff=0.01)
+            result = measure(
+                'import_contacts_csv', size, 'contacts',
+                lambda: client.import_contacts_csv(path, email_list_ids=[1]),
+                recorder.durations
+            )
+            client.close()
+            assert server.imported == size, f'imported {server.imported} of {size}'
+    finally:
+        os.remove(path)
+    return result
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES)
+    report((run(size, args.latency, args.error_rate, args.rate_limit) for size in args.size), args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of N `create_email_message` calls with the same large HTML body, with and without `MessageCache`
+
+Usage: python -m benchmarks.bench_messages [--size 100] [--latency 0.05] [--json]
+"""
+from benchmarks.common import LatencyRecorder, measure, parse_args, report
+from benchmarks.mock_server import MockUniSenderServer
+from unisender import MessageCache, SimpleClient
+
+DEFAULT_SIZES = [10, 100]
+BODY_SIZE = 300 * 1024
+
+
+def run(size: int, latency: float = 0.0, error_rate: float = 0.0, rate_limit=None) -> list:
+    body = '<html><body>' + '<p>Lorem ipsum dolor sit amet</p>' * (BODY_SIZE // 32) + '</body></html>'
+    email_data = {'sender_name': 'Benchmark', 'sender_email': 'benchmark@example.com', 'subject': 'News', 'body': body}
+    results = []
+    with MockUniSenderServer(latency=latency, error_rate=error_rate, rate_limit=rate_limit, seed=1) as server:
+        for name, message_cache in (('create_message', None), ('create_message_cached', MessageCache())):
+            recorder = LatencyRecorder()
+            client = SimpleClient('api_key', 'benchmark', base_url=server.url, instrumentation=recorder,
+                                  retry_backoff=0.01, message_cache=message_cache)
+
+            def create():
+                for list_id in range(size):
+                    client.create_email_message(list_id=list_id, **email_data)
+
+            results.append(measure(name, size, 'messages', create, recorder.durations))
+            client.close()
+        assert error_rate or server.templates == 1, f'created {server.templates} templates'
+    return results
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES)
+    report((result for size in args.size for result in run(size, args.latency, args.error_rate, args.rate_limit)),
+           args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of single contact subscriptions: direct `subscribe` calls vs `ContactOutbox` against local mock server
+
+Usage: python -m benchmarks.bench_outbox [--size 1000] [--latency 0.05] [--json]
+
+Latency of outbox cases is the time a caller waits for `subscribe`, total time includes the final flush.
+"""
+import time
+from benchmarks.common import measure, parse_args, report
+from benchmarks.mock_server import MockUniSenderServer
+from unisender import Client, ContactOutbox, SQLiteOutboxSpool
+
+DEFAULT_SIZES = [1000, 10000]
+DIRECT_MAX_SIZE = 1000
+
+
+def subscribe_direct(client, size: int, latencies: list) -> None:
+    for i in range(size):
+        started = time.perf_counter()
+        client.subscribe(list_ids=1, fields={'email': f'contact_{i}@example.com', 'Name': f'Name {i}'}, double_optin=3)
+        latencies.append(time.perf_counter() - started)
+
+
+def subscribe_outbox(outbox, size: int, latencies: list) -> None:
+    for i in range(size):
+        started = time.perf_counter()
+        outbox.subscribe(f'contact_{i}@example.com', 1, {'Name': f'Name {i}'})
+        latencies.append(time.perf_counter() - started)
+    outbox.close()
+
+
+def run(size: int, latency: float = 0.0, error_rate: float = 0.0, rate_limit=None) -> list:
+    results = []
+    with MockUniSenderServer(latency=latency, error_rate=error_rate, rate_limit=rate_limit, seed=1) as server:
+        client = Client('api_key', 'benchmark', base_url=server.url, retry_backoff=0.01)
+        if size <= DIRECT_MAX_SIZE:
+            latencies = []
+            results.append(measure('subscribe_direct', size, 'contacts',
+                                   lambda: subscribe_direct(client, size, latencies), latencies))
+        for name, spool in (('subscribe_outbox', None), ('subscribe_outbox_spool', SQLiteOutboxSpool(':memory:'))):
+            server.imported = 0
+            latencies = []
+            outbox = ContactOutbox(client, flush_interval=0.5, spool=spool)
+            results.append(measure(name, size, 'contacts',
+                                   lambda: subscribe_outbox(outbox, size, latencies), latencies))
+            assert error_rate or server.imported == size, f'{server.imported} of {size} contacts imported'
+        client.close()
+    return results
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES)
+    report((result for size in args.size for result in run(size, args.latency, args.error_rate, args.rate_limit)),
+           args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of API response decoding
+
+Decodes N `getLists` responses of LISTS lists the way `SimpleClient` reads them:
+error check in `after_request`, then `result` access. Compares repeated `response.json()`
+with memoised `unisender.response` helpers (orjson is used if installed).
+"error_word" cases contain a list titled "error", so the error check has to decode the body.
+
+Usage: python -m benchmarks.bench_response [--size 1000] [--json]
+"""
+import json
+import time
+import requests
+from benchmarks.common import measure, parse_args, report
+from unisender.response import get_error, get_result, orjson
+
+DEFAULT_SIZES = [1000]
+LISTS = 1000
+
+
+def make_content(error: bool) -> bytes:
+    lists = [{'id': i, 'title': f'mailing_list_{i}'} for i in range(LISTS)]
+    if error:
+        lists[-1]['title'] = 'error'
+    return json.dumps({'result': lists}).encode('utf-8')
+
+
+def make_response(content: bytes):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.encoding = 'utf-8'
+    return response
+
+
+def decode_json(response):
+    if b'"error"' in response.content and response.json().get('error') is not None:
+        raise Exception('API error')
+    return response.json()['result']
+
+
+def decode_memoised(response):
+    if get_error(response) is not None:
+        raise Exception('API error')
+    return get_result(response)
+
+
+def run_case(name: str, decode, size: int, error: bool) -> dict:
+    content = make_content(error)
+    latencies = []
+
+    def func():
+        for _ in range(size):
+            response = make_response(content)
+            started = time.perf_counter()
+            decode(response)
+            latencies.append(time.perf_counter() - started)
+
+    return measure(name, size, 'responses', func, latencies)
+
+
+def run(size: int):
+    suffix = '_orjson' if orjson is not None else ''
+    for error in (False, True):
+        label = '_error_word' if error else ''
+        yield run_case(f'response_json{label}', decode_json, size, error)
+        yield run_case(f'get_result{suffix}{label}', decode_memoised, size, error)
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES, server=False)
+    report((result for size in args.size for result in run(size)), args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of `BulkSender.send_email` with N transactional emails against local mock server
+
+Usage: python -m benchmarks.bench_send [--size 1000] [--latency 0.05] [--json]
+"""
+from benchmarks.common import LatencyRecorder, measure, parse_args, report
+from benchmarks.mock_server import MockUniSenderServer
+from unisender import BulkSender, Client
+
+DEFAULT_SIZES = [100, 1000]
+WORKERS = 16
+
+
+def run(size: int, latency: float = 0.0, error_rate: float = 0.0, rate_limit=None) -> dict:
+    jobs = [(f'contact_{i}@example.com', {'subject': f'Order {i}', 'body': f'<html>{i}</html>'}) for i in range(size)]
+    with MockUniSenderServer(latency=latency, error_rate=error_rate, rate_limit=rate_limit, seed=1) as server:
+        recorder = LatencyRecorder()
+        client = Client('api_key', 'benchmark', base_url=server.url, instrumentation=recorder,
+                        retry_backoff=0.01, pool_maxsize=WORKERS)
+        sender = BulkSender(client, workers=WORKERS, default_params={
+            'sender_name': 'Benchmark', 'sender_email': 'benchmark@example.com', 'list_id': 1,
+        })
+        results = []
+        result = measure('send_email', size, 'emails', lambda: results.extend(sender.send_email(jobs)),
+                         recorder.durations)
+        client.close()
+        failed = sum(not item.ok for item in results)
+        assert error_rate or not failed, f'{failed} of {size} emails failed'
+    return result
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES)
+    report((run(size, args.latency, args.error_rate, args.rate_limit) for size in args.size), args.json)
+
+
+if __name__ == '__main__':
+    main()
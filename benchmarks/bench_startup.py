@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of package import, client construction and API method dispatch
+
+Import time is measured in fresh interpreters, one per run.
+
+Usage: python -m benchmarks.bench_startup [--size 10000] [--json]
+"""
+import subprocess
+import sys
+import time
+from benchmarks.common import measure, parse_args, report
+
+DEFAULT_SIZES = [10000]
+IMPORT_RUNS = 10
+IMPORT_CODE = (
+    'import time; started = time.perf_counter(); '
+    'from unisender import SimpleClient; SimpleClient("api_key", "benchmark"); '
+    'print(time.perf_counter() - started)'
+)
+
+
+def run_import() -> dict:
+    latencies = []
+
+    def func():
+        for _ in range(IMPORT_RUNS):
+            output = subprocess.run([sys.executable, '-c', IMPORT_CODE], check=True, stdout=subprocess.PIPE)
+            latencies.append(float(output.stdout))
+
+    result = measure('import_unisender', IMPORT_RUNS, 'imports', func, latencies)
+    result['seconds'] = round(sum(latencies), 4)
+    result['throughput'] = round(IMPORT_RUNS / sum(latencies), 1)
+    return result
+
+
+def run_construct(name: str, cls, size: int) -> dict:
+    latencies = []
+
+    def func():
+        for i in range(size):
+            started = time.perf_counter()
+            cls(f'api_key_{i}', 'benchmark')
+            latencies.append(time.perf_counter() - started)
+
+    return measure(name, size, 'clients', func, latencies)
+
+
+def run_dispatch(size: int) -> dict:
+    from unisender import Client
+    client = Client('api_key', 'benchmark')
+    latencies = []
+
+    def func():
+        for _ in range(size):
+            started = time.perf_counter()
+            client.get_lists
+            client._get_request_url('get_campaign_status')
+            latencies.append(time.perf_counter() - started)
+
+    return measure('api_method_dispatch', size, 'lookups', func, latencies)
+
+
+def iter_results(sizes):
+    yield run_import()
+    from unisender import Client, SimpleClient
+    for size in sizes:
+        yield run_construct('construct_client', Client, size)
+        yield run_construct('construct_simple_client', SimpleClient, size)
+        yield run_dispatch(size)
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES, server=False)
+    report(iter_results(args.size), args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of offline transports: API calls and `create_email_campaign` over `DryRunTransport`,
+replay of recorded `create_email_campaign` by `ReplayTransport`
+
+Usage: python -m benchmarks.bench_transport [--size 10000] [--json]
+"""
+import os
+import tempfile
+import time
+from benchmarks.common import LatencyRecorder, measure, parse_args, report
+from unisender import Client, DryRunTransport, RecordingTransport, ReplayTransport, SimpleClient
+
+DEFAULT_SIZES = [10000, 100000]
+EMAIL_DATA = {'sender_name': 'Benchmark', 'sender_email': 'benchmark@example.com', 'subject': 'News', 'body': '<html/>'}
+
+
+def run_calls(size: int) -> dict:
+    client = Client('api_key', 'benchmark', session=DryRunTransport())
+    latencies = []
+
+    def func():
+        for i in range(size):
+            started = time.perf_counter()
+            client.get_campaign_status(campaign_id=i)
+            latencies.append(time.perf_counter() - started)
+
+    return measure('dry_run_calls', size, 'calls', func, latencies)
+
+
+def run_campaign(name: str, session, recipients: list) -> dict:
+    recorder = LatencyRecorder()
+    client = SimpleClient('api_key', 'benchmark', session=session, instrumentation=recorder)
+    return measure(name, len(recipients), 'contacts',
+                   lambda: client.create_email_campaign(recipients, dict(EMAIL_DATA)), recorder.durations)
+
+
+def run(size: int) -> list:
+    recipients = [{'email': f'contact_{i}@example.com', 'name': f'Contact {i}'} for i in range(size)]
+    results = [run_calls(size), run_campaign('dry_run_campaign', DryRunTransport(), recipients)]
+    path = os.path.join(tempfile.mkdtemp(), 'campaign.jsonl.gz')
+    with RecordingTransport(path, DryRunTransport()) as transport:
+        SimpleClient('api_key', 'benchmark', session=transport).create_email_campaign(recipients, dict(EMAIL_DATA))
+    results.append(run_campaign('replay_campaign', ReplayTransport(path, latency_scale=0), recipients))
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+    return results
+
+
+def main():
+    args = parse_args(__doc__, DEFAULT_SIZES, server=False)
+    report((result for size in args.size for result in run(size)), args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import resource
+import sys
+import time
+from unisender.instrumentation import Instrumentation
+
+
+def peak_rss_mb() -> float:
+
+    """ Return peak resident set size of current process in MB """
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+
+def percentile(values: list, q: float):
+
+    """ Return q-th percentile (0..100) of values, nearest-rank method """
+
+    if not values:
+        return None
+    values = sorted(values)
+    index = max(0, min(len(values) - 1, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+class LatencyRecorder(Instrumentation):
+
+    """ Instrumentation collecting duration of every API call """
+
+    def __init__(self):
+        super().__init__()
+        self.durations = []
+        self.on_after(lambda event: self.durations.append(event.duration))
+
+
+def measure(name: str, size: int, unit: str, func, latencies=None) -> dict:
+
+    """
+    Run benchmark case once
+
+    :param name: str, benchmark name
+    :param size: int, number of processed items
+    :param unit: str, item name for throughput
+    :param func: callable without params
+    :param latencies: None|list, seconds of individual operations, filled by func
+    :return: dict, benchmark result
+    """
+
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    latencies = latencies or []
+    p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+    return {
+        'name': name,
+        'size': size,
+        'seconds': round(elapsed, 4),
+        'throughput': round(size / elapsed, 1) if elapsed else None,
+        'unit': f'{unit}/s',
+        'operations': len(latencies),
+        'p50_ms': round(p50 * 1000, 3) if p50 is not None else None,
+        'p99_ms': round(p99 * 1000, 3) if p99 is not None else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def format_result(result: dict) -> str:
+    return (
+        f"{result['name']:<24} size={result['size']:<9} {result['seconds']:>9.3f} s  "
+        f"{result['throughput'] or 0:>12.1f} {result['unit']:<14} "
+        f"p50={result['p50_ms']} ms  p99={result['p99_ms']} ms  peak_rss={result['peak_rss_mb']} MB"
+    )
+
+
+def parse_args(description: str, default_sizes: list, server: bool = True):
+
+    """ Parse common benchmark command line arguments """
+
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--size', type=int, action='append', help=f'number of items, default: {default_sizes}')
+    parser.add_argument('--json', action='store_true', help='print results as JSON lines')
+    if server:
+        parser.add_argument('--latency', type=float, default=0.0, help='mock server latency, seconds')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='mock server HTTP 503 share')
+        parser.add_argument('--rate-limit', type=float, default=None, help='mock server requests per minute')
+    args = parser.parse_args()
+    args.size = args.size or default_sizes
+    return args
+
+
+def report(results, as_json: bool = False) -> None:
+    for result in results:
+        print(json.dumps(result) if as_json else format_result(result), flush=True)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for UniSender API server
+
+Implements getLists, getFields, createList, createField, importContacts, subscribe, createEmailMessage,
+createEmailTemplate, createCampaign, exportContacts, sendEmail and sendSms with configurable latency,
+error rate and rate limit.
+
+Usage: python -m benchmarks.mock_server [--port 8080] [--latency 0.05] [--error-rate 0.01] [--rate-limit 1200]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+
+class _HTTPServer(ThreadingHTTPServer):
+
+    """ Threading server with listen backlog big enough for bursts of new client connections """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class MockUniSenderServer(object):
+
+    """
+    In-process HTTP server emulating UniSender API responses
+
+    .. note::
+        Usage example:
+            with MockUniSenderServer(latency=0.02) as server:
+                client = SimpleClient('api_key', 'benchmark', base_url=server.url)
+    """
+
+    IMPORT_MAX_ROWS = 500
+    EXPORT_MAX_ROWS = 5000
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                 rate_limit=None, export_size: int = 10000, seed=None, compression: bool = True):
+
+        """
+        :param host: str, listen address
+        :param port: int, listen port, 0 for any free port
+        :param latency: float, seconds added to every response
+        :param error_rate: float, share of requests answered with HTTP 503
+        :param rate_limit: None|float, max requests per minute, exceeding requests get API limit error
+        :param export_size: int, number of contacts returned by exportContacts
+        :param seed: None|int, random seed for error injection
+        :param compression: bool, accept gzip/deflate request bodies, else answer them with HTTP 415
+        """
+
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.export_size = export_size
+        self.compression = compression
+        self.compressed = 0
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.lists = {}
+        self.fields = {}
+        self.messages = 0
+        self.campaigns = 0
+        self.imported = 0
+        self.sent = 0
+        self.subscribed = 0
+        self.templates = 0
+        self.requests = {}
+        self._window = []
+        self._server = _HTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _is_rate_limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            self._window = [sent for sent in self._window if now - sent < 60]
+            if len(self._window) >= self.rate_limit:
+                return True
+            self._window.append(now)
+        return False
+
+    def handle(self, method: str, body: bytes):
+
+        """
+        Build API response for method
+
+        :return: tuple of HTTP status and JSON payload
+        """
+
+        with self.lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self.random.random() < self.error_rate:
+            return 503, {}
+        if self._is_rate_limited():
+            return 200, {'error': 'API call limit exceeded', 'code': 'api_call_limit_exceeded_for_api_key'}
+        handler = getattr(self, f'api_{method}', None)
+        if handler is None:
+            return 200, {'error': f'Unknown method "{method}"', 'code': 'unknown_method'}
+        return 200, handler(body)
+
+    @staticmethod
+    def _params(body: bytes) -> dict:
+        return dict(parse_qsl(body.decode('utf-8'), keep_blank_values=True))
+
+    def api_getLists(self, body: bytes) -> dict:
+        with self.lock:
+            return {'result': [{'id': list_id, 'title': title} for title, list_id in self.lists.items()]}
+
+    def api_createList(self, body: bytes) -> dict:
+        title = self._params(body)['title']
+        with self.lock:
+            list_id = self.lists.setdefault(title, len(self.lists) + 1)
+        return {'result': {'id': list_id}}
+
+    def api_getFields(self, body: bytes) -> dict:
+        with self.lock:
+            return {'result': [
+                {'id': field_id, 'name': name, 'type': 'string', 'is_visible': 1, 'view_pos': field_id}
+                for name, field_id in self.fields.items()
+            ]}
+
+    def api_createField(self, body: bytes) -> dict:
+        name = self._params(body)['name']
+        with self.lock:
+            field_id = self.fields.setdefault(name, len(self.fields) + 1)
+        return {'result': {'id': field_id}}
+
+    def api_importContacts(self, body: bytes) -> dict:
+
+        """ Count rows without parsing body: number of data cells / number of fields """
+
+        fields = body.count(b'field_names%5B')
+        cells = body.count(b'&data%5B') + body.startswith(b'data%5B')
+        rows = cells // fields if fields else 0
+        if rows > self.IMPORT_MAX_ROWS:
+            return {'error': f'Too many contacts: {rows}', 'code': 'invalid_arg'}
+        with self.lock:
+            self.imported += rows
+        return {'result': {
+            'total': rows, 'inserted': rows, 'updated': 0, 'deleted': 0, 'new_emails': rows, 'invalid': 0, 'log': []
+        }}
+
+    def api_createEmailMessage(self, body: bytes) -> dict:
+        with self.lock:
+            self.messages += 1
+            return {'result': {'message_id': self.messages}}
+
+    def api_createEmailTemplate(self, body: bytes) -> dict:
+        with self.lock:
+            self.templates += 1
+            return {'result': {'template_id': self.templates}}
+
+    def api_createCampaign(self, body: bytes) -> dict:
+        with self.lock:
+            self.campaigns += 1
+            return {'result': {'campaign_id': self.campaigns, 'status': 'scheduled', 'count': 1}}
+
+    def _send_message(self) -> int:
+        with self.lock:
+            self.sent += 1
+            return self.sent
+
+    def api_sendEmail(self, body: bytes) -> dict:
+        email = self._params(body).get('email')
+        return {'result': [{'index': 0, 'email': email, 'id': f'email_{self._send_message()}'}]}
+
+    def api_sendSms(self, body: bytes) -> dict:
+        return {'result': {'currency': 'USD', 'price': 0.01, 'sms_id': self._send_message()}}
+
+    def api_subscribe(self, body: bytes) -> dict:
+        with self.lock:
+            self.subscribed += 1
+            return {'result': {'person_id': self.subscribed}}
+
+    def api_exportContacts(self, body: bytes) -> dict:
+        params = self._params(body)
+        offset = int(params.get('offset', 0))
+        limit = min(int(params.get('limit', self.EXPORT_MAX_ROWS)), self.EXPORT_MAX_ROWS)
+        field_names = [val for key, val in params.items() if key.startswith('field_names[')] or ['email', 'name']
+        stop = min(self.export_size, offset + limit)
+        return {'result': {
+            'field_names': field_names,
+            'data': [[f'{field}_{i}' for field in field_names] for i in range(offset, stop)],
+        }}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                method = self.path.split('?')[0].rsplit('/', 1)[-1]
+                encoding = self.headers.get('Content-Encoding')
+                if encoding and not server.compression:
+                    status, payload = 415, {}
+                else:
+                    if encoding:
+                        body = zlib.decompress(body, 16 + zlib.MAX_WBITS if encoding == 'gzip' else zlib.MAX_WBITS)
+                        with server.lock:
+                            server.compressed += 1
+                    status, payload = server.handle(method, body)
+                content = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local UniSender API stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None)
+    parser.add_argument('--export-size', type=int, default=10000)
+    args = parser.parse_args()
+    server = MockUniSenderServer(args.host, args.port, args.latency, args.error_rate, args.rate_limit,
+                                 args.export_size)
+    print(f'UniSender mock server: {server.url}')
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Run all benchmarks, each case in a separate process so peak RSS is measured per case
+
+Usage:
+    python -m benchmarks.run [--quick] [--latency 0.05] [--error-rate 0.01] [--rate-limit 1200] [--save results.json]
+    python -m benchmarks.run --baseline results.json [--tolerance 0.2]
+
+With `--baseline` exits with status 1 if throughput of any case dropped more than tolerance.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from benchmarks.common import format_result
+
+BENCHMARKS = {
+    'bench_hash': ([1000, 100000, 1000000], [1000, 100000]),
+    'bench_import': ([1000, 100000, 1000000], [1000, 100000]),
+    'bench_import_csv': ([1000, 100000, 1000000], [1000, 100000]),
+    'bench_campaigns': ([1, 10, 50], [1, 10]),
+    'bench_messages': ([10, 100], [10]),
+    'bench_export': ([10000, 100000], [10000]),
+    'bench_send': ([100, 1000], [100]),
+    'bench_outbox': ([1000, 10000], [1000]),
+    'bench_response': ([1000], [100]),
+    'bench_transport': ([10000, 100000], [10000]),
+    'bench_startup': ([10000], [10000]),
+}
+SERVER_BENCHMARKS = {'bench_import', 'bench_import_csv', 'bench_campaigns', 'bench_export', 'bench_send',
+                     'bench_outbox', 'bench_messages'}
+
+
+def run_case(module: str, size: int, args) -> list:
+    command = [sys.executable, '-m', f'benchmarks.{module}', '--size', str(size), '--json']
+    if module in SERVER_BENCHMARKS:
+        command += ['--latency', str(args.latency), '--error-rate', str(args.error_rate)]
+        if args.rate_limit is not None:
+            command += ['--rate-limit', str(args.rate_limit)]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{')]
+
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+
+    """ Return descriptions of cases which throughput dropped more than tolerance """
+
+    previous = {(result['name'], result['size']): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result['name'], result['size']))
+        if old and old['throughput'] and result['throughput'] < old['throughput'] * (1 - tolerance):
+            regressions.append(
+                f"{result['name']} size={result['size']}: "
+                f"{old['throughput']} -> {result['throughput']} {result['unit']}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run UniSender client benchmarks')
+    parser.add_argument('--quick', action='store_true', help='skip the largest sizes')
+    parser.add_argument('--latency', type=float, default=0.0, help='mock server latency, seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='mock server HTTP 503 share')
+    parser.add_argument('--rate-limit', type=float, default=None, help='mock server requests per minute')
+    parser.add_argument('--save', help='save results to JSON file')
+    parser.add_argument('--baseline', help='compare with results saved by --save')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed throughput drop, default: 0.2')
+    args = parser.parse_args()
+
+    subprocess.run([sys.executable, '-m', 'benchmarks.bench_encoding'], check=True)
+    results = []
+    for module, sizes in BENCHMARKS.items():
+        for size in sizes[1] if args.quick else sizes[0]:
+            for result in run_case(module, size, args):
+                print(format_result(result), flush=True)
+                results.append(result)
+
+    if args.save:
+        with open(args.save, 'w') as fh:
+            json.dump(results, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
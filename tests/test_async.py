@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import pytest
+from unisender import AsyncClient, AsyncSimpleClient
+from unisender.response import get_result
+from tests.utils import API_KEY, PLATFORM, AsyncCapturingTransport, get_import_rows
+
+
+class ConcurrencyTransport(AsyncCapturingTransport):
+
+    """ Counts max number of requests in flight """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.max_active = 0
+
+    async def post(self, url: str, content=None, headers=None, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            return await super().post(url, content=content, headers=headers, **kwargs)
+        finally:
+            self.active -= 1
+
+
+def make_recipients(count: int) -> list:
+    return [{'email': f'user{i}@example.com', 'Name': f'Name {i}'} for i in range(count)]
+
+
+def test_sync_context_is_rejected():
+    with pytest.raises(TypeError, match='async with AsyncSimpleClient'):
+        with AsyncSimpleClient(API_KEY, PLATFORM, session=AsyncCapturingTransport()):
+            pass
+
+
+def test_concurrent_requests_are_bounded():
+    transport = ConcurrencyTransport(latency=0.01)
+
+    async def check():
+        async with AsyncClient(API_KEY, PLATFORM, session=transport, max_concurrency=3) as client:
+            responses = await asyncio.gather(*[client.get_campaign_status(campaign_id=i) for i in range(10)])
+        return [get_result(response)['status'] for response in responses]
+
+    assert asyncio.run(check()) == ['completed'] * 10
+    assert transport.max_active == 3
+    assert len(transport.get_calls('getCampaignStatus')) == 10
+
+
+def test_import_stream_sends_batches_concurrently():
+    transport = ConcurrencyTransport(latency=0.01)
+
+    async def run():
+        async with AsyncSimpleClient(API_KEY, PLATFORM, session=transport) as client:
+            return await client.import_contacts_stream(make_recipients(25), [3], batch_size=10, workers=3)
+
+    result = asyncio.run(run())
+    assert (result.batches, result.total, result.errors) == (3, 25, [])
+    requests = transport.get_calls('importContacts')
+    assert sorted(len(get_import_rows(request)) for request in requests) == [5, 10, 10]
+    assert transport.max_active == 3
+
+
+def test_failing_batches_cancel_import_tasks():
+    transport = AsyncCapturingTransport(latency=0.05)
+
+    def recipients():
+        yield from make_recipients(2)
+        raise ValueError('broken source')
+
+    async def run():
+        async with AsyncSimpleClient(API_KEY, PLATFORM, session=transport) as client:
+            with pytest.raises(ValueError, match='broken source'):
+                await client.import_contacts_stream(recipients(), batch_size=1, workers=4)
+            return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+
+
+def test_create_email_campaign():
+    transport = AsyncCapturingTransport()
+    email_data = {
+        'sender_name': 'Sender', 'sender_email': 'sender@example.com', 'subject': 'Subject', 'body': '<p>Hi</p>',
+    }
+
+    async def run():
+        async with AsyncSimpleClient(API_KEY, PLATFORM, session=transport) as client:
+            return await client.create_email_campaign(make_recipients(3), email_data)
+
+    assert isinstance(asyncio.run(run()), int)
+    assert list(transport.lists) == [1]
+    rows = get_import_rows(transport.get_calls('importContacts')[0])
+    assert [row['email'] for row in rows] == ['user0@example.com', 'user1@example.com', 'user2@example.com']
+    assert rows[0]['email_list_ids'] == '1'
+    assert transport.get_calls('createEmailMessage')[0].params['list_id'] == '1'
+    assert len(transport.get_calls('createCampaign')) == 1
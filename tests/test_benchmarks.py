@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import subprocess
+from argparse import Namespace
+from benchmarks import run
+
+
+def capture_commands(monkeypatch) -> list:
+    commands = []
+
+    def fake_run(command, **kwargs):
+        commands.append(command)
+        return subprocess.CompletedProcess(command, 0, stdout='noise\n{"name": "case", "size": 1}\n')
+
+    monkeypatch.setattr(run.subprocess, 'run', fake_run)
+    return commands
+
+
+def test_server_options_are_passed_to_server_benchmarks(monkeypatch):
+    commands = capture_commands(monkeypatch)
+    args = Namespace(latency=0.05, error_rate=0.01, rate_limit=1200.0)
+    assert run.run_case('bench_import', 1000, args) == [{'name': 'case', 'size': 1}]
+    run.run_case('bench_hash', 1000, args)
+    assert commands[0][-6:] == ['--latency', '0.05', '--error-rate', '0.01', '--rate-limit', '1200.0']
+    assert commands[1][-3:] == ['--size', '1000', '--json']
+
+
+def test_rate_limit_is_optional(monkeypatch):
+    commands = capture_commands(monkeypatch)
+    run.run_case('bench_send', 100, Namespace(latency=0.0, error_rate=0.0, rate_limit=None))
+    assert '--rate-limit' not in commands[0]
+
+
+def test_compare_reports_throughput_drops():
+    baseline = [
+        {'name': 'import', 'size': 1000, 'throughput': 100.0, 'unit': 'rows/s'},
+        {'name': 'hash', 'size': 1000, 'throughput': 100.0, 'unit': 'rows/s'},
+    ]
+    results = [
+        {'name': 'import', 'size': 1000, 'throughput': 79.0, 'unit': 'rows/s'},
+        {'name': 'hash', 'size': 1000, 'throughput': 81.0, 'unit': 'rows/s'},
+        {'name': 'export', 'size': 1000, 'throughput': 1.0, 'unit': 'rows/s'},
+    ]
+    assert run.compare(results, baseline, 0.2) == ['import size=1000: 100.0 -> 79.0 rows/s']
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import pytest
+from unisender import AsyncBulkSender, AsyncClient, BulkSender, Client
+from tests.utils import API_KEY, PLATFORM, AsyncCapturingTransport, CapturingTransport
+
+DEFAULT_PARAMS = {'sender_name': 'Shop', 'sender_email': 'shop@example.com', 'list_id': 1}
+
+
+def make_sender(transport=None, **kwargs):
+    transport = transport or CapturingTransport()
+    client = Client(API_KEY, PLATFORM, session=transport, max_retries=0)
+    return BulkSender(client, default_params=DEFAULT_PARAMS, **kwargs), transport
+
+
+def make_jobs(count: int) -> list:
+    return [(f'user{i}@example.com', {'subject': f'Order {i}', 'body': '<b>Thanks</b>'}) for i in range(count)]
+
+
+def test_results_are_returned_in_job_order():
+    sender, transport = make_sender(workers=4)
+    results = sender.send_email(make_jobs(20))
+    assert [result.index for result in results] == list(range(20))
+    assert all(result.ok and result.message_id for result in results)
+    requests = transport.get_calls('sendEmail')
+    assert sorted(request.params['email'] for request in requests) == sorted(email for email, _ in make_jobs(20))
+    assert requests[0].params['sender_name'] == 'Shop'
+
+
+def test_failed_job_does_not_stop_others():
+    transport = CapturingTransport(errors={
+        'sendEmail': lambda request: 'Invalid email' if request.params['email'] == 'user3@example.com' else None,
+    })
+    sender, _ = make_sender(transport)
+    results = sender.send_email(make_jobs(6))
+    assert [result.ok for result in results] == [True, True, True, False, True, True]
+    assert 'Invalid email' in str(results[3].error)
+
+
+def test_identical_jobs_are_sent_once():
+    sender, transport = make_sender(workers=2, dedup=True)
+    jobs = make_jobs(3) + make_jobs(3) + [{'email': 'user0@example.com', 'subject': 'Order 0', 'body': '<b>Thanks</b>'}]
+    results = sender.send_email(jobs)
+    assert len(transport.get_calls('sendEmail')) == 3
+    assert [result.duplicate_of for result in results] == [None, None, None, 0, 1, 2, 0]
+    assert [result.message_id for result in results[3:]] == [results[i].message_id for i in (0, 1, 2, 0)]
+
+
+def test_dedup_window_bounds_remembered_jobs():
+    sender, transport = make_sender(workers=1, dedup=True, dedup_window=2)
+    jobs = make_jobs(3)
+    results = sender.send_email([jobs[0], jobs[1], jobs[0], jobs[2], jobs[1], jobs[0]])
+    assert [result.duplicate_of for result in results] == [None, None, 0, None, None, None]
+    assert len(transport.get_calls('sendEmail')) == 5
+
+
+def test_endless_stream_keeps_bounded_dedup_state():
+    def jobs():
+        index = 0
+        while True:
+            yield f'user{index}@example.com', {'subject': 'Hi', 'body': 'Body'}
+            index += 1
+
+    sender, _ = make_sender(workers=2, dedup=True, dedup_window=10)
+    stream = sender.iter_send('send_email', jobs())
+    results = [next(stream) for _ in range(100)]
+    assert len(stream.gi_frame.f_locals['originals']) == 10
+    stream.close()
+    assert all(result.ok for result in results)
+
+
+def test_repeated_jobs_are_sent_by_default():
+    sender, transport = make_sender()
+    results = sender.send_email(make_jobs(2) * 2)
+    assert len(transport.get_calls('sendEmail')) == 4
+    assert [result.duplicate_of for result in results] == [None] * 4
+
+
+def test_unknown_method_is_rejected():
+    sender, _ = make_sender()
+    with pytest.raises(Exception, match='Unknown transactional method'):
+        sender.send('send_fax', make_jobs(1))
+
+
+def test_async_sender_accepts_async_iterables():
+    async def jobs():
+        for job in make_jobs(5) + make_jobs(2):
+            yield job
+
+    async def send():
+        async with AsyncClient(API_KEY, PLATFORM, session=transport) as client:
+            return await AsyncBulkSender(
+                client, workers=3, dedup=True, default_params=DEFAULT_PARAMS
+            ).send_email(jobs())
+
+    transport = AsyncCapturingTransport()
+    results = asyncio.run(send())
+    assert [result.index for result in results] == list(range(7))
+    assert all(result.ok for result in results)
+    assert [result.duplicate_of for result in results[5:]] == [0, 1]
+    assert len(transport.get_calls('sendEmail')) == 5
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import pytest
+from unisender import Client
+from unisender.cache import MemoryCacheBackend, ResponseCache, SQLiteCacheBackend
+from tests.utils import API_KEY, PLATFORM, CapturingTransport, ScriptedTransport
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        yield MemoryCacheBackend(max_size=3)
+    else:
+        backend = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite'), max_size=3)
+        yield backend
+        backend.close()
+
+
+def test_backend_evicts_least_recently_used(backend):
+    for key in ('a', 'b', 'c'):
+        backend.set(key, key.encode())
+    assert backend.get('a') == b'a'
+    backend.set('d', b'd')
+    assert [backend.get(key) for key in ('a', 'b', 'c', 'd')] == [b'a', None, b'c', b'd']
+
+
+def test_backend_expires_entries(backend, monkeypatch):
+    backend.set('short', b'1', ttl=10)
+    backend.set('forever', b'2')
+    monkeypatch.setattr('unisender.cache.time.monotonic', lambda: 1e12)
+    monkeypatch.setattr('unisender.cache.time.time', lambda: 1e12)
+    assert backend.get('short') is None
+    assert backend.get('forever') == b'2'
+
+
+def test_backend_invalidates_by_prefix(backend):
+    backend.set('get_lists:1', b'1')
+    backend.set('get_lists:2', b'2')
+    backend.set('get_fields:1', b'3')
+    backend.invalidate('get_lists:')
+    assert [backend.get('get_lists:1'), backend.get('get_lists:2'), backend.get('get_fields:1')] == [None, None, b'3']
+    backend.delete('get_fields:1')
+    assert backend.get('get_fields:1') is None
+
+
+def test_client_serves_repeated_read_from_cache():
+    transport = CapturingTransport()
+    client = Client(API_KEY, PLATFORM, session=transport, cache=True)
+    first = client.get_lists()
+    second = client.get_lists()
+    assert second.json() == first.json()
+    assert second.request.url == first.request.url
+    client.get_fields()
+    client.get_lists(extra='other params')
+    assert len(transport.get_calls('getLists')) == 2
+    assert len(transport.get_calls('getFields')) == 1
+
+
+def test_client_cache_is_not_shared_between_api_keys():
+    transport = CapturingTransport()
+    cache = ResponseCache()
+    Client('first-key', PLATFORM, session=transport, cache=cache).get_lists()
+    Client('second-key', PLATFORM, session=transport, cache=cache).get_lists()
+    assert len(transport.get_calls('getLists')) == 2
+
+
+def test_successful_write_invalidates_related_reads():
+    transport = CapturingTransport()
+    client = Client(API_KEY, PLATFORM, session=transport, cache=True)
+    client.get_lists()
+    client.get_fields()
+    client.create_list(title='News')
+    assert client.get_lists().json()['result'] == [{'id': 1, 'title': 'News'}]
+    client.get_fields()
+    assert len(transport.get_calls('getLists')) == 2
+    assert len(transport.get_calls('getFields')) == 1
+
+
+def test_failed_write_keeps_cached_reads():
+    transport = ScriptedTransport()
+    client = Client(API_KEY, PLATFORM, session=transport, cache=True, max_retries=0)
+    client.get_lists()
+    transport.script = [(200, {'error': 'Invalid title', 'code': 'invalid_arg'}, None), (500, {}, None)]
+    client.create_list(title='')
+    client.delete_list(list_id=1)
+    client.get_lists()
+    assert len(transport.get_calls('getLists')) == 1
+
+
+def test_error_responses_are_not_cached():
+    transport = ScriptedTransport([(200, {'error': 'Try later', 'code': 'unknown'}, None)])
+    client = Client(API_KEY, PLATFORM, session=transport, cache=True, max_retries=0)
+    assert 'error' in client.get_lists().json()
+    assert 'result' in client.get_lists().json()
+    assert 'result' in client.get_lists().json()
+    assert len(transport.get_calls('getLists')) == 2
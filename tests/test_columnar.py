@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import io
+import pytest
+from unisender import SimpleClient
+from unisender.columnar import get_column_names, iter_column_batches, iter_csv_batches
+from tests.utils import API_KEY, PLATFORM, CapturingTransport, get_import_rows
+
+
+def make_client():
+    transport = CapturingTransport()
+    return SimpleClient(API_KEY, PLATFORM, session=transport), transport
+
+
+def get_rows(transport) -> list:
+    rows = [row for request in transport.get_calls('importContacts') for row in get_import_rows(request)]
+    return sorted(rows, key=lambda row: row['email'])
+
+
+def test_column_batches():
+    columns = {'email': ['a', 'b', 'c'], 'age': [1, 2, None]}
+    assert get_column_names(columns) == ['email', 'age']
+    assert list(iter_column_batches(columns, ['email', 'age'], 2)) == [
+        (0, [['a', 'b'], ['1', '2']]), (2, [['c'], ['None']]),
+    ]
+    with pytest.raises(ValueError, match='Column "age" length differs'):
+        list(iter_column_batches({'email': ['a'], 'age': []}, ['email', 'age'], 2))
+
+
+def test_csv_batches_pad_short_rows():
+    rows = [['a', '1'], [], ['b'], ['c', '3']]
+    assert list(iter_csv_batches(iter(rows), 2, 2)) == [(0, [['a', 'b'], ['1', '']]), (2, [['c'], ['3']])]
+    with pytest.raises(ValueError, match='more than 2 columns'):
+        list(iter_csv_batches(iter([['a', '1', 'x']]), 2, 2))
+
+
+def test_import_columns_adds_system_columns():
+    client, transport = make_client()
+    result = client.import_contacts_columns(
+        {'email': ['a@example.com', 'b@example.com', 'c@example.com'], 'Age': [30, 40, 50]}, [4, 5], batch_size=2
+    )
+    assert (result.batches, result.total, result.errors) == (2, 3, [])
+    assert get_rows(transport)[0] == {
+        'email': 'a@example.com', 'Age': '30', 'email_status': 'active', 'email_list_ids': '4,5',
+    }
+    assert [request.params['name'] for request in transport.get_calls('createField')] == ['Age']
+
+
+def test_import_columns_keeps_given_system_columns():
+    client, transport = make_client()
+    client.import_contacts_columns({'email': ['a@example.com'], 'email_status': ['new']}, [4])
+    assert get_rows(transport) == [{'email': 'a@example.com', 'email_status': 'new', 'email_list_ids': '4'}]
+
+
+def test_import_columns_from_dataframe():
+    pd = pytest.importorskip('pandas')
+    client, transport = make_client()
+    frame = pd.DataFrame({'email': ['a@example.com', 'b@example.com'], 'Age': [30, 40]}, index=[10, 20])
+    client.import_contacts_columns(frame, batch_size=1)
+    rows = get_rows(transport)
+    assert [(row['email'], row['Age']) for row in rows] == [('a@example.com', '30'), ('b@example.com', '40')]
+
+
+def test_import_csv():
+    client, transport = make_client()
+    file = io.StringIO('email;Name\na@example.com;A\n\nb@example.com\n')
+    result = client.import_contacts_csv(file, [4], batch_size=1, delimiter=';')
+    assert (result.batches, result.total) == (2, 2)
+    rows = get_rows(transport)
+    assert [(row['email'], row['Name']) for row in rows] == [('a@example.com', 'A'), ('b@example.com', '')]
+
+
+def test_import_csv_without_header_fails(tmp_path):
+    path = tmp_path / 'contacts.csv'
+    path.write_text('')
+    client, _ = make_client()
+    with pytest.raises(Exception, match='recipient list should not be empty'):
+        client.import_contacts_csv(str(path))
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import gzip
+import zlib
+import pytest
+from unisender import AsyncClient, Client
+from unisender.encoding import compress_body, decompress_body
+from tests.utils import API_KEY, PLATFORM, AsyncCapturingTransport, CapturingTransport, ScriptedTransport
+
+DATA = [[f'user{i}@example.com', f'Name {i}'] for i in range(100)]
+
+
+@pytest.mark.parametrize('encoding, decompress', [('gzip', gzip.decompress), ('deflate', zlib.decompress)])
+def test_compress_body_round_trip(encoding, decompress):
+    body = b'field_names%5B0%5D=email&' * 100
+    compressed = compress_body(body, encoding, level=1)
+    assert len(compressed) < len(body)
+    assert decompress(compressed) == body
+    assert decompress_body(compressed, encoding) == body
+    assert decompress_body(body) == body
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError, match='Unknown request content encoding "br"'):
+        compress_body(b'', 'br')
+    with pytest.raises(ValueError, match='Unknown request compression "br"'):
+        Client(API_KEY, PLATFORM, compression='br')
+
+
+def test_large_bodies_are_compressed():
+    transport = CapturingTransport()
+    client = Client(API_KEY, PLATFORM, session=transport, compression='gzip', compression_min_size=1024)
+    client.import_contacts(field_names=['email', 'Name'], data=DATA)
+    client.get_lists()
+    (_, import_request), (_, lists_request) = transport.calls
+    assert import_request.headers['Content-Encoding'] == 'gzip'
+    assert len(import_request.data) < len(import_request.body)
+    assert import_request.params['data[99][1]'] == 'Name 99'
+    assert import_request.params['api_key'] == API_KEY
+    assert 'Content-Encoding' not in lists_request.headers
+
+
+def test_rejected_compression_is_disabled():
+    transport = ScriptedTransport([(415, {}, None)])
+    client = Client(API_KEY, PLATFORM, session=transport, compression='deflate', max_retries=0)
+    response = client.import_contacts(field_names=['email', 'Name'], data=DATA)
+    assert response.status_code == 200
+    first, second = transport.get_calls('importContacts')
+    assert first.headers['Content-Encoding'] == 'deflate'
+    assert 'Content-Encoding' not in second.headers
+    assert first.body == second.body
+    client.import_contacts(field_names=['email', 'Name'], data=DATA)
+    assert 'Content-Encoding' not in transport.get_calls('importContacts')[2].headers
+
+
+def test_async_client_compresses_bodies():
+    transport = AsyncCapturingTransport()
+
+    async def send():
+        async with AsyncClient(API_KEY, PLATFORM, session=transport, compression='gzip') as client:
+            await client.import_contacts(field_names=['email', 'Name'], data=DATA)
+
+    asyncio.run(send())
+    request = transport.get_calls('importContacts')[0]
+    assert request.headers['Content-Encoding'] == 'gzip'
+    assert request.params['data[0][0]'] == 'user0@example.com'
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import pytest
+from requests.models import RequestEncodingMixin
+from unisender import Client
+from unisender.encoding import FormMatrix, encode_request_data, flatten_request_data
+from tests.utils import API_KEY, PLATFORM
+
+DEFAULT_DATA = {'api_key': API_KEY, 'platform': PLATFORM, 'format': 'json'}
+
+
+def build_request_data(data: dict, extra_key=None) -> dict:
+
+    """ Recursive `Client._build_request_data` the iterative encoder replaced """
+
+    result = {} if extra_key is not None else dict(DEFAULT_DATA)
+    for key, val in data.items():
+        _key = f'{extra_key}[{key}]' if isinstance(extra_key, str) else key
+        if isinstance(val, dict):
+            result.update(build_request_data(val, _key))
+        elif isinstance(val, list):
+            result.update(build_request_data(dict(enumerate(val)), _key))
+        elif val is not None:
+            result[_key] = val
+    return result
+
+
+def encode_legacy(data: dict) -> bytes:
+
+    """ Body `requests.post(url, data)` built from the recursive request data """
+
+    return RequestEncodingMixin._encode_params(build_request_data(data)).encode('ascii')
+
+
+PARITY_CASES = [
+    {},
+    {'list_id': 17, 'title': 'Weekly news', 'overwrite_lists': 1, 'empty': '', 'skipped': None},
+    {'subject': 'Привет, мир! 50% off & free shipping', 'body': '<a href="https://example.com/?a=1&b=2">x</a>'},
+    {'sender_name': 'Tab\tnew\nline ~_.-', 'emoji': '\U0001F600', 'bytes': b'raw bytes&=', 'float': 1.5},
+    {'field_names': ['email', 'name'], 'data': [['a@example.com', 'John Lennon'], ['b@example.com', 'Пол']]},
+    {'fields': {'name': 'John', 'tags': ['a', 'b'], 'nested': {'deep': {'value': 0}}}},
+    {'list_ids': list(range(1030)), 'platform': 'overridden', 'api_key': None},
+    {'format': {'nested': 'not a scalar override'}},
+    {'data': [['zero\x00byte', 'ascii'], ['%00', 'x']]},
+]
+
+
+@pytest.mark.parametrize('data', PARITY_CASES)
+def test_body_matches_recursive_encoder(data):
+    assert encode_request_data(data, DEFAULT_DATA) == encode_legacy(data)
+
+
+def test_client_body_matches_recursive_encoder():
+    client = Client(API_KEY, PLATFORM)
+    for data in PARITY_CASES:
+        assert client._encode_request_data(data) == encode_legacy(data)
+        assert client._build_request_data(data) == build_request_data(data)
+
+
+def test_flatten_keeps_order_and_skips_none():
+    data = {'a': [1, None, {'b': 2}], 'c': None, 'd': 'x'}
+    assert list(flatten_request_data(data)) == [('a[0]', 1), ('a[2][b]', 2), ('d', 'x')]
+
+
+@pytest.mark.parametrize('columns', [
+    [['a@example.com', 'b@example.com'], ['John Lennon', 'Пол Маккартни']],
+    [['x\x00y', 'plain'], ['%00', '']],
+    [],
+])
+def test_form_matrix_matches_row_lists(columns):
+    rows = [list(row) for row in zip(*columns)]
+    matrix_body = encode_request_data({'field_names': ['email', 'name'], 'data': FormMatrix(columns)}, DEFAULT_DATA)
+    assert matrix_body == encode_legacy({'field_names': ['email', 'name'], 'data': rows})
+    assert dict(flatten_request_data({'data': FormMatrix(columns)})) == dict(flatten_request_data({'data': rows}))
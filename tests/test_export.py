@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import io
+import json
+import pytest
+from unisender import AsyncSimpleClient, SimpleClient
+from unisender.export import iter_export_rows
+from tests.utils import API_KEY, PLATFORM, AsyncCapturingTransport, CapturingTransport
+
+
+def test_rows_are_decoded_one_by_one():
+    content = (
+        b'{"result": {"field_names": ["email", "Name"], "data": [["a@example.com", "A"], ["b@example.com", null]]}}'
+    )
+    names, rows = iter_export_rows(content)
+    assert names == ['email', 'Name']
+    assert next(rows) == ['a@example.com', 'A']
+    assert list(rows) == [['b@example.com', None]]
+
+
+@pytest.mark.parametrize('content, field_names, expected', [
+    (b'{"result":{"data":[["a"]],"field_names":["email"]},"warnings":[{"x":"]"}]}', None, (['email'], [['a']])),
+    (b' { "warnings" : [ "}" ] , "result" : { "data" : [ ] , "field_names" : [ "a" ] } } ', None, (['a'], [])),
+    (b'{"result":{"data":[["a"]],"field_names":["email"]}}', ['Name'], (['Name'], [['a']])),
+    (b'{"result":{"field_names":["email"]}}', None, (['email'], [])),
+    (b'{"error":"Invalid list","code":"invalid_arg"}', ['Name'], (['Name'], [])),
+])
+def test_row_decoding_matches_json(content, field_names, expected):
+    names, rows = iter_export_rows(content, field_names)
+    assert (names, list(rows)) == expected
+
+
+def test_contacts_are_paged_by_offset():
+    transport = CapturingTransport(export_size=12)
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    contacts = list(client.iter_export_contacts(['email', 'Name'], page_size=5, list_id=3))
+    assert len(contacts) == 12
+    assert contacts[0] == {'email': 'contact_0@example.com', 'Name': 'Name_0'}
+    assert contacts[-1]['email'] == 'contact_11@example.com'
+    requests = transport.get_calls('exportContacts')
+    assert [int(request.params['offset']) for request in requests] == [0, 5, 10]
+    assert {request.params['list_id'] for request in requests} == {'3'}
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_single_page_export_takes_one_request(prefetch):
+    transport = CapturingTransport(export_size=3)
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    assert len(list(client.iter_export_contacts(['email'], page_size=5, prefetch=prefetch))) == 3
+    assert len(transport.get_calls('exportContacts')) == 1
+
+
+def test_full_last_page_needs_one_more_request():
+    transport = CapturingTransport(export_size=10)
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    rows = list(client.iter_export_contacts(['email', 'Name'], columns=['Name'], page_size=5))
+    assert rows[:2] == [('Name_0',), ('Name_1',)]
+    assert len(rows) == 10
+    assert [int(request.params['offset']) for request in transport.get_calls('exportContacts')] == [0, 5, 10]
+
+
+def test_export_to_file():
+    client = SimpleClient(API_KEY, PLATFORM, session=CapturingTransport(export_size=3))
+    csv_file = io.StringIO()
+    assert client.export_contacts_to_file(csv_file, field_names=['email', 'Name'], page_size=2) == 3
+    assert len(client.session.get_calls('exportContacts')) == 2
+    assert csv_file.getvalue().splitlines() == [
+        'email,Name', 'contact_0@example.com,Name_0', 'contact_1@example.com,Name_1', 'contact_2@example.com,Name_2',
+    ]
+    ndjson_file = io.StringIO()
+    client.export_contacts_to_file(ndjson_file, 'ndjson', ['email'])
+    assert [json.loads(line) for line in ndjson_file.getvalue().splitlines()] == [
+        {'email': f'contact_{i}@example.com'} for i in range(3)
+    ]
+    empty_file = io.StringIO()
+    client = SimpleClient(API_KEY, PLATFORM, session=CapturingTransport())
+    assert client.export_contacts_to_file(empty_file, field_names=['email']) == 0
+    assert empty_file.getvalue().splitlines() == ['email']
+
+
+def test_async_export():
+    transport = AsyncCapturingTransport(export_size=7)
+
+    async def export():
+        async with AsyncSimpleClient(API_KEY, PLATFORM, session=transport) as client:
+            return [contact async for contact in client.iter_export_contacts(['email'], page_size=3)]
+
+    contacts = asyncio.run(export())
+    assert [contact['email'] for contact in contacts] == [f'contact_{i}@example.com' for i in range(7)]
+    assert [int(request.params['offset']) for request in transport.get_calls('exportContacts')] == [0, 3, 6]
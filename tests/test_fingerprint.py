@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+from unisender import SimpleClient, simple_client, utils
+from unisender.utils import get_chunked_fingerprint, get_fingerprint, get_string_repr, get_unique_hash
+from tests.utils import API_KEY, PLATFORM, CapturingTransport
+
+RECIPIENTS = [{'email': f'user{i}@example.com', 'name': f'Name {i}', 'age': i} for i in range(50)]
+EMAIL_DATA = {'sender_name': 'Shop', 'sender_email': 'shop@example.com', 'subject': 'News', 'body': '<b>Hi</b>'}
+
+
+def string_hash(obj) -> int:
+
+    """ `get_unique_hash` of the version that hashed the whole `get_string_repr` string """
+
+    import hashlib
+    return int(hashlib.sha1(get_string_repr(obj).encode('utf-8')).hexdigest(), 16) % 10 ** 10
+
+
+def test_unique_hash_is_unchanged():
+    for obj in (RECIPIENTS, [{'a': 'x' * 10000, 'b': ['Привет', 1.5, None]}], 'text', []):
+        assert get_unique_hash(obj) == string_hash(obj)
+
+
+def test_fingerprint_ignores_key_order_and_separates_values():
+    assert get_fingerprint({'a': 1, 'b': 2}) == get_fingerprint({'b': 2, 'a': 1})
+    assert get_fingerprint({'a': '12'}) != get_fingerprint({'a': '1', 'b': '2'})
+    assert get_fingerprint(['1', 2]) != get_fingerprint([1, '2'])
+    assert get_fingerprint(iter(RECIPIENTS)) == get_fingerprint(RECIPIENTS)
+
+
+def test_fingerprint_key_order_cache_separates_key_types():
+    dicts = [{1: 'a', 'b': 2}, {True: 'a', 'b': 2}, {1.0: 'a', 'b': 2}]
+    expected = []
+    for obj in dicts:
+        utils._get_key_order.cache_clear()
+        expected.append(get_fingerprint(obj))
+    assert len(set(expected)) == 3
+    assert [get_fingerprint(obj) for obj in dicts] == expected
+
+
+def test_chunked_fingerprint_does_not_depend_on_executor():
+    expected = get_chunked_fingerprint(RECIPIENTS, chunk_size=7)
+    with ThreadPoolExecutor(4) as executor:
+        assert get_chunked_fingerprint(iter(RECIPIENTS), chunk_size=7, executor=executor) == expected
+    assert get_chunked_fingerprint(RECIPIENTS, chunk_size=8) != expected
+
+
+def test_campaign_reuses_list_with_current_title():
+    transport = CapturingTransport()
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    client.create_email_campaign(RECIPIENTS, dict(EMAIL_DATA))
+    client.create_email_campaign(RECIPIENTS, dict(EMAIL_DATA))
+    titles = [request.params['title'] for request in transport.get_calls('createList')]
+    assert titles == [SimpleClient._get_list_title(RECIPIENTS)]
+
+
+def test_campaign_reuses_list_with_legacy_title():
+    transport = CapturingTransport()
+    transport.lists[500] = f'mailing_list_{get_unique_hash(RECIPIENTS)}'
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    client.create_email_campaign(RECIPIENTS, dict(EMAIL_DATA))
+    assert transport.get_calls('createList') == []
+    assert transport.get_calls('createEmailMessage')[0].params['list_id'] == '500'
+
+
+def test_legacy_titles_lookup_may_be_disabled():
+    class Client(SimpleClient):
+        LEGACY_LIST_TITLES = False
+
+    transport = CapturingTransport()
+    transport.lists[500] = f'mailing_list_{get_unique_hash(RECIPIENTS)}'
+    Client(API_KEY, PLATFORM, session=transport).create_email_campaign(RECIPIENTS, dict(EMAIL_DATA))
+    assert len(transport.get_calls('createList')) == 1
+
+
+def test_legacy_title_is_not_hashed_without_mailing_lists(monkeypatch):
+    def get_unique_hash(obj):
+        raise AssertionError('legacy title is computed')
+
+    monkeypatch.setattr(simple_client, 'get_unique_hash', get_unique_hash)
+    transport = CapturingTransport()
+    transport.lists.update({500: 'Newsletter', 501: 'mailing_list_news'})
+    SimpleClient(API_KEY, PLATFORM, session=transport).create_email_campaign(RECIPIENTS, dict(EMAIL_DATA))
+    assert len(transport.get_calls('createList')) == 1
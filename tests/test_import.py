@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import pytest
+from unisender import SimpleClient
+from unisender.simple_client import ImportResult
+from tests.utils import API_KEY, PLATFORM, CapturingTransport, RejectingTransport, get_import_rows
+
+
+def make_recipients(count: int, prefix: str = 'user'):
+    return [{'email': f'{prefix}{i}@example.com', 'name': f'Name {i}'} for i in range(count)]
+
+
+def test_add_batch_shifts_log_index_by_offset():
+    result = ImportResult()
+    result.add_batch(500, {'total': 3, 'inserted': 2, 'invalid': 1, 'log': [{'index': 1, 'code': 'invalid_email'}]})
+    result.add_batch(0, {'total': 500, 'updated': 500, 'log': [{'index': '7', 'code': 'invalid_email'}]})
+    result.add_error(503, 10, Exception('timeout'))
+    result.sort()
+    assert result.batches == 3
+    assert (result.total, result.inserted, result.updated, result.invalid) == (503, 2, 500, 1)
+    assert [row['index'] for row in result.log] == [7, 501]
+    assert result.errors == [{'offset': 503, 'size': 10, 'error': 'timeout'}]
+
+
+def test_stream_splits_recipients_to_batches():
+    transport = CapturingTransport()
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    result = client.import_contacts_stream(iter(make_recipients(1201)), email_list_ids=[7], batch_size=500)
+
+    requests = transport.get_calls('importContacts')
+    assert sorted(len(get_import_rows(request)) for request in requests) == [201, 500, 500]
+    assert (result.batches, result.total, result.inserted, result.errors) == (3, 1201, 1201, [])
+    emails = sorted(row['email'] for request in requests for row in get_import_rows(request))
+    assert emails == sorted(recipient['email'] for recipient in make_recipients(1201))
+    row = get_import_rows(requests[0])[0]
+    assert (row['email_list_ids'], row['email_status']) == ('7', 'active')
+    assert transport.get_calls('createField')[0].params['name'] == 'name'
+
+
+def test_stream_maps_row_errors_to_input_positions():
+    transport = RejectingTransport()
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    recipients = make_recipients(10)
+    recipients[3]['email'] = 'bad3@example'
+    recipients[8]['email'] = 'bad8@example'
+    result = client.import_contacts_stream(recipients, batch_size=4, workers=3)
+
+    assert [row['index'] for row in result.log] == [3, 8]
+    assert (result.total, result.inserted, result.invalid) == (10, 8, 2)
+
+
+def test_failed_batch_does_not_stop_import():
+    transport = CapturingTransport(errors={
+        'importContacts': lambda request: 'Internal error' if b'user5%40' in request.body else None,
+    })
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, max_retries=0)
+    result = client.import_contacts_stream(make_recipients(9), batch_size=3, workers=2)
+
+    assert result.batches == 3
+    assert result.total == 6
+    assert len(result.errors) == 1
+    assert (result.errors[0]['offset'], result.errors[0]['size']) == (3, 3)
+    assert 'Internal error' in result.errors[0]['error']
+
+
+def test_input_error_stops_import_and_is_raised():
+    def recipients():
+        yield from make_recipients(5)
+        raise ValueError('broken input')
+
+    transport = CapturingTransport()
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    with pytest.raises(ValueError, match='broken input'):
+        client.import_contacts_stream(recipients(), batch_size=2, workers=2)
+    assert len(transport.get_calls('importContacts')) <= 2
+
+
+def test_empty_recipients_are_rejected():
+    client = SimpleClient(API_KEY, PLATFORM, session=CapturingTransport())
+    with pytest.raises(Exception, match='UniSender client error'):
+        client.import_contacts_stream(iter([]))
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from unisender import AsyncSimpleClient, SimpleClient
+from tests.utils import API_KEY, PLATFORM, AsyncCapturingTransport, CapturingTransport
+
+RECIPIENTS = [{'email': f'user{i}@example.com'} for i in range(3)]
+EMAIL_DATA = {'sender_name': 'Shop', 'sender_email': 'shop@example.com', 'subject': 'News', 'body': '<b>Hi</b>'}
+
+
+def make_client(**kwargs):
+    transport = CapturingTransport()
+    transport.lists.update({101: 'alpha', 102: 'beta', 103: 'beta'})
+    transport.fields['name'] = {'id': 10, 'type': 'string'}
+    return SimpleClient(API_KEY, PLATFORM, session=transport, **kwargs), transport
+
+
+def test_lists_are_requested_once():
+    client, transport = make_client()
+    assert client.find_list_id('alpha') == 101
+    assert client.find_list_id('beta') == 103
+    assert client.find_list_id('missing') is None
+    assert client.find_list_ids(['alpha', 'missing']) == {'alpha': 101, 'missing': None}
+    assert len(transport.get_calls('getLists')) == 1
+
+
+def test_created_list_is_indexed_without_reload():
+    client, transport = make_client()
+    client.find_list_id('alpha')
+    list_id = client.create_list(title='gamma').json()['result']['id']
+    assert client.find_list_id('gamma') == list_id
+    assert len(transport.get_calls('getLists')) == 1
+
+
+def test_list_changes_reload_index():
+    client, transport = make_client()
+    client.find_list_id('alpha')
+    client.update_list(list_id=101, title='renamed')
+    assert client.find_list_id('renamed') == 101
+    assert client.find_list_id('alpha') is None
+    client.delete_list(list_id=101)
+    assert client.find_list_id('renamed') is None
+    assert len(transport.get_calls('getLists')) == 3
+
+
+def test_missing_fields_are_created_once():
+    client, transport = make_client()
+    client.create_fields(['name', 'email', 'email_list_ids', 'city'])
+    client.create_fields(['city', 'name'])
+    assert [request.params['name'] for request in transport.get_calls('createField')] == ['city']
+    assert len(transport.get_calls('getFields')) == 1
+
+
+def test_refresh_and_index_ttl(monkeypatch):
+    client, transport = make_client(index_ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr('unisender.simple_client.time.monotonic', lambda: now[0])
+    client.find_list_id('alpha')
+    now[0] += 59
+    client.find_list_id('alpha')
+    assert len(transport.get_calls('getLists')) == 1
+    now[0] += 1
+    transport.lists[104] = 'delta'
+    assert client.find_list_id('delta') == 104
+    transport.lists[105] = 'epsilon'
+    client.refresh()
+    assert client.find_list_id('epsilon') == 105
+    assert (len(transport.get_calls('getLists')), len(transport.get_calls('getFields'))) == (3, 1)
+
+
+def test_campaign_list_created_outside_client_is_found():
+    client, transport = make_client()
+    client.find_list_id('alpha')
+    transport.lists[104] = SimpleClient._get_list_title(RECIPIENTS)
+    client.create_email_campaign(RECIPIENTS, dict(EMAIL_DATA))
+    assert transport.get_calls('createList') == []
+    assert transport.get_calls('createEmailMessage')[0].params['list_id'] == '104'
+    assert len(transport.get_calls('getLists')) == 2
+
+
+def test_async_campaign_list_created_outside_client_is_found():
+    async def create():
+        async with AsyncSimpleClient(API_KEY, PLATFORM, session=transport) as client:
+            await client.find_list_id('alpha')
+            transport.lists[104] = SimpleClient._get_list_title(RECIPIENTS)
+            await client.create_email_campaign(RECIPIENTS, dict(EMAIL_DATA))
+
+    transport = AsyncCapturingTransport()
+    transport.lists[101] = 'alpha'
+    asyncio.run(create())
+    assert transport.get_calls('createList') == []
+    assert transport.get_calls('createEmailMessage')[0].params['list_id'] == '104'
+    assert len(transport.get_calls('getLists')) == 2
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import pytest
+import requests
+from unisender import Client, Instrumentation, JSONLinesExporter, Metrics, PrometheusExporter, ResponseCache
+from tests.utils import API_KEY, PLATFORM, ScriptedTransport
+
+RETRY_CONF = {'max_retries': 2, 'retry_backoff': 0.001, 'retry_max_backoff': 0.01}
+
+
+def make_client(script=(), instrumentation=True, **kwargs):
+    transport = ScriptedTransport(script)
+    client = Client(API_KEY, PLATFORM, session=transport, instrumentation=instrumentation, **dict(RETRY_CONF, **kwargs))
+    return client, transport
+
+
+def test_hooks_receive_events():
+    instrumentation = Instrumentation()
+    calls = []
+    instrumentation.on_before(lambda event: calls.append(('before', event.method, event.request_bytes > 0)))
+    instrumentation.on_after(lambda event: calls.append(('after', event.method, event.status_code)))
+    instrumentation.on_error(lambda event: calls.append(('error', event.method, event.get_error_label())))
+    client, _ = make_client([(200, {'error': 'Invalid list', 'code': 'invalid_arg'}, None)], instrumentation)
+    client.get_lists()
+    client.get_fields()
+    assert calls == [
+        ('before', 'get_lists', True), ('after', 'get_lists', 200), ('error', 'get_lists', 'invalid_arg'),
+        ('before', 'get_fields', True), ('after', 'get_fields', 200),
+    ]
+
+
+def test_metrics_count_requests_retries_and_errors():
+    client, _ = make_client([(503, {}, None), (200, {'result': []}, None), (404, {}, None)])
+    client.get_lists()
+    client.get_fields()
+    snapshot = client.metrics.snapshot()
+    assert snapshot['counters']['requests'] == {'get_lists': 1, 'get_fields': 1}
+    assert snapshot['counters']['retries'] == {'get_lists': 1}
+    assert snapshot['errors'] == [{'method': 'get_fields', 'code': 'http_404', 'count': 1}]
+    latency = snapshot['histograms']['latency']['get_lists']
+    assert latency['count'] == 1
+    assert latency['buckets']['+Inf'] == 1
+
+
+def test_transport_errors_are_recorded():
+    client, _ = make_client([requests.ConnectionError('refused')] * 3)
+    with pytest.raises(requests.ConnectionError):
+        client.get_lists()
+    snapshot = client.metrics.snapshot()
+    assert snapshot['counters']['requests'] == {'get_lists': 1}
+    assert snapshot['counters']['retries'] == {'get_lists': 2}
+    assert snapshot['errors'] == [{'method': 'get_lists', 'code': 'ConnectionError', 'count': 1}]
+
+
+def test_cache_hits_are_counted():
+    client, transport = make_client(cache=ResponseCache(ttl={'get_lists': 60}))
+    client.get_lists()
+    client.get_lists()
+    counters = client.metrics.snapshot()['counters']
+    assert counters['requests'] == {'get_lists': 2}
+    assert counters['cache_hits'] == {'get_lists': 1}
+    assert client.metrics.snapshot()['histograms']['wire_time']['get_lists']['count'] == 1
+    assert len(transport.calls) == 1
+
+
+def test_client_without_instrumentation_has_no_metrics():
+    client, _ = make_client(instrumentation=None)
+    assert client.metrics is None
+    client.get_lists()
+
+
+def test_exporters(tmp_path):
+    metrics = Metrics(bounds=(0.1, 1.0))
+    client, _ = make_client([(200, {'error': 'Try later', 'code': 'a"b'}, None)], Instrumentation(metrics))
+    client.create_list(title='A')
+    text = PrometheusExporter(prefix='app').render(metrics)
+    assert '# TYPE app_requests_total counter' in text
+    assert 'app_requests_total{method="create_list"} 1' in text
+    assert 'app_errors_total{method="create_list",code="a\\"b"} 1' in text
+    assert 'app_latency_seconds_bucket{method="create_list",le="+Inf"} 1' in text
+
+    path = str(tmp_path / 'metrics.prom')
+    PrometheusExporter(path).export(metrics)
+    with open(path) as fh:
+        assert 'unisender_requests_total{method="create_list"} 1' in fh.read()
+
+    file = io.StringIO()
+    JSONLinesExporter(file).export(metrics)
+    record = json.loads(file.getvalue())
+    assert record['counters']['requests'] == {'create_list': 1}
+    assert 'time' in record
+    metrics.reset()
+    assert metrics.snapshot()['counters']['requests'] == {}
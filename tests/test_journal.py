@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+import pytest
+from unisender import SimpleClient, SQLiteJobJournal
+from tests.utils import API_KEY, PLATFORM, CapturingTransport, get_import_rows
+
+RECIPIENTS = [{'email': f'user{i}@example.com', 'name': f'Name {i}'} for i in range(10)]
+EMAIL_DATA = {'sender_name': 'Shop', 'sender_email': 'shop@example.com', 'subject': 'News', 'body': '<b>Hi</b>'}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = SQLiteJobJournal(str(tmp_path / 'journal.sqlite'))
+    yield journal
+    journal.close()
+
+
+def fail_once(message: str):
+    failures = [message]
+    return lambda request: failures.pop() if failures else None
+
+
+def count_calls(transport) -> dict:
+    counts = {}
+    for method, _ in transport.calls:
+        counts[method] = counts.get(method, 0) + 1
+    return counts
+
+
+def test_job_steps_survive_reopening(tmp_path):
+    path = str(tmp_path / 'journal.sqlite')
+    journal = SQLiteJobJournal(path)
+    job = journal.job('report', '2024-01-01')
+    job.set('uploaded', {'id': 7})
+    job.add_batch(0, 500)
+    journal.close()
+
+    journal = SQLiteJobJournal(path)
+    job = journal.job('report', '2024-01-01')
+    assert job.get('uploaded') == {'id': 7}
+    assert job.batches == {(0, 500)}
+    assert journal.job('report', '2024-01-02').steps == {}
+    job.finish()
+    assert journal.job('report', '2024-01-01').steps == {}
+    assert journal.load_batches(job.key) == set()
+    journal.close()
+
+
+def test_import_skips_batches_recorded_by_job(journal):
+    transport = CapturingTransport(errors={
+        'importContacts': lambda request: 'Server error' if b'user5%40' in request.body else None,
+    })
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, max_retries=0)
+    job = journal.job('import', 'contacts')
+    result = client.import_contacts_stream(RECIPIENTS, batch_size=3, workers=2, job=job)
+    assert [(error['offset'], error['size']) for error in result.errors] == [(3, 3)]
+    assert journal.load_batches(job.key) == {(0, 3), (6, 3), (9, 1)}
+
+    transport.errors.clear()
+    transport.calls.clear()
+    result = client.import_contacts_stream(RECIPIENTS, batch_size=3, job=journal.job('import', 'contacts'))
+    requests = transport.get_calls('importContacts')
+    assert [row['email'] for row in get_import_rows(requests[0])] == [f'user{i}@example.com' for i in (3, 4, 5)]
+    assert (len(requests), result.batches, result.errors) == (1, 1, [])
+
+
+def test_import_with_other_batch_size_sends_everything(journal):
+    transport = CapturingTransport()
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    job = journal.job('import', 'contacts')
+    client.import_contacts_stream(RECIPIENTS, batch_size=3, job=job)
+    transport.calls.clear()
+    client.import_contacts_stream(RECIPIENTS, batch_size=4, job=job)
+    assert len(transport.get_calls('importContacts')) == 3
+
+
+def test_campaign_resumes_after_failed_step(journal):
+    transport = CapturingTransport(errors={'createCampaign': fail_once('Server error')})
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, journal=journal, max_retries=0)
+    with pytest.raises(Exception, match='Server error'):
+        client.create_email_campaign(RECIPIENTS, dict(EMAIL_DATA))
+    first = count_calls(transport)
+    assert (first['createList'], first['importContacts'], first['createEmailMessage']) == (1, 1, 1)
+
+    transport.calls.clear()
+    campaign_id = client.create_email_campaign(RECIPIENTS, dict(EMAIL_DATA))
+    assert count_calls(transport) == {'createCampaign': 1}
+    assert isinstance(campaign_id, int)
+    assert journal._conn.execute('SELECT COUNT(*) FROM unisender_journal').fetchone()[0] == 0
+
+
+def test_campaign_retry_with_the_same_data_objects(journal):
+    transport = CapturingTransport(errors={'createCampaign': fail_once('Server error')})
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, journal=journal, max_retries=0)
+    email_data = dict(EMAIL_DATA)
+    campaign_data = {'start_time': datetime(2030, 1, 2, 3, 4), 'timezone': 'UTC'}
+    with pytest.raises(Exception, match='Server error'):
+        client.create_email_campaign(RECIPIENTS, email_data, campaign_data)
+    assert email_data == EMAIL_DATA
+    assert campaign_data == {'start_time': datetime(2030, 1, 2, 3, 4), 'timezone': 'UTC'}
+
+    transport.calls.clear()
+    assert isinstance(client.create_email_campaign(RECIPIENTS, email_data, campaign_data), int)
+    assert count_calls(transport) == {'createCampaign': 1}
+    assert transport.get_calls('createCampaign')[0].params['start_time'] == '2030-01-02 03:04'
+
+
+def test_campaign_pipeline_keeps_jobs_of_failed_campaigns(journal):
+    transport = CapturingTransport(errors={
+        'createEmailMessage': lambda request: 'Invalid body' if request.params.get('subject') == 'Second' else None,
+    })
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, journal=journal, max_retries=0)
+    campaigns = [{'email_data': dict(EMAIL_DATA, subject=subject)} for subject in ('First', 'Second')]
+    results = client.create_email_campaigns_pipeline(campaigns, RECIPIENTS)
+    assert [result.ok for result in results] == [True, False]
+
+    transport.errors.clear()
+    transport.calls.clear()
+    campaigns = [{'email_data': dict(EMAIL_DATA, subject=subject)} for subject in ('First', 'Second')]
+    results = client.create_email_campaigns_pipeline(campaigns, RECIPIENTS)
+    assert [result.ok for result in results] == [True, True]
+    assert count_calls(transport) == {'createEmailMessage': 1, 'createCampaign': 1}
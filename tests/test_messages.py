@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import pytest
+from unisender import AsyncSimpleClient, MessageCache, SimpleClient, SQLiteCacheBackend
+from unisender.response import get_result
+from tests.utils import API_KEY, PLATFORM, AsyncCapturingTransport, CapturingTransport
+
+BODY = '<html>' + 'x' * 5000 + '</html>'
+
+
+def make_message(body: str = BODY, **data) -> dict:
+    message = dict(sender_name='Sender', sender_email='sender@example.com', subject='Subject', body=body, list_id=1)
+    message.update(data)
+    return message
+
+
+def make_client(transport=None, message_cache=True) -> SimpleClient:
+    transport = transport or CapturingTransport()
+    return SimpleClient(API_KEY, PLATFORM, session=transport, max_retries=0, message_cache=message_cache)
+
+
+def test_message_cache_key_and_split():
+    cache = MessageCache(min_size=10)
+    key = cache.get_key(API_KEY, make_message())
+    assert key == cache.get_key(API_KEY, make_message(list_id=2, sender_name='Other'))
+    assert key != cache.get_key(API_KEY, make_message(BODY + ' '))
+    assert key != cache.get_key('other-key', make_message())
+    assert cache.get_key(API_KEY, make_message('short')) is None
+    assert cache.get_key(API_KEY, make_message(template_id=5)) is None
+    template_data, message_data = cache.split(make_message())
+    assert template_data == {'subject': 'Subject', 'body': BODY}
+    assert message_data == {'sender_name': 'Sender', 'sender_email': 'sender@example.com', 'list_id': 1}
+
+
+def test_repeated_body_is_uploaded_once():
+    transport = CapturingTransport()
+    client = make_client(transport)
+    for list_id in (1, 2, 3):
+        client.create_email_message(**make_message(list_id=list_id))
+    templates = transport.get_calls('createEmailTemplate')
+    messages = transport.get_calls('createEmailMessage')
+    assert len(templates) == 1
+    assert templates[0].params['body'] == BODY
+    assert [request.params['template_id'] for request in messages] == ['1', '1', '1']
+    assert all('body' not in request.params for request in messages)
+    assert [request.params['list_id'] for request in messages] == ['1', '2', '3']
+
+
+def test_messages_are_not_cached_without_message_cache():
+    transport = CapturingTransport()
+    make_client(transport, message_cache=None).create_email_message(**make_message())
+    assert transport.get_calls('createEmailTemplate') == []
+    assert transport.get_calls('createEmailMessage')[0].params['body'] == BODY
+
+
+def test_template_is_kept_across_restarts(tmp_path):
+    path = str(tmp_path / 'templates.sqlite')
+    transport = CapturingTransport()
+    make_client(transport, MessageCache(SQLiteCacheBackend(path))).create_email_message(**make_message())
+    make_client(transport, MessageCache(SQLiteCacheBackend(path))).create_email_message(**make_message())
+    assert len(transport.get_calls('createEmailTemplate')) == 1
+
+
+def test_deleted_template_is_created_again():
+    deleted = {'1'}
+    transport = CapturingTransport(errors={
+        'createEmailMessage': lambda request: (
+            ('Template not found', 'template_not_found') if request.params.get('template_id') in deleted else None
+        ),
+    })
+    client = make_client(transport)
+    assert get_result(client.create_email_message(**make_message())) == {'message_id': 3}
+    assert get_result(client.create_email_message(**make_message())) == {'message_id': 4}
+    assert [request.params['template_id'] for request in transport.get_calls('createEmailMessage')] == ['1', '2', '2']
+    assert len(transport.get_calls('createEmailTemplate')) == 2
+
+
+def test_other_errors_keep_cached_template():
+    failures = ['Server error']
+    transport = CapturingTransport(errors={
+        'createEmailMessage': lambda request: failures.pop() if failures else None,
+    })
+    client = make_client(transport)
+    with pytest.raises(Exception, match='Server error') as error:
+        client.create_email_message(**make_message())
+    assert error.value.code == 'invalid_arg'
+    client.create_email_message(**make_message())
+    assert len(transport.get_calls('createEmailTemplate')) == 1
+    assert [request.params['template_id'] for request in transport.get_calls('createEmailMessage')] == ['1', '1']
+
+
+def test_concurrent_messages_create_one_template():
+    transport = CapturingTransport(latency=0.02)
+    client = make_client(transport)
+    threads = [
+        threading.Thread(target=client.create_email_message, kwargs=make_message(list_id=i)) for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(transport.get_calls('createEmailTemplate')) == 1
+    assert len(transport.get_calls('createEmailMessage')) == 8
+    assert len(client._message_locks) == 0
+
+
+def test_async_concurrent_messages_create_one_template():
+    transport = AsyncCapturingTransport(latency=0.02)
+
+    async def send():
+        async with AsyncSimpleClient(API_KEY, PLATFORM, session=transport, message_cache=True) as client:
+            await asyncio.gather(*(client.create_email_message(**make_message(list_id=i)) for i in range(8)))
+
+    asyncio.run(send())
+    assert len(transport.get_calls('createEmailTemplate')) == 1
+    assert {request.params['template_id'] for request in transport.get_calls('createEmailMessage')} == {'1'}
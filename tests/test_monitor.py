@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import pytest
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from unisender import AsyncCampaignMonitor, AsyncClient, CampaignMonitor, Client
+from unisender.monitor import CampaignStatus, parse_start_time
+from tests.utils import API_KEY, PLATFORM, AsyncCapturingTransport, CapturingTransport
+
+
+class StatusMixin(object):
+
+    """ Answers `getCampaignStatus` with the next scripted status of campaign, the last one is repeated """
+
+    def __init__(self, statuses, **kwargs):
+        super().__init__(**kwargs)
+        self.statuses = {str(campaign_id): list(items) for campaign_id, items in statuses.items()}
+
+    def api_getCampaignStatus(self, request) -> dict:
+        with self._lock:
+            statuses = self.statuses[request.params['campaign_id']]
+            status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        return {'status': status, 'creation_time': '2024-01-01 00:00:00', 'start_time': '2024-01-01 00:00'}
+
+
+class StatusTransport(StatusMixin, CapturingTransport):
+    pass
+
+
+class AsyncStatusTransport(StatusMixin, AsyncCapturingTransport):
+    pass
+
+
+def make_monitor(statuses, **kwargs):
+    transport = StatusTransport(statuses)
+    client = Client(API_KEY, PLATFORM, session=transport)
+    kwargs = dict(dict(interval=0.01, min_interval=0.0, max_interval=0.02), **kwargs)
+    return CampaignMonitor(client, list(statuses), **kwargs), transport
+
+
+def test_parse_start_time():
+    assert parse_start_time('2024-05-01 10:30') == datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc)
+    assert parse_start_time('2024-05-01 10:30:15') == datetime(2024, 5, 1, 10, 30, 15, tzinfo=timezone.utc)
+    assert parse_start_time('') is None
+    assert parse_start_time('soon') is None
+
+
+def test_watch_streams_status_changes():
+    changes = []
+    monitor, transport = make_monitor(
+        {1: ['scheduled', 'in_progress', 'completed'], 2: ['canceled']}, on_change=changes.append
+    )
+    with monitor:
+        seen = [(campaign.campaign_id, campaign.previous_status, campaign.status) for campaign in monitor.watch(5)]
+    assert [change for change in seen if change[0] == 1] == [
+        (1, None, 'scheduled'), (1, 'scheduled', 'in_progress'), (1, 'in_progress', 'completed'),
+    ]
+    assert [change for change in seen if change[0] == 2] == [(2, None, 'canceled')]
+    assert len(changes) == 4
+    assert monitor.active == []
+    assert len(transport.get_calls('getCampaignStatus')) == 4
+
+
+def test_stats_are_requested_for_sending_campaigns():
+    monitor, transport = make_monitor({1: ['scheduled', 'completed']}, stats=True)
+    with monitor:
+        result = monitor.run(5)
+    assert result[1].status == 'completed'
+    assert result[1].stats['delivered'] == 0
+    assert len(transport.get_calls('getCampaignCommonStats')) == 1
+
+
+def test_subclass_terminal_statuses_are_used():
+    class Monitor(CampaignMonitor):
+        TERMINAL_STATUSES = CampaignMonitor.TERMINAL_STATUSES | {'analysed'}
+
+    transport = StatusTransport({1: ['in_progress', 'analysed', 'completed']})
+    with Monitor(Client(API_KEY, PLATFORM, session=transport), [1], interval=0.01, min_interval=0.0) as monitor:
+        assert monitor.run(5)[1].status == 'analysed'
+    assert monitor.active == []
+    assert len(transport.get_calls('getCampaignStatus')) == 2
+
+
+def test_interval_adapts_to_status():
+    monitor = CampaignMonitor(None, interval=10, min_interval=5, max_interval=60)
+    campaign = CampaignStatus(1)
+    campaign.status = 'waits_censor'
+    assert monitor.get_interval(campaign, changed=True) == 10
+    campaign.interval = 40
+    assert monitor.get_interval(campaign, changed=False) == 60
+    campaign.start_time = datetime.now(timezone.utc) + timedelta(seconds=20)
+    assert 5 <= monitor.get_interval(campaign, changed=False) <= 20
+    campaign.start_time = datetime.now(timezone.utc) - timedelta(seconds=20)
+    assert monitor.get_interval(campaign, changed=False) == 10
+    campaign.status = 'in_progress'
+    campaign.error = Exception('timeout')
+    assert monitor.get_interval(campaign, changed=False) == 60
+
+
+def test_failed_check_is_kept_and_retried():
+    monitor, transport = make_monitor({1: ['in_progress']})
+    transport.errors['getCampaignStatus'] = lambda request: 'Server error'
+    with monitor:
+        assert monitor.poll() == []
+        assert 'Server error' in str(monitor.campaigns[1].error)
+        transport.errors.clear()
+        monitor.campaigns[1].next_check = 0
+        assert [campaign.status for campaign in monitor.poll()] == ['in_progress']
+        assert monitor.campaigns[1].error is None
+
+
+def test_check_of_finished_future_does_not_deadlock():
+    monitor = CampaignMonitor(None)
+    future = Future()
+    future.set_result(({'status': 'completed'}, None))
+
+    class FinishedExecutor(object):
+        def submit(self, fn, *args):
+            return future
+
+    monitor._executor = FinishedExecutor()
+    thread = threading.Thread(target=monitor.check, args=(1,), daemon=True)
+    thread.start()
+    thread.join(2)
+    assert not thread.is_alive()
+    assert monitor._in_flight == {}
+
+
+def test_async_monitor():
+    transport = AsyncStatusTransport({1: ['scheduled', 'completed'], 2: ['in_progress', 'stopped']})
+
+    async def watch():
+        async with AsyncClient(API_KEY, PLATFORM, session=transport) as client:
+            async with AsyncCampaignMonitor(client, [1, 2], interval=0.01, min_interval=0.0) as monitor:
+                return [(campaign.campaign_id, campaign.status) async for campaign in monitor.watch(5)]
+
+    seen = asyncio.run(watch())
+    assert sorted(seen) == [(1, 'completed'), (1, 'scheduled'), (2, 'in_progress'), (2, 'stopped')]
+
+
+def test_async_monitor_close_waits_for_cancelled_checks():
+    finished = []
+
+    async def close():
+        monitor = AsyncCampaignMonitor(None, [1])
+
+        async def fetch(campaign_id):
+            try:
+                await asyncio.sleep(10)
+            finally:
+                finished.append(campaign_id)
+
+        monitor._fetch = fetch
+        task = monitor.check(1)
+        await asyncio.sleep(0)
+        await monitor.close()
+        assert finished == [1]
+        return task
+
+    assert asyncio.run(close()).cancelled()
+
+
+def test_async_monitor_requires_async_context():
+    with pytest.raises(TypeError, match='async with AsyncCampaignMonitor'):
+        with AsyncCampaignMonitor(None):
+            pass
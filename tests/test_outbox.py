@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import time
+import pytest
+from unisender import Client, ContactOutbox, SimpleClient, SQLiteOutboxSpool
+from unisender.outbox import merge_states
+from tests.utils import API_KEY, PLATFORM, CapturingTransport, RejectingTransport, get_import_rows
+
+
+def make_outbox(transport=None, client_class=Client, **kwargs):
+    transport = transport or CapturingTransport()
+    client = client_class(API_KEY, PLATFORM, session=transport, max_retries=0)
+    kwargs.setdefault('flush_interval', 60)
+    return ContactOutbox(client, **kwargs), transport
+
+
+def imported_rows(transport) -> list:
+    return [row for request in transport.get_calls('importContacts') for row in get_import_rows(request)]
+
+
+def test_merge_states_applies_newer_changes():
+    older = {'fields': {'Name': 'John', 'City': 'Rome'}, 'lists': {'1': 'subscribe', '2': 'subscribe'}}
+    newer = {'fields': {'City': 'Oslo'}, 'lists': {'2': 'exclude'}}
+    assert merge_states(older, newer) == {
+        'fields': {'Name': 'John', 'City': 'Oslo'}, 'lists': {'1': 'subscribe', '2': 'exclude'},
+    }
+    assert merge_states(None, newer) is newer
+    assert merge_states(older, None) is older
+
+
+def test_operations_on_one_email_are_coalesced():
+    outbox, transport = make_outbox()
+    outbox.subscribe('John@Example.com', [1, 2], fields={'Name': 'John'})
+    outbox.update('john@example.com', {'City': 'Oslo'})
+    outbox.exclude('john@example.com', '2,3')
+    assert len(outbox) == 1
+    assert outbox.flush(timeout=5)
+    outbox.close()
+
+    requests = transport.get_calls('importContacts')
+    assert len(requests) == 1
+    assert requests[0].params['overwrite_lists'] == '0'
+    assert imported_rows(transport) == [{
+        'email': 'john@example.com', 'City': 'Oslo', 'Name': 'John', 'email_list_ids': '1',
+        'email_status': 'active', 'email_excluded_list_ids': '2,3',
+    }]
+    assert (outbox.imported, outbox.rejected, len(outbox)) == (1, 0, 0)
+
+
+def test_contacts_with_different_columns_are_imported_separately():
+    outbox, transport = make_outbox()
+    outbox.subscribe('a@example.com', 1)
+    outbox.subscribe('b@example.com', 1)
+    outbox.unsubscribe('c@example.com', 1)
+    outbox.flush(timeout=5)
+    outbox.close()
+    groups = sorted(len(get_import_rows(request)) for request in transport.get_calls('importContacts'))
+    assert groups == [1, 2]
+
+
+def test_full_batch_is_sent_without_flush():
+    outbox, transport = make_outbox(batch_size=3)
+    for i in range(3):
+        outbox.subscribe(f'user{i}@example.com', 1)
+    deadline = time.monotonic() + 5
+    while len(outbox) and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert len(transport.get_calls('importContacts')) == 1
+    outbox.close()
+
+
+def test_full_outbox_rejects_new_emails():
+    outbox, _ = make_outbox(max_pending=2, block=False)
+    outbox.subscribe('a@example.com', 1)
+    outbox.subscribe('b@example.com', 1)
+    outbox.update('a@example.com', {'Name': 'A'})
+    with pytest.raises(Exception, match='outbox is full'):
+        outbox.subscribe('c@example.com', 1)
+    outbox.close()
+
+
+def test_invalid_operations_are_rejected():
+    outbox, _ = make_outbox()
+    with pytest.raises(Exception, match='list_ids'):
+        outbox.subscribe('a@example.com', [])
+    with pytest.raises(Exception, match='should not be empty'):
+        outbox.update('', {'Name': 'A'})
+    with pytest.raises(Exception, match='set by outbox actions'):
+        outbox.update('a@example.com', {'email_list_ids': '1'})
+    outbox.close()
+    with pytest.raises(Exception, match='closed'):
+        outbox.subscribe('a@example.com', 1)
+
+
+def test_failed_import_is_retried():
+    failures = ['Server error']
+    transport = CapturingTransport(errors={'importContacts': lambda request: failures.pop() if failures else None})
+    outbox, _ = make_outbox(transport, flush_interval=0.05)
+    outbox.subscribe('a@example.com', 1)
+    assert not outbox.flush(timeout=5)
+    assert 'Server error' in str(outbox.last_error)
+    outbox.subscribe('a@example.com', 2)
+    assert outbox.flush(timeout=5)
+    outbox.close()
+    rows = [get_import_rows(request)[0] for request in transport.get_calls('importContacts')]
+    assert [row['email_list_ids'] for row in rows] == ['1', '1,2']
+
+
+def test_rows_rejected_by_api_are_reported():
+    errors = []
+    outbox, _ = make_outbox(RejectingTransport(), on_error=lambda email, error: errors.append(email))
+    outbox.subscribe('good@example.com', 1)
+    outbox.subscribe('bad@example.com', 1)
+    assert outbox.flush(timeout=5)
+    outbox.close()
+    assert errors == ['bad@example.com']
+    assert (outbox.imported, outbox.rejected) == (1, 1)
+
+
+def test_pending_contacts_survive_restart(tmp_path):
+    path = str(tmp_path / 'outbox.sqlite')
+    transport = CapturingTransport(errors={'importContacts': lambda request: 'Server error'})
+    outbox, _ = make_outbox(transport, spool=SQLiteOutboxSpool(path))
+    outbox.subscribe('a@example.com', 1, fields={'Name': 'A'})
+    outbox.unsubscribe('b@example.com', 2)
+    outbox.close()
+    outbox.spool.close()
+
+    spool = SQLiteOutboxSpool(path)
+    assert [email for email, _ in spool.load()] == ['a@example.com', 'b@example.com']
+    outbox, transport = make_outbox(spool=spool, client_class=SimpleClient)
+    assert len(outbox) == 2
+    assert outbox.flush(timeout=5)
+    outbox.close()
+    assert sorted(row['email'] for row in imported_rows(transport)) == ['a@example.com', 'b@example.com']
+    assert [request.params['name'] for request in transport.get_calls('createField')] == ['Name']
+    assert spool.load() == []
+    spool.close()
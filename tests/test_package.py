@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import subprocess
+import sys
+import pytest
+import unisender
+from unisender import Client
+from tests.utils import API_KEY, PLATFORM, CapturingTransport
+
+
+@pytest.mark.parametrize('name', unisender.__all__)
+def test_public_names_are_exported(name):
+    value = getattr(unisender, name)
+    assert value.__name__ == name
+    assert name in dir(unisender)
+
+
+def test_unknown_name_raises_attribute_error():
+    with pytest.raises(AttributeError):
+        unisender.NoSuchClient
+    with pytest.raises(ImportError):
+        from unisender import NoSuchClient  # noqa: F401
+
+
+def test_package_import_does_not_load_optional_modules():
+    code = (
+        'import sys, unisender; from unisender import Client; '
+        'print(",".join(sorted(m for m in ("httpx", "sqlite3", "unisender.async_client", "requests") '
+        'if m in sys.modules)))'
+    )
+    output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE, universal_newlines=True)
+    assert output.stdout.strip() == ''
+
+
+def test_config_is_per_instance_and_read_only():
+    first = Client(API_KEY, PLATFORM, lang='ru', max_retries=0)
+    second = Client('other-key', PLATFORM)
+    assert (first._config['lang'], second._config['lang']) == ('ru', 'en')
+    assert Client.DEFAULT_CONF['lang'] == 'en'
+    with pytest.raises(TypeError):
+        first._config['lang'] = 'it'
+    with pytest.raises(TypeError):
+        Client.DEFAULT_CONF['lang'] = 'it'
+
+
+def test_api_methods_are_dispatched_to_camel_case_urls():
+    transport = CapturingTransport()
+    client = Client(API_KEY, PLATFORM, session=transport, base_url='https://api.example.com', lang='ru')
+    response = client.get_campaign_status(campaign_id=5)
+    assert response.request.url == 'https://api.example.com/ru/api/getCampaignStatus'
+    assert transport.get_calls('getCampaignStatus')[0].params == {
+        'api_key': API_KEY, 'platform': PLATFORM, 'format': 'json', 'campaign_id': '5',
+    }
+    assert Client.get_campaign_status.__name__ == 'get_campaign_status'
+
+
+def test_unknown_api_method_is_rejected():
+    client = Client(API_KEY, PLATFORM)
+    with pytest.raises(AttributeError):
+        client.drop_account()
+    with pytest.raises(AttributeError):
+        client._private_method
+
+
+def test_subclass_registers_extra_api_methods():
+    class ExtendedClient(Client):
+        _api_methods = Client._api_methods | {'get_senders'}
+
+    transport = CapturingTransport()
+    ExtendedClient(API_KEY, PLATFORM, session=transport).get_senders()
+    assert transport.calls[0][0] == 'getSenders'
+    assert not hasattr(Client, 'get_senders')
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import threading
+from datetime import datetime
+import pytest
+from unisender import SimpleClient, SQLiteJobJournal
+from tests.utils import API_KEY, PLATFORM, CapturingTransport
+
+RECIPIENTS = [{'email': f'user{i}@example.com', 'Name': f'Name {i}'} for i in range(5)]
+DEFAULT_EMAIL_DATA = {'sender_name': 'Sender', 'sender_email': 'sender@example.com', 'body': '<p>Hi</p>'}
+
+
+class ConcurrencyTransport(CapturingTransport):
+
+    """ Counts max number of requests in flight """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.max_active = 0
+        self._active_lock = threading.Lock()
+
+    def post(self, url: str, data=None, headers=None, **kwargs):
+        with self._active_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            return super().post(url, data=data, headers=headers, **kwargs)
+        finally:
+            with self._active_lock:
+                self.active -= 1
+
+
+def make_campaigns(*subjects) -> list:
+    return [{'email_data': {'subject': subject}} for subject in subjects]
+
+
+def test_pipeline_prepares_list_once():
+    transport = ConcurrencyTransport(latency=0.02)
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    results = client.create_email_campaigns_pipeline(
+        make_campaigns('A', 'B', 'C', 'D'), RECIPIENTS, DEFAULT_EMAIL_DATA, workers=4
+    )
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert all(result.ok for result in results)
+    assert len({result.campaign_id for result in results}) == 4
+    assert len(transport.get_calls('createList')) == 1
+    assert len(transport.get_calls('importContacts')) == 1
+    messages = transport.get_calls('createEmailMessage')
+    assert sorted(request.params['subject'] for request in messages) == ['A', 'B', 'C', 'D']
+    assert {request.params['list_id'] for request in messages} == {'1'}
+    assert len(transport.get_calls('createCampaign')) == 4
+    assert transport.max_active > 1
+
+
+def test_failed_campaign_does_not_stop_others():
+    transport = CapturingTransport(errors={
+        'createEmailMessage': lambda request: 'Invalid subject' if request.params['subject'] == 'B' else None,
+    })
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    campaigns = [{'email_data': dict(DEFAULT_EMAIL_DATA, subject=subject)} for subject in ('A', 'B', 'C')]
+    campaigns.append({'email_data': {'subject': 'D'}})
+    results = client.create_email_campaigns_pipeline(campaigns, RECIPIENTS)
+    assert [result.ok for result in results] == [True, False, True, False]
+    assert 'Invalid subject' in str(results[1].error)
+    assert 'Please fill correct "email_data" fields' in str(results[3].error)
+    assert len(transport.get_calls('createCampaign')) == 2
+
+
+def test_create_email_campaigns_raises_first_failure():
+    transport = CapturingTransport(errors={
+        'createEmailMessage': lambda request: 'Invalid subject' if request.params['subject'] == 'B' else None,
+    })
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    with pytest.raises(Exception, match='Invalid subject.*Campaign number: 1'):
+        client.create_email_campaigns(make_campaigns('A', 'B', 'C'), RECIPIENTS, DEFAULT_EMAIL_DATA)
+    assert len(transport.get_calls('createCampaign')) == 2
+    client = SimpleClient(API_KEY, PLATFORM, session=CapturingTransport())
+    assert len(client.create_email_campaigns(make_campaigns('A', 'C'), RECIPIENTS, DEFAULT_EMAIL_DATA)) == 2
+
+
+def test_pipeline_retry_with_the_same_data_objects(tmp_path):
+    journal = SQLiteJobJournal(str(tmp_path / 'journal.sqlite'))
+    failures = ['Server error', None]
+    transport = CapturingTransport(errors={'createCampaign': lambda request: failures.pop() if failures else None})
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, journal=journal, max_retries=0)
+    email_data = {'subject': 'News'}
+    campaign_data = {'start_time': datetime(2030, 1, 2, 3, 4)}
+    campaigns = [
+        {'email_data': email_data, 'campaign_data': campaign_data},
+        {'email_data': email_data, 'campaign_data': campaign_data},
+    ]
+    default_campaign_data = {'timezone': 'UTC'}
+    results = client.create_email_campaigns_pipeline(
+        campaigns, RECIPIENTS, DEFAULT_EMAIL_DATA, default_campaign_data, workers=1
+    )
+    assert [result.ok for result in results] == [True, False]
+    assert campaigns == [
+        {'email_data': {'subject': 'News'}, 'campaign_data': {'start_time': datetime(2030, 1, 2, 3, 4)}},
+    ] * 2
+    assert default_campaign_data == {'timezone': 'UTC'}
+
+    transport.calls.clear()
+    results = client.create_email_campaigns_pipeline(
+        campaigns, RECIPIENTS, DEFAULT_EMAIL_DATA, default_campaign_data, workers=1
+    )
+    assert [result.ok for result in results] == [True, True]
+    assert [method for method, _ in transport.calls] == ['createCampaign']
+    params = transport.get_calls('createCampaign')[0].params
+    assert (params['start_time'], params['timezone']) == ('2030-01-02 03:04', 'UTC')
+    journal.close()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import pytest
+from unisender import SimpleClient, response as response_module
+from unisender.response import get_error, get_error_code, get_payload, get_result, has_error, loads
+from unisender.transport import build_async_response, build_response
+from tests.utils import API_KEY, PLATFORM, ScriptedTransport
+
+URL = 'https://api.unisender.com/en/api/getLists?format=json'
+
+
+def make_response(content: bytes, status_code: int = 200):
+    return build_response(URL, content, status_code)
+
+
+def test_payload_is_decoded_once(monkeypatch):
+    response = make_response(b'{"result": [{"id": 1, "title": "A"}]}')
+    calls = []
+    monkeypatch.setattr(response_module, 'loads', lambda content: calls.append(content) or {'result': []})
+    assert get_result(response) == []
+    assert get_payload(response) == {'result': []}
+    assert not has_error(response)
+    assert len(calls) == 1
+
+
+def test_body_without_error_is_not_decoded(monkeypatch):
+    monkeypatch.setattr(response_module, 'loads', pytest.fail)
+    response = make_response(b'{"result": {"id": 1}}')
+    assert not has_error(response)
+    assert get_error(response) is None
+    assert get_error_code(response) is None
+
+
+@pytest.mark.parametrize('content, status_code, error, code, failed', [
+    (b'{"error": "Invalid list", "code": "invalid_arg"}', 200, 'Invalid list', 'invalid_arg', True),
+    (b'{"result": {"title": "\\"error\\""}}', 200, None, None, False),
+    (b'{"error": null, "result": []}', 200, None, None, False),
+    (b'<html>Bad gateway</html>', 502, None, None, True),
+    (b'{"error": "Rate limit", "code": "retry_later"}', 503, 'Rate limit', None, True),
+    (b'', 404, None, None, True),
+])
+def test_error_helpers(content, status_code, error, code, failed):
+    response = make_response(content, status_code)
+    assert get_error(response) == error
+    assert get_error_code(response) == code
+    assert has_error(response) is failed
+
+
+@pytest.mark.parametrize('content', [b'<html>Bad gateway "error"</html>', b'<html>Proxy login</html>', b''])
+def test_error_of_non_json_body_is_raised(content):
+    response = make_response(content)
+    with pytest.raises(ValueError):
+        get_error(response)
+    assert has_error(response)
+    assert get_error_code(response) is None
+
+
+def test_client_rejects_non_json_body():
+    transport = ScriptedTransport([(200, b'<html>Proxy login</html>', None)])
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, max_retries=0)
+    with pytest.raises(ValueError):
+        client.get_lists()
+
+
+def test_loads_falls_back_to_json():
+    assert loads(b'{"result": "\\ud800"}') == {'result': '\ud800'}
+    assert loads('{"result": {"id": 18446744073709551615, "title": "текст"}}'.encode('utf-8')) == {
+        'result': {'id': 18446744073709551615, 'title': 'текст'},
+    }
+
+
+def test_async_response_helpers():
+    pytest.importorskip('httpx')
+    response = build_async_response(URL, b'{"error": "Invalid list", "code": "invalid_arg"}')
+    assert (get_error(response), get_error_code(response), has_error(response)) == ('Invalid list', 'invalid_arg', True)
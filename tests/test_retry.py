@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from unisender import Client
+from unisender.retry import RetryPolicy, TokenBucket
+from tests.utils import API_KEY, PLATFORM, ScriptedTransport
+
+RETRY_CONF = {'max_retries': 2, 'retry_backoff': 0.001, 'retry_max_backoff': 0.01}
+
+
+def make_client(script, **kwargs):
+    transport = ScriptedTransport(script)
+    return Client(API_KEY, PLATFORM, session=transport, **dict(RETRY_CONF, **kwargs)), transport
+
+
+def connect_error():
+    reason = NewConnectionError(None, 'Connection refused')
+    return requests.ConnectionError(MaxRetryError(None, 'https://api.unisender.com', reason))
+
+
+@pytest.mark.parametrize('method, idempotent', [
+    ('get_lists', True), ('export_contacts', True), ('import_contacts', True), ('delete_list', True),
+    ('create_campaign', False), ('send_email', False), ('subscribe', False), ('create_list', False),
+])
+def test_idempotent_methods(method, idempotent):
+    assert RetryPolicy().is_idempotent(method) is idempotent
+
+
+def test_should_retry_rules():
+    policy = RetryPolicy(max_retries=2)
+    started = 0.0
+    assert policy.should_retry('get_lists', 0, started, status_code=503)
+    assert not policy.should_retry('create_campaign', 0, started, status_code=503)
+    assert policy.should_retry('create_campaign', 0, started, status_code=429)
+    assert policy.should_retry('send_email', 0, started, error_code='api_call_limit_exceeded_for_api_key')
+    assert policy.should_retry('get_lists', 0, started, error_code='retry_later')
+    assert not policy.should_retry('get_lists', 0, started, status_code=400)
+    assert not policy.should_retry('get_lists', 0, started, error_code='invalid_arg')
+    assert policy.should_retry('create_campaign', 0, started, error=Exception(), sent=False)
+    assert not policy.should_retry('create_campaign', 0, started, error=Exception(), sent=True)
+    assert not policy.should_retry('get_lists', 2, started, status_code=503)
+
+
+def test_should_retry_stops_after_max_elapsed(monkeypatch):
+    policy = RetryPolicy(max_retries=10, max_elapsed=5.0)
+    monkeypatch.setattr('unisender.retry.time.monotonic', lambda: 104.0)
+    assert policy.should_retry('get_lists', 1, 100.0, status_code=503)
+    monkeypatch.setattr('unisender.retry.time.monotonic', lambda: 105.0)
+    assert not policy.should_retry('get_lists', 1, 100.0, status_code=503)
+
+
+def test_delay_uses_jitter_and_retry_after():
+    policy = RetryPolicy(backoff=0.5, max_backoff=3.0)
+    for attempt in range(6):
+        assert 0 <= policy.get_delay(attempt) <= min(3.0, 0.5 * 2 ** attempt)
+    assert policy.get_delay(0, '2') == 2.0
+    assert policy.get_delay(0, '120') == 3.0
+    assert 0 <= policy.get_delay(0, 'Wed, 21 Oct 2015 07:28:00 GMT') <= 0.5
+
+
+def test_client_retries_server_error_of_idempotent_method():
+    client, transport = make_client([(503, {}, None), (200, {'error': 'Try later', 'code': 'retry_later'}, None)])
+    response = client.get_lists()
+    assert response.status_code == 200
+    assert response.json()['result'] == []
+    assert len(transport.get_calls('getLists')) == 3
+
+
+def test_client_does_not_retry_server_error_of_unsafe_method():
+    client, transport = make_client([(503, {}, None)])
+    assert client.create_campaign(message_id=1).status_code == 503
+    assert len(transport.get_calls('createCampaign')) == 1
+
+
+def test_client_retries_rate_limited_unsafe_method():
+    client, transport = make_client([
+        (429, {}, {'Retry-After': '0'}),
+        (200, {'error': 'Limit exceeded', 'code': 'api_call_limit_exceeded_for_api_key'}, None),
+    ])
+    assert 'campaign_id' in client.create_campaign(message_id=1).json()['result']
+    assert len(transport.get_calls('createCampaign')) == 3
+
+
+def test_client_gives_up_after_max_retries():
+    client, transport = make_client([(502, {}, None)] * 5)
+    assert client.get_lists().status_code == 502
+    assert len(transport.get_calls('getLists')) == 3
+
+
+def test_client_retries_connect_error_of_any_method():
+    client, transport = make_client([connect_error()])
+    assert 'campaign_id' in client.create_campaign(message_id=1).json()['result']
+    assert len(transport.get_calls('createCampaign')) == 2
+
+
+def test_client_does_not_repeat_unsafe_request_lost_after_sending():
+    client, transport = make_client([requests.ReadTimeout('read timeout')])
+    with pytest.raises(requests.ReadTimeout):
+        client.create_campaign(message_id=1)
+    client, transport = make_client([requests.ReadTimeout('read timeout')])
+    assert client.get_lists().status_code == 200
+
+
+def test_token_bucket_allows_burst_then_spaces_requests(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('unisender.retry.time.monotonic', lambda: now[0])
+    bucket = TokenBucket(rate_per_minute=60, burst=2)
+    assert [bucket.reserve(), bucket.reserve()] == [0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.reserve() == pytest.approx(2.0)
+    now[0] += 10.0
+    assert [bucket.reserve(), bucket.reserve(), bucket.reserve()] == [0.0, 0.0, pytest.approx(1.0)]
+
+
+def test_client_rate_limit_sleeps_between_requests(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr('unisender.retry.time.sleep', sleeps.append)
+    client, transport = make_client([], rate_limit=600, rate_limit_burst=1)
+    for _ in range(3):
+        client.get_lists()
+    assert len(transport.get_calls('getLists')) == 3
+    assert sleeps == [pytest.approx(0.1, abs=0.01), pytest.approx(0.2, abs=0.01)]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from unisender import Client
+from tests.utils import API_KEY, PLATFORM, CapturingTransport
+
+
+def test_session_is_created_once_and_closed():
+    client = Client(API_KEY, PLATFORM, pool_maxsize=20, pool_block=True)
+    session = client.session
+    assert client.session is session
+    assert session.headers['Connection'] == 'keep-alive'
+    adapter = session.get_adapter(client._get_request_url('get_lists'))
+    assert (adapter._pool_maxsize, adapter._pool_block) == (20, True)
+    client.close()
+    assert client._session is None
+    assert client.session is not session
+    client.close()
+
+
+def test_host_pools_get_own_adapters():
+    client = Client(API_KEY, PLATFORM, host_pools={'https://proxy.example.com': {'pool_maxsize': 50}})
+    with client:
+        adapter = client.session.get_adapter('https://proxy.example.com/en/api/getLists')
+        assert adapter._pool_maxsize == 50
+        assert client.session.get_adapter(client._get_request_url('get_lists')) is not adapter
+
+
+def test_injected_transport_is_not_closed():
+    transport = CapturingTransport()
+    closed = []
+    transport.close = lambda: closed.append(True)
+    with Client(API_KEY, PLATFORM, session=transport) as client:
+        client.get_lists()
+        client.get_fields()
+    assert closed == []
+    assert [method for method, _ in transport.calls] == ['getLists', 'getFields']
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import pytest
+from unisender import AsyncSimpleClient, SimpleClient, SQLiteSyncStore
+from unisender.simple_client import ImportResult
+from unisender.sync import ContactDiff
+from tests.utils import API_KEY, PLATFORM, AsyncCapturingTransport, CapturingTransport, RejectingTransport, \
+    get_import_rows
+
+LIST_ID = 42
+
+
+def make_contacts(count: int, version: int = 1) -> list:
+    return [{'email': f'user{i}@example.com', 'name': f'Name {i} v{version}'} for i in range(count)]
+
+
+def imported_emails(transport) -> list:
+    return sorted(row['email'] for request in transport.get_calls('importContacts') for row in get_import_rows(request))
+
+
+@pytest.fixture
+def store():
+    store = SQLiteSyncStore(':memory:')
+    yield store
+    store.close()
+
+
+def test_second_sync_uploads_changed_contacts_only(store):
+    transport = CapturingTransport()
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, sync_store=store)
+    result = client.sync_contacts(make_contacts(10), LIST_ID)
+    assert (result.inserted, result.updated, result.unchanged) == (10, 0, 0)
+    assert len(store.load(LIST_ID)) == 10
+
+    contacts = make_contacts(10)
+    contacts[4]['name'] = 'Changed'
+    contacts.append({'email': 'NEW@example.com ', 'name': 'New'})
+    transport.calls.clear()
+    result = client.sync_contacts(contacts, LIST_ID)
+    assert (result.inserted, result.updated, result.unchanged) == (1, 1, 9)
+    assert imported_emails(transport) == ['NEW@example.com ', 'user4@example.com']
+
+    transport.calls.clear()
+    result = client.sync_contacts(contacts, LIST_ID)
+    assert result.import_result is None
+    assert transport.get_calls('importContacts') == []
+
+
+def test_removed_contacts_are_excluded_and_forgotten(store):
+    transport = CapturingTransport()
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, sync_store=store)
+    client.sync_contacts(make_contacts(5), LIST_ID)
+    result = client.sync_contacts(make_contacts(3), LIST_ID, removed='exclude')
+    assert sorted(result.removed) == ['user3@example.com', 'user4@example.com']
+    assert sorted(request.params['contact'] for request in transport.get_calls('exclude')) == result.removed
+    assert sorted(store.load(LIST_ID)) == [f'user{i}@example.com' for i in range(3)]
+    with pytest.raises(Exception, match='Unknown removed contacts action'):
+        client.sync_contacts(make_contacts(3), LIST_ID, removed='delete')
+
+
+def test_contacts_of_failed_batches_are_retried(store):
+    transport = CapturingTransport(errors={
+        'importContacts': lambda request: 'Server error' if b'user3%40' in request.body else None,
+    })
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, sync_store=store, max_retries=0)
+    client.sync_contacts(make_contacts(6), LIST_ID, batch_size=2)
+    assert sorted(store.load(LIST_ID)) == [f'user{i}@example.com' for i in (0, 1, 4, 5)]
+
+    transport.errors.clear()
+    transport.calls.clear()
+    result = client.sync_contacts(make_contacts(6), LIST_ID, batch_size=2)
+    assert (result.inserted, result.unchanged) == (2, 4)
+    assert imported_emails(transport) == ['user2@example.com', 'user3@example.com']
+
+
+def test_rows_rejected_by_api_are_retried(store):
+    transport = RejectingTransport()
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, sync_store=store)
+    contacts = make_contacts(6)
+    contacts[1]['email'] = 'bad1@example.com'
+    contacts[4]['email'] = 'bad4@example.com'
+    result = client.sync_contacts(contacts, LIST_ID, batch_size=4)
+    assert [row['index'] for row in result.import_result.log] == [1, 4]
+    assert 'bad1@example.com' not in store.load(LIST_ID)
+    assert 'bad4@example.com' not in store.load(LIST_ID)
+    assert len(store.load(LIST_ID)) == 4
+
+    transport.calls.clear()
+    result = client.sync_contacts(contacts, LIST_ID)
+    assert imported_emails(transport) == ['bad1@example.com', 'bad4@example.com']
+
+
+def test_repeated_email_is_uploaded_once(store):
+    transport = CapturingTransport()
+    client = SimpleClient(API_KEY, PLATFORM, session=transport, sync_store=store)
+    contacts = make_contacts(3) + [{'email': 'User1@Example.com', 'name': 'Other'}, make_contacts(3)[2]]
+    result = client.sync_contacts(contacts, LIST_ID)
+    assert (result.inserted, result.duplicates) == (3, 2)
+    assert imported_emails(transport) == [f'user{i}@example.com' for i in range(3)]
+
+    transport.calls.clear()
+    result = client.sync_contacts(contacts, LIST_ID)
+    assert (result.inserted, result.updated, result.unchanged, result.duplicates) == (0, 0, 3, 2)
+    assert transport.get_calls('importContacts') == []
+
+
+def test_diff_excludes_failed_and_rejected_positions():
+    diff = ContactDiff({})
+    list(diff.filter(make_contacts(6)))
+    result = ImportResult()
+    result.add_error(2, 2, Exception('timeout'))
+    result.add_batch(0, {'log': [{'index': 1}]})
+    result.add_batch(4, {'log': [{'index': 1}]})
+    assert [email for email, _ in diff.get_imported(result)] == ['user0@example.com', 'user4@example.com']
+
+
+def test_async_sync_matches_sync(store):
+    async def sync(contacts):
+        async with AsyncSimpleClient(API_KEY, PLATFORM, session=transport, sync_store=store) as client:
+            return await client.sync_contacts(contacts, LIST_ID, removed='unsubscribe', batch_size=3)
+
+    transport = AsyncCapturingTransport()
+    result = asyncio.run(sync(make_contacts(7)))
+    assert (result.inserted, result.duplicates) == (7, 0)
+    result = asyncio.run(sync(make_contacts(5, version=2) + make_contacts(1)))
+    assert (result.updated, result.duplicates, len(result.removed)) == (5, 1, 2)
+    assert len(transport.get_calls('unsubscribe')) == 2
+    assert len(store.load(LIST_ID)) == 5
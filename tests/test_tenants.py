@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+import pytest
+from unisender import AsyncClientPool, ClientPool, FairScheduler, SimpleClient
+from unisender.tenants import AsyncFairScheduler
+from tests.utils import PLATFORM, CapturingTransport
+
+
+class PoolWithTransport(ClientPool):
+
+    """ Client pool sharing dry-run transport instead of HTTP session """
+
+    transport = None
+
+    @property
+    def session(self):
+        return self.transport
+
+
+def test_scheduler_grants_slots_round_robin():
+    scheduler = FairScheduler(max_concurrency=1)
+    scheduler.acquire('busy')
+    order = []
+    threads = []
+
+    def request(tenant):
+        scheduler.acquire(tenant)
+        order.append(tenant)
+        scheduler.release(tenant)
+
+    for tenant in ['busy', 'busy', 'busy', 'quiet']:
+        thread = threading.Thread(target=request, args=(tenant,))
+        thread.start()
+        threads.append(thread)
+        while sum(len(waiters) for waiters in scheduler._waiters.values()) < len(threads):
+            time.sleep(0.001)
+    scheduler.release('busy')
+    for thread in threads:
+        thread.join(5)
+    assert order == ['busy', 'quiet', 'busy', 'busy']
+    assert scheduler.active == 0
+
+
+def test_tenant_quota_limits_requests_in_flight():
+    scheduler = FairScheduler(max_concurrency=10, tenant_concurrency=2)
+    scheduler.set_quota('small', 1)
+    scheduler.acquire('small')
+    scheduler.acquire('big')
+    scheduler.acquire('big')
+    assert not scheduler._can_start('small')
+    assert not scheduler._can_start('big')
+    assert scheduler._can_start('other')
+    scheduler.remove('small')
+    assert scheduler.get_quota('small') == 2
+    assert scheduler._can_start('small')
+
+
+def test_removed_quota_releases_waiting_requests():
+    scheduler = FairScheduler(max_concurrency=10, tenant_concurrency=2)
+    scheduler.set_quota('tenant', 1)
+    scheduler.acquire('tenant')
+    waiting = threading.Thread(target=scheduler.acquire, args=('tenant',))
+    waiting.start()
+    while not scheduler._waiters:
+        time.sleep(0.001)
+    scheduler.remove('tenant')
+    waiting.join(5)
+    assert not waiting.is_alive()
+    assert scheduler.get_active('tenant') == 2
+
+
+def test_pool_hands_out_one_client_per_api_key():
+    pool = PoolWithTransport(SimpleClient, max_concurrency=4, platform=PLATFORM, max_retries=0)
+    pool.transport = CapturingTransport()
+    first = pool.get('key-1', concurrency=1)
+    assert pool.get('key-1') is first
+    second = pool.get('key-2', rate_limit=60)
+    first.get_lists()
+    second.get_lists()
+    api_keys = [request.params['api_key'] for request in pool.transport.get_calls('getLists')]
+    assert api_keys == ['key-1', 'key-2']
+    assert pool.scheduler.get_quota('key-1') == 1
+    assert second._rate_limiter is not None and first._rate_limiter is None
+    assert pool.scheduler.active == 0
+
+    pool.remove('key-1')
+    assert len(pool) == 1
+    assert 'key-1' not in pool.scheduler.quotas
+    assert pool.get('key-1') is not first
+
+
+def test_async_pool_requires_async_with():
+    with pytest.raises(TypeError, match='async with'):
+        with AsyncClientPool():
+            pass
+
+
+def test_async_scheduler_shares_slots():
+    async def run():
+        scheduler = AsyncFairScheduler(max_concurrency=2)
+        peak = []
+
+        async def request(tenant):
+            await scheduler.acquire(tenant)
+            peak.append(scheduler.active)
+            await asyncio.sleep(0.001)
+            scheduler.release(tenant)
+
+        await asyncio.gather(*[request(f'tenant-{i % 3}') for i in range(12)])
+        return max(peak), scheduler.active
+
+    max_active, active = asyncio.run(run())
+    assert (max_active, active) == (2, 0)
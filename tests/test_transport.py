@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import gzip
+import pytest
+from unisender import (
+    AsyncDryRunTransport, AsyncRecordingTransport, AsyncReplayTransport, AsyncSimpleClient, DryRunTransport,
+    RecordingTransport, ReplayTransport, SimpleClient,
+)
+from unisender.response import get_error_code, get_result
+from unisender.transport import DryRunRequest, get_request_key
+from tests.utils import API_KEY, PLATFORM
+
+
+def create_list(client, title: str) -> int:
+    return get_result(client.create_list(title=title))['id']
+
+
+def test_dry_run_responses_have_api_shapes():
+    client = SimpleClient(API_KEY, PLATFORM, session=DryRunTransport(export_size=3))
+    list_id = create_list(client, 'Customers')
+    assert list_id == 1
+    assert get_result(client.get_lists()) == [{'id': 1, 'title': 'Customers'}]
+    response = client._api_request(
+        method='import_contacts', field_names=['email'], data=[['a@example.com'], ['b@example.com']]
+    )
+    assert get_result(response)['total'] == 2
+    response = client.export_contacts(field_names=['email', 'Name'], offset=1, limit=5)
+    assert get_result(response) == {
+        'field_names': ['email', 'Name'],
+        'data': [['contact_1@example.com', 'Name_1'], ['contact_2@example.com', 'Name_2']],
+    }
+    assert set(get_result(client.create_email_message(
+        sender_name='Sender', sender_email='sender@example.com', subject='Subject', body='<p>Hi</p>', list_id=1,
+    ))) == {'message_id'}
+
+
+def test_dry_run_keeps_lists_and_fields():
+    transport = DryRunTransport()
+    client = SimpleClient(API_KEY, PLATFORM, session=transport)
+    list_id = create_list(client, 'Old')
+    client.update_list(list_id=list_id, title='New')
+    client.create_list(title='Other')
+    client.delete_list(list_id=list_id)
+    assert transport.lists == {2: 'Other'}
+    client.create_field(name='City', type='string')
+    assert [field['name'] for field in get_result(client.get_fields())] == ['City']
+    assert transport.requests['createList'] == 2
+
+
+def test_dry_run_reports_unknown_methods():
+    transport = DryRunTransport()
+    response = transport.post('https://api.unisender.com/en/api/noSuchMethod?format=json', data='api_key=key')
+    assert get_error_code(response) == 'unknown_method'
+
+
+def test_dry_run_request_counts_import_rows():
+    body = 'field_names%5B0%5D=email&field_names%5B1%5D=Name&data%5B0%5D%5B0%5D=a&data%5B0%5D%5B1%5D=A' \
+           '&data%5B1%5D%5B0%5D=b&data%5B1%5D%5B1%5D=B'
+    request = DryRunRequest('importContacts', body)
+    assert request.count_rows() == 2
+    assert request.get_list('field_names') == ['email', 'Name']
+
+
+def test_request_key_ignores_api_key():
+    assert get_request_key(b'api_key=one&title=a') == get_request_key(b'api_key=two&title=a')
+    assert get_request_key(b'title=a&api_key=one') == get_request_key(b'title=a')
+    assert get_request_key(b'title=a') != get_request_key(b'title=b')
+
+
+def record_campaign(path: str) -> list:
+    with RecordingTransport(path, session=DryRunTransport()) as transport:
+        client = SimpleClient(API_KEY, PLATFORM, session=transport)
+        list_ids = [create_list(client, title) for title in ('first', 'second')]
+        assert transport.records == 2
+    return list_ids
+
+
+def test_recording_is_replayed(tmp_path):
+    path = str(tmp_path / 'campaign.jsonl.gz')
+    assert record_campaign(path) == [1, 2]
+    with gzip.open(path, 'rt', encoding='utf-8') as fh:
+        recording = fh.read()
+    assert API_KEY not in recording
+
+    transport = ReplayTransport(path, latency_scale=0)
+    assert len(transport) == 2
+    client = SimpleClient('other-key', PLATFORM, session=transport)
+    assert [create_list(client, title) for title in ('second', 'first')] == [2, 1]
+    assert create_list(client, 'third') == 1
+    assert transport.misses == 1
+
+
+def test_strict_replay_rejects_unrecorded_requests(tmp_path):
+    path = str(tmp_path / 'campaign.jsonl')
+    record_campaign(path)
+    client = SimpleClient(API_KEY, PLATFORM, session=ReplayTransport(path, latency_scale=0, strict=True))
+    assert create_list(client, 'first') == 1
+    with pytest.raises(Exception, match='No recorded response for "createList" request'):
+        client.create_list(title='third')
+    with pytest.raises(Exception, match='No recorded response for "getFields" request'):
+        client.get_fields()
+
+
+def test_async_transports(tmp_path):
+    path = str(tmp_path / 'campaign.jsonl.gz')
+
+    async def create_lists(transport, titles) -> list:
+        async with AsyncSimpleClient(API_KEY, PLATFORM, session=transport) as client:
+            return [get_result(await client.create_list(title=title))['id'] for title in titles]
+
+    async def record() -> list:
+        async with AsyncRecordingTransport(path, session=AsyncDryRunTransport()) as transport:
+            return await create_lists(transport, ('first', 'second'))
+
+    assert asyncio.run(record()) == [1, 2]
+    replay = AsyncReplayTransport(path, latency_scale=0)
+    assert asyncio.run(create_lists(replay, ('second', 'first'))) == [2, 1]
+    assert replay.misses == 0
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import json
+from unisender.transport import AsyncDryRunTransport, DryRunRequest, DryRunTransport, build_response, get_api_method
+
+API_KEY = 'test-key'
+PLATFORM = 'tests'
+
+
+class CapturingTransport(DryRunTransport):
+
+    """
+    Dry-run transport keeping params of every request
+
+    .. note::
+        `errors` maps API method to callable returning error message (or tuple of message and API error code)
+        for failed request or None,
+        e.g. {'importContacts': lambda request: 'invalid' if 'bad@example.com' in request.body.decode() else None}
+    """
+
+    def __init__(self, errors=None, **kwargs):
+        super().__init__(**kwargs)
+        self.errors = dict(errors or {})
+        self.calls = []
+
+    def handle(self, url: str, data, headers=None) -> bytes:
+        method = get_api_method(url)
+        request = DryRunRequest(method, data, headers)
+        with self._lock:
+            self.calls.append((method, request))
+        get_error = self.errors.get(method)
+        error = get_error(request) if get_error is not None else None
+        if error is not None:
+            error, code = error if isinstance(error, tuple) else (error, 'invalid_arg')
+            return json.dumps({'error': error, 'code': code}).encode('utf-8')
+        return super().handle(url, data, headers)
+
+    def get_calls(self, method: str) -> list:
+
+        """ Return requests of camel case API method in order of sending """
+
+        return [request for name, request in self.calls if name == method]
+
+
+class AsyncCapturingTransport(CapturingTransport, AsyncDryRunTransport):
+
+    """ Asyncio version of `CapturingTransport` """
+
+
+class RejectingTransport(CapturingTransport):
+
+    """ Rejects import rows of emails starting with "bad" by row-level `log` entries """
+
+    def api_importContacts(self, request: DryRunRequest) -> dict:
+        rows = get_import_rows(request)
+        log = [
+            {'index': index, 'code': 'invalid_email', 'message': 'Invalid email'}
+            for index, row in enumerate(rows) if row['email'].startswith('bad')
+        ]
+        return {
+            'total': len(rows), 'inserted': len(rows) - len(log), 'updated': 0, 'deleted': 0,
+            'new_emails': len(rows) - len(log), 'invalid': len(log), 'log': log,
+        }
+
+
+def get_import_rows(request: DryRunRequest) -> list:
+
+    """ Return `data` matrix of `importContacts` request as list of rows """
+
+    params = request.params
+    field_names = request.get_list('field_names')
+    rows = {}
+    for key, value in params.items():
+        if key.startswith('data['):
+            row, column = key[5:-1].split('][')
+            rows.setdefault(int(row), {})[field_names[int(column)]] = value
+    return [rows[index] for index in sorted(rows)]
+
+
+class ScriptedTransport(CapturingTransport):
+
+    """
+    Dry-run transport answering with scripted responses first
+
+    .. note::
+        `script` items are (status code, JSON body or raw bytes, headers) tuples
+        or exceptions raised instead of response,
+        requests after the script get dry-run responses.
+    """
+
+    def __init__(self, script=(), **kwargs):
+        super().__init__(**kwargs)
+        self.script = list(script)
+
+    def post(self, url: str, data=None, headers=None, **kwargs):
+        if not self.script:
+            return super().post(url, data=data, headers=headers, **kwargs)
+        method = get_api_method(url)
+        with self._lock:
+            self.calls.append((method, DryRunRequest(method, data, headers)))
+        item = self.script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        status_code, payload, response_headers = item
+        content = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+        return build_response(url, content, status_code, response_headers)
@@ -1,2 +1,60 @@
-from unisender.client import Client
-from unisender.simple_client import SimpleClient
+from importlib import import_module
+
+_EXPORTS = {
+    'Client': 'unisender.client',
+    'SimpleClient': 'unisender.simple_client',
+    'ImportResult': 'unisender.simple_client',
+    'CampaignResult': 'unisender.simple_client',
+    'AsyncClient': 'unisender.async_client',
+    'AsyncSimpleClient': 'unisender.async_client',
+    'RetryPolicy': 'unisender.retry',
+    'TokenBucket': 'unisender.retry',
+    'ResponseCache': 'unisender.cache',
+    'MemoryCacheBackend': 'unisender.cache',
+    'SQLiteCacheBackend': 'unisender.cache',
+    'MessageCache': 'unisender.cache',
+    'Instrumentation': 'unisender.instrumentation',
+    'Metrics': 'unisender.instrumentation',
+    'RequestEvent': 'unisender.instrumentation',
+    'PrometheusExporter': 'unisender.instrumentation',
+    'JSONLinesExporter': 'unisender.instrumentation',
+    'SQLiteSyncStore': 'unisender.sync',
+    'SyncResult': 'unisender.sync',
+    'SQLiteJobJournal': 'unisender.journal',
+    'JournalJob': 'unisender.journal',
+    'ContactOutbox': 'unisender.outbox',
+    'SQLiteOutboxSpool': 'unisender.outbox',
+    'CampaignMonitor': 'unisender.monitor',
+    'AsyncCampaignMonitor': 'unisender.monitor',
+    'CampaignStatus': 'unisender.monitor',
+    'ClientPool': 'unisender.tenants',
+    'AsyncClientPool': 'unisender.tenants',
+    'FairScheduler': 'unisender.tenants',
+    'DryRunTransport': 'unisender.transport',
+    'AsyncDryRunTransport': 'unisender.transport',
+    'RecordingTransport': 'unisender.transport',
+    'AsyncRecordingTransport': 'unisender.transport',
+    'ReplayTransport': 'unisender.transport',
+    'AsyncReplayTransport': 'unisender.transport',
+    'BulkSender': 'unisender.bulk',
+    'AsyncBulkSender': 'unisender.bulk',
+    'SendResult': 'unisender.bulk',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+
+    """ Import public classes on first access, so `import unisender` does not load unused dependencies """
+
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'unisender' has no attribute '{name}'")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
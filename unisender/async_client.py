@@ -0,0 +1,702 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from itertools import chain
+from types import MappingProxyType
+from unisender.client import FORM_HEADERS, Client
+from unisender.columnar import get_column_names, iter_column_batches, iter_csv_batches, open_csv
+from unisender.export import WRITERS, iter_export_rows
+from unisender.response import get_result
+from unisender.simple_client import SimpleClient, ImportResult
+from unisender.sync import ContactDiff, SyncResult
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class AsyncClient(Client):
+
+    """
+    This class represents the asyncio client for low-level access
+    to the `UniSender API <https://www.unisender.com/ru/support/api/api/>`
+
+    .. note::
+        Requires `httpx` package: pip install unisender-python-client[async]
+        Any method registered in `_api_methods` returns awaitable,
+        no more than `max_concurrency` requests are sent at once.
+        Usage example:
+            async with AsyncClient(api_key, platform, max_concurrency=50) as cl:
+                responses = await asyncio.gather(*[
+                    cl.get_campaign_status(campaign_id=campaign_id) for campaign_id in campaign_ids
+                ])
+    """
+
+    DEFAULT_CONF = MappingProxyType(dict(Client.DEFAULT_CONF, max_concurrency=100))
+
+    def __init__(self, api_key: str, platform: str, session=None, **kwargs):
+
+        """
+        Configures async api client
+
+        :param api_key:  str, API key
+        :param platform: str, API tracking marker
+        :param session:  None|object, custom transport with `httpx.AsyncClient` compatible
+                         `post(url, content=..., headers=...)` coroutine, it is not closed by the client
+        :param max_concurrency: int, max number of API requests in flight
+        :param kwargs:   dict, see `Client.__init__`
+        """
+
+        super().__init__(api_key, platform, session=session, **kwargs)
+        self._semaphore = None
+
+    def _create_transport(self, pool_maxsize: int = None, **kwargs):
+
+        """
+        Create httpx transport with keep-alive connection pool
+
+        :param pool_maxsize: int, max number of connections per host, default from config
+        :param kwargs: dict, any other `httpx.AsyncHTTPTransport` params
+        """
+
+        pool_maxsize = pool_maxsize or self._config['pool_maxsize']
+        kwargs.pop('pool_connections', None)
+        kwargs.pop('pool_block', None)
+        return httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize),
+            **kwargs
+        )
+
+    def _create_session(self):
+
+        """ Create `httpx.AsyncClient` session for API requests """
+
+        if httpx is None:
+            raise ImportError('UniSender client error: AsyncClient requires "httpx" package')
+        mounts = {
+            prefix: self._create_transport(**pool_conf)
+            for prefix, pool_conf in (self._config['host_pools'] or {}).items()
+        }
+        return httpx.AsyncClient(transport=self._create_transport(), mounts=mounts)
+
+    def _get_transport_errors(self) -> tuple:
+        return (httpx.TransportError,) if httpx is not None else ()
+
+    def _is_connect_error(self, error: Exception) -> bool:
+
+        """ Check if transport error happened before request was sent """
+
+        return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+
+        """ Return semaphore limiting number of concurrent API requests """
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._config['max_concurrency'])
+        return self._semaphore
+
+    async def close(self) -> None:
+
+        """ Close pooled connections of the session created by client """
+
+        if self._session is not None and self._own_session:
+            await self._session.aclose()
+        self._session = None
+
+    def __enter__(self):
+
+        """ Sync context would not await `close`, session must be closed by `async with` """
+
+        raise TypeError(f'UniSender client error: Use "async with {type(self).__name__}(...)" instead of "with"')
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        raise TypeError(f'UniSender client error: Use "async with {type(self).__name__}(...)" instead of "with"')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _api_request(self, method: str, **kwargs):
+
+        """
+        Calls the API method by the given name and request data
+
+        :param method: str, snake case API method name
+        :param kwargs: dict, request data
+        :return: httpx.Response, API response obj
+        """
+
+        url = self._get_request_url(method)
+        event, body = self._start_request(method, url, kwargs)
+        response = self._get_cached_response(method, url, body)
+        if response is None:
+            try:
+                response = await self._send_request(method, url, body, event)
+            except Exception as e:
+                if event is not None:
+                    self._instrumentation.fail(event, e)
+                raise
+            self._update_cache(method, body, response)
+        elif event is not None:
+            event.cached = True
+        if event is not None:
+            self._finish_request(event, response)
+        self.after_request(response)
+        return response
+
+    async def _send_request(self, method: str, url: str, body: bytes, event=None):
+
+        """
+        Send request body, repeat it according to retry policy
+
+        :param method: str, snake case API method name
+        :param url: str, request url
+        :param body: bytes, urlencoded request body
+        :param event: None|RequestEvent, instrumentation event to count retries and wire time
+        :return: httpx.Response, API response obj of the last attempt
+        """
+
+        attempt = 0
+        started = time.monotonic()
+        data, headers = self._compress_request(body, event)
+        while True:
+            if self._rate_limiter is not None:
+                await asyncio.sleep(self._rate_limiter.reserve())
+            async with self.semaphore:
+                sent = time.perf_counter()
+                try:
+                    response = await self.session.post(url, content=data, headers=headers)
+                except self._get_transport_errors() as e:
+                    delay = self._get_retry_delay(method, attempt, started, error=e)
+                    if delay is None:
+                        raise
+                else:
+                    if self._is_compression_rejected(headers, response):
+                        data, headers = body, FORM_HEADERS
+                        continue
+                    delay = self._get_retry_delay(method, attempt, started, response=response)
+                    if delay is None:
+                        return response
+                finally:
+                    if event is not None:
+                        event.wire_time += time.perf_counter() - sent
+                        event.retries = attempt
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _build_cached_response(url: str, content: bytes):
+
+        """ Build response obj from cached response content """
+
+        return httpx.Response(200, content=content, request=httpx.Request('POST', url))
+
+
+class AsyncSimpleClient(AsyncClient, SimpleClient):
+
+    """ This class represents the asyncio client for simple mailing, see `SimpleClient` """
+
+    MESSAGE_LOCK_CLASS = asyncio.Lock
+
+    @staticmethod
+    async def _run_workers(worker, count: int) -> None:
+
+        """
+        Run `count` tasks of `worker` coroutine function until all of them finish
+
+        .. note::
+            Exception of any task cancels the others and is re-raised, so no task outlives the call.
+        """
+
+        tasks = [asyncio.ensure_future(worker()) for _ in range(count)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _get_list_index(self) -> dict:
+        if self._is_index_fresh('lists'):
+            return self._list_index
+        return self._load_list_index(get_result(await self.get_lists()))
+
+    async def _get_field_index(self) -> set:
+        if self._is_index_fresh('fields'):
+            return self._field_index
+        return self._load_field_index(get_result(await self.get_fields()))
+
+    async def refresh(self) -> None:
+
+        """ Reload list and field indexes """
+
+        lists, fields = await asyncio.gather(self.get_lists(), self.get_fields())
+        self._load_list_index(get_result(lists))
+        self._load_field_index(get_result(fields))
+
+    async def create_list(self, **data):
+
+        """ Create mailing list, see `createList` API method """
+
+        response = await self._api_request(method='create_list', **data)
+        self._index_created_list(data.get('title'), response)
+        return response
+
+    async def create_field(self, **data):
+
+        """ Create contacts field, see `createField` API method """
+
+        response = await self._api_request(method='create_field', **data)
+        self._index_created_field(data.get('name'), response)
+        return response
+
+    async def find_list_id(self, title: str):
+
+        """
+        Get mailing list id by the specified unique title, see `SimpleClient.find_list_id`
+
+        :param title: str, mailing list unique title
+        :return:  mailing list id or None
+        """
+
+        return (await self._get_list_index()).get(title)
+
+    async def _find_recipients_list_id(self, recipients: list, list_title: str):
+
+        """ Get id of mailing list created for recipients or None, see `SimpleClient._find_recipients_list_id` """
+
+        cached = self._is_index_fresh('lists')
+        list_id = self._match_recipients_list(await self._get_list_index(), recipients, list_title)
+        if list_id is None and cached:
+            index = self._load_list_index(get_result(await self.get_lists()))
+            list_id = self._match_recipients_list(index, recipients, list_title)
+        return list_id
+
+    async def find_list_ids(self, titles) -> dict:
+
+        """
+        Get mailing list ids for many titles in a single pass
+
+        :param titles: iterable, mailing list titles
+        :return: dict, title -> list id or None
+        """
+
+        index = await self._get_list_index()
+        return {title: index.get(title) for title in titles}
+
+    async def create_fields(self, field_names: list, field_type: str = 'string') -> None:
+
+        """
+        Create API contacts fields if not exist
+
+        :param field_names: list, names of creating fields
+        :param field_type: str, field type, one of: string, text, number, date, bool
+        """
+
+        field_index = await self._get_field_index()
+        await asyncio.gather(*[
+            self.create_field(name=field_name, type=field_type)
+            for field_name in self._get_missing_fields(field_index, field_names)
+        ])
+
+    async def import_contacts(self, recipients: list, email_list_ids=None):
+
+        """
+        Import and subscribe recipients list in API
+
+        :param recipients: list, of dictionaries that represents contacts data
+        :param email_list_ids: list, ids of the mailing lists to which created contacts will be subscribed
+        :return: httpx.Response
+        """
+
+        if not email_list_ids:
+            email_list_ids = []
+        field_names = self._create_contacts_field_names(recipients)
+        await self.create_fields(field_names)
+        return await self._import_contacts_batch(field_names, recipients, email_list_ids)
+
+    async def import_contacts_stream(self, recipients, email_list_ids=None,
+                                     batch_size=None, workers=None, job=None) -> ImportResult:
+
+        """
+        Import and subscribe recipients of any size by batches, see `SimpleClient.import_contacts_stream`
+
+        :param recipients: iterable, list or generator of dictionaries that represents contacts data
+        :param email_list_ids: list, ids of the mailing lists to which created contacts will be subscribed
+        :param batch_size: None|int, contacts per request, `IMPORT_BATCH_SIZE` by default
+        :param workers: None|int, number of parallel tasks, `IMPORT_WORKERS` by default
+        :param job: None|JournalJob, journal job recording imported batches, see `SQLiteJobJournal`
+        :return: ImportResult, combined result of all batches
+        """
+
+        email_list_ids = email_list_ids or []
+        field_names, batches = self._iter_import_batches(recipients, batch_size)
+        await self.create_fields(field_names)
+        return await self._run_import(
+            batches, lambda batch: self._import_contacts_batch(field_names, batch, email_list_ids), workers, job
+        )
+
+    async def _run_import(self, batches, send, workers=None, job=None) -> ImportResult:
+
+        """
+        Send import batches by concurrent tasks, see `SimpleClient._run_import`
+
+        .. note::
+            Exception raised by `batches` cancels the other tasks and is re-raised.
+        """
+
+        batches = self._skip_imported_batches(batches, job)
+        result = ImportResult()
+
+        async def worker():
+            for offset, batch in batches:
+                try:
+                    batch_result = get_result(await send(batch))
+                    if job is not None:
+                        job.add_batch(offset, len(batch))
+                    result.add_batch(offset, batch_result)
+                except Exception as e:
+                    result.add_error(offset, len(batch), e)
+
+        await self._run_workers(worker, workers or self.IMPORT_WORKERS)
+        result.sort()
+        return result
+
+    async def import_contacts_columns(self, columns, email_list_ids=None, batch_size=None,
+                                      workers=None) -> ImportResult:
+
+        """ Import and subscribe contacts given by columns, see `SimpleClient.import_contacts_columns` """
+
+        column_names = get_column_names(columns)
+        if not column_names:
+            raise Exception(self.ERROR_MESSAGES['email_recipients_empty'])
+        field_names, system_values = self._prepare_columns_import(column_names, email_list_ids)
+        batches = iter_column_batches(columns, column_names, batch_size or self.IMPORT_BATCH_SIZE)
+        await self.create_fields(field_names)
+        return await self._run_import(
+            batches, lambda batch: self._import_columns_batch(field_names, batch, system_values), workers
+        )
+
+    async def import_contacts_csv(self, file, email_list_ids=None, batch_size=None, workers=None,
+                                  encoding: str = 'utf-8', **csv_params) -> ImportResult:
+
+        """
+        Import and subscribe contacts from CSV file, see `SimpleClient.import_contacts_csv`
+
+        .. note::
+            File is read in the event loop thread by batches.
+        """
+
+        fh, reader = open_csv(file, encoding, **csv_params)
+        try:
+            column_names = next(reader, None)
+            if not column_names:
+                raise Exception(self.ERROR_MESSAGES['email_recipients_empty'])
+            field_names, system_values = self._prepare_columns_import(column_names, email_list_ids)
+            batches = iter_csv_batches(reader, len(column_names), batch_size or self.IMPORT_BATCH_SIZE)
+            await self.create_fields(field_names)
+            return await self._run_import(
+                batches, lambda batch: self._import_columns_batch(field_names, batch, system_values), workers
+            )
+        finally:
+            if fh is not None:
+                fh.close()
+
+    async def sync_contacts(self, recipients, list_id: int, removed=None, full: bool = False, store=None,
+                            batch_size=None, workers=None) -> SyncResult:
+
+        """
+        Incrementally synchronize mailing list with recipients, see `SimpleClient.sync_contacts`
+
+        .. note::
+            Sync store is local SQLite file, its calls are made in the event loop thread.
+        """
+
+        store = self._get_sync_store(store)
+        self._check_remove_method(removed)
+        if full:
+            store.clear(list_id)
+        diff = ContactDiff(store.load(list_id))
+        contacts = diff.filter(recipients)
+        import_result = None
+        first = next(contacts, None)
+        if first is not None:
+            import_result = await self.import_contacts_stream(
+                chain([first], contacts), email_list_ids=[list_id], batch_size=batch_size, workers=workers
+            )
+            store.save(list_id, diff.get_imported(import_result))
+
+        result = SyncResult(diff, import_result)
+        if removed is not None and result.removed:
+            queue = iter(result.removed)
+            removed_emails = []
+
+            async def worker():
+                for email in queue:
+                    try:
+                        await self._remove_contact(list_id, email, removed)
+                        removed_emails.append(email)
+                    except Exception as e:
+                        result.add_error(email, e)
+
+            await self._run_workers(worker, workers or self.IMPORT_WORKERS)
+            store.delete(list_id, removed_emails)
+        return result
+
+    async def _iter_export(self, field_names=None, page_size=None, prefetch=True, **params):
+
+        """
+        Iterate exported contacts rows page by page
+
+        :return: async generator of (field names, row list) pairs
+        """
+
+        limit = page_size or self.EXPORT_PAGE_SIZE
+        next_page = None
+        try:
+            offset = 0
+            response = await self._export_contacts_page(offset, limit, field_names, params)
+            while True:
+                offset += limit
+                names, rows = iter_export_rows(response.content, field_names)
+                if prefetch:
+                    rows = list(rows)
+                    if len(rows) == limit:
+                        next_page = asyncio.ensure_future(
+                            self._export_contacts_page(offset, limit, field_names, params)
+                        )
+                del response
+                count = 0
+                for row in rows:
+                    count += 1
+                    yield names, row
+                if count < limit:
+                    return
+                if next_page is not None:
+                    response = await next_page
+                    next_page = None
+                else:
+                    response = await self._export_contacts_page(offset, limit, field_names, params)
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def iter_export_contacts(self, field_names=None, columns=None, page_size=None, prefetch=True, **params):
+
+        """
+        Export contacts one by one with offset paging, see `SimpleClient.iter_export_contacts`
+
+        :return: async generator of dictionaries or tuples
+        """
+
+        indexes = None
+        async for names, row in self._iter_export(field_names, page_size, prefetch, **params):
+            if columns is None:
+                yield dict(zip(names, row))
+                continue
+            if indexes is None:
+                indexes = [names.index(column) for column in columns]
+            yield tuple(row[index] for index in indexes)
+
+    async def export_contacts_to_file(self, file, file_format: str = 'csv', field_names=None, page_size=None,
+                                      prefetch=True, **params) -> int:
+
+        """
+        Export contacts to CSV or NDJSON file at constant memory, see `SimpleClient.export_contacts_to_file`
+
+        :return: int, number of exported contacts
+        """
+
+        if isinstance(file, str):
+            with open(file, 'w', newline='', encoding='utf-8') as fh:
+                return await self.export_contacts_to_file(fh, file_format, field_names, page_size, prefetch, **params)
+
+        write = None
+        count = 0
+        async for names, row in self._iter_export(field_names, page_size, prefetch, **params):
+            if write is None:
+                write = WRITERS[file_format](file, names)
+            write(row)
+            count += 1
+        if write is None:
+            WRITERS[file_format](file, field_names or [])
+        return count
+
+    async def create_email_message(self, **data):
+
+        """
+        Create email message with given data
+
+        :param data: dict, email params
+        :return: httpx.Response
+        """
+
+        key = self._get_message_cache_key(data)
+        if key is None:
+            return await self._api_request(method='create_email_message', **self._prepare_email_message_data(data))
+        template_data, message_data = self._message_cache.split(data)
+        template_id = await self._get_message_template(key, template_data)
+        try:
+            return await self._create_template_message(template_id, message_data)
+        except Exception as e:
+            if not self._is_missing_template_error(e):
+                raise
+            await self._forget_message_template(key, template_id)
+        template_id = await self._get_message_template(key, template_data)
+        return await self._create_template_message(template_id, message_data)
+
+    async def _get_message_template(self, key: str, template_data: dict) -> int:
+
+        """ Return cached template id of message content, create template once per key, see `SimpleClient` """
+
+        template_id = self._message_cache.get(key)
+        if template_id is not None:
+            return template_id
+        async with self._get_message_lock(key):
+            template_id = self._message_cache.get(key)
+            if template_id is None:
+                response = await self._api_request(
+                    method='create_email_template', title=self._message_cache.get_title(key), **template_data
+                )
+                template_id = get_result(response)['template_id']
+                self._message_cache.set(key, template_id)
+        return template_id
+
+    async def _forget_message_template(self, key: str, template_id: int) -> None:
+        async with self._get_message_lock(key):
+            if self._message_cache.get(key) == template_id:
+                self._message_cache.delete(key)
+
+    async def _create_template_message(self, template_id: int, message_data: dict):
+        data = self._prepare_email_message_data(dict(message_data, template_id=template_id))
+        return await self._api_request(method='create_email_message', **data)
+
+    async def create_email_campaign(self, recipients: list, email_data: dict, campaign_data=None) -> int:
+
+        """
+        Makes a set of API operations for creating email campaign, see `SimpleClient.create_email_campaign`
+
+        :param recipients: list, of dictionaries that represents contacts data
+        :param email_data: dict, data for `create_email_message` method
+        :param campaign_data: None|dict, data for `create_campaign` method
+        :return: int, created campaign id
+        """
+
+        self._validate_recipients(recipients)
+        self._validate_email_data(email_data)
+        fingerprint, list_job, jobs = self._get_journal_jobs(recipients, [(email_data, campaign_data)])
+        list_id = await self._prepare_mailing_list(recipients, fingerprint, list_job)
+        campaign_id = await self._create_list_campaign(list_id, email_data, campaign_data, jobs[0])
+        self._finish_journal_jobs(list_job, jobs)
+        return campaign_id
+
+    async def _prepare_mailing_list(self, recipients, fingerprint=None, job=None) -> int:
+
+        """ Get or create mailing list for recipients, create fields and import contacts """
+
+        steps = job.steps if job is not None else {}
+        list_id = steps.get('list_id')
+        created = steps.get('list_created', False)
+        if list_id is None:
+            list_title = self._get_list_title(recipients, fingerprint)
+            list_id = await self._find_recipients_list_id(recipients, list_title)
+            created = list_id is None
+            if created:
+                response = await self.create_list(title=list_title)
+                list_id = get_result(response)['id']
+            if job is not None:
+                job.set('list_created', created)
+                job.set('list_id', list_id)
+        if steps.get('imported'):
+            return list_id
+
+        if self._sync_store is not None:
+            import_result = (await self.sync_contacts(recipients, list_id, full=created)).import_result
+        else:
+            import_result = await self.import_contacts_stream(recipients, email_list_ids=[list_id], job=job)
+        if import_result is not None:
+            self._check_import_result(import_result)
+        if job is not None:
+            job.set('imported', True)
+        return list_id
+
+    async def _create_list_campaign(self, list_id: int, email_data: dict, campaign_data=None, job=None) -> int:
+
+        """ Create email message and campaign for prepared mailing list, skip steps completed by `job` """
+
+        steps = job.steps if job is not None else {}
+        if steps.get('campaign_id') is not None:
+            return steps['campaign_id']
+        message_id = steps.get('message_id')
+        if message_id is None:
+            response = await self.create_email_message(**dict(email_data, list_id=list_id))
+            message_id = get_result(response)['message_id']
+            if job is not None:
+                job.set('message_id', message_id)
+
+        campaign_data = self._prepare_campaign_data(campaign_data, message_id)
+        response = await self._api_request(method='create_campaign', **campaign_data)
+        campaign_id = get_result(response)['campaign_id']
+        if job is not None:
+            job.set('campaign_id', campaign_id)
+        return campaign_id
+
+    async def create_email_campaigns(self, campaigns: list, recipients: list,
+                                     default_email_data=None, default_campaign_data=None, workers=None):
+
+        """
+        Create many email campaigns, see `SimpleClient.create_email_campaigns`
+
+        :param campaigns: list, of dictionaries with `email_data` and `campaign_data`
+        :param recipients: list of dictionaries, represents contacts data
+        :param default_email_data: None|dict, default data for `create_email_message` method
+        :param default_campaign_data: None|dict, default data for `create_campaign` method
+        :param workers: None|int, number of campaigns created in parallel, `CAMPAIGN_WORKERS` by default
+        :return: list, created campaigns ids
+        """
+
+        results = await self.create_email_campaigns_pipeline(
+            campaigns, recipients, default_email_data, default_campaign_data, workers=workers
+        )
+        return self._get_campaign_ids(results)
+
+    async def create_email_campaigns_pipeline(self, campaigns: list, recipients: list, default_email_data=None,
+                                              default_campaign_data=None, workers=None) -> list:
+
+        """
+        Create many email campaigns for the same recipients concurrently,
+        see `SimpleClient.create_email_campaigns_pipeline`
+
+        :return: list of CampaignResult in order of `campaigns`
+        """
+
+        campaigns, results = self._prepare_campaigns(campaigns, recipients, default_email_data, default_campaign_data)
+        pending = [result for result in results if result.error is None]
+        if not pending:
+            return results
+        fingerprint, list_job, jobs = self._get_journal_jobs(
+            recipients, [(campaign['email_data'], campaign.get('campaign_data')) for campaign in campaigns]
+        )
+        list_id = await self._prepare_mailing_list(recipients, fingerprint, list_job)
+        queue = iter(pending)
+
+        async def worker():
+            for result in queue:
+                campaign = campaigns[result.index]
+                try:
+                    result.campaign_id = await self._create_list_campaign(
+                        list_id, campaign['email_data'], campaign.get('campaign_data'), jobs[result.index]
+                    )
+                except Exception as e:
+                    result.error = e
+
+        await self._run_workers(worker, workers or self.CAMPAIGN_WORKERS)
+        if all(result.ok for result in pending):
+            self._finish_journal_jobs(list_job, jobs)
+        return results
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from unisender.response import HTTP_OK, get_payload
+from unisender.retry import TokenBucket
+from unisender.utils import get_fingerprint
+
+
+class SendResult(object):
+
+    """
+    Result of one transactional message job
+
+    .. note::
+        `message_id` is set if API accepted the message, else `error` keeps API or transport error.
+        Job identical to an earlier one is not sent again: it gets result of that job
+        and its `index` in `duplicate_of`.
+    """
+
+    __slots__ = ('index', 'recipient', 'message_id', 'error', 'duplicate_of', 'done')
+
+    def __init__(self, index: int, recipient=None):
+        self.index = index
+        self.recipient = recipient
+        self.message_id = None
+        self.error = None
+        self.duplicate_of = None
+        self.done = False
+
+    @property
+    def ok(self) -> bool:
+        return self.done and self.error is None
+
+    def __repr__(self):
+        return (
+            f'<SendResult index={self.index}, recipient={self.recipient}, message_id={self.message_id}, '
+            f'error={self.error!r}>'
+        )
+
+
+class BulkSender(object):
+
+    """
+    Sends many transactional `send_email` / `send_sms` jobs concurrently
+
+    .. note::
+        Jobs are read lazily and no more than `workers` requests are in flight, so the stream may be endless.
+        Failed job does not stop others, see `SendResult.error`. Repeated jobs are sent every time,
+        with `dedup=True` identical jobs are sent once: fingerprints of the last `dedup_window` distinct jobs
+        are kept, so memory stays bounded, a job repeated after that many other jobs is sent again.
+        Usage example:
+            sender = BulkSender(client, workers=16, rate_limit=600, default_params={
+                'sender_name': 'Shop', 'sender_email': 'shop@example.com', 'list_id': list_id,
+            })
+            for result in sender.iter_send('send_email', (
+                (order.email, {'subject': f'Order {order.id}', 'body': render(order)}) for order in orders
+            )):
+                if not result.ok:
+                    logger.warning('order email %s failed: %s', result.index, result.error)
+    """
+
+    RECIPIENT_PARAMS = {'send_email': 'email', 'send_sms': 'phone'}
+    MESSAGE_ID_KEYS = ('id', 'email_id', 'sms_id')
+
+    def __init__(self, client, workers: int = 8, rate_limit=None, dedup: bool = False, default_params=None,
+                 dedup_window=100000):
+
+        """
+        :param client: Client|SimpleClient, API client
+        :param workers: int, max number of concurrent requests
+        :param rate_limit: None|float|TokenBucket, max number of jobs per minute or limiter shared
+                           with other senders, client `rate_limit` still applies to every request
+        :param dedup: bool, send identical jobs once, off by default as the same message may be sent on purpose
+        :param default_params: None|dict, params added to every job, e.g. sender and `list_id`
+        :param dedup_window: None|int, max number of least recently seen job fingerprints kept for deduplication,
+                             None to keep all of them (for finite job streams only)
+        """
+
+        self.client = client
+        self.workers = workers
+        self.rate_limiter = TokenBucket(rate_limit) if isinstance(rate_limit, (int, float)) else rate_limit
+        self.dedup = dedup
+        self.dedup_window = dedup_window
+        self.default_params = default_params or {}
+
+    def _get_recipient_param(self, method: str) -> str:
+        param = self.RECIPIENT_PARAMS.get(method)
+        if param is None:
+            raise Exception(
+                f'UniSender client error: Unknown transactional method "{method}", '
+                f'use one of: {", ".join(self.RECIPIENT_PARAMS)}'
+            )
+        return param
+
+    def _build_job(self, param: str, job) -> tuple:
+
+        """
+        Return recipient and request params of job
+
+        :param param: str, name of recipient param of API method
+        :param job: tuple of recipient and params dict or params dict with recipient
+        """
+
+        if isinstance(job, dict):
+            params = dict(self.default_params, **job)
+        else:
+            recipient, job_params = job
+            params = dict(self.default_params, **(job_params or {}))
+            params[param] = recipient
+        return params.get(param), params
+
+    @classmethod
+    def _parse_response(cls, response) -> tuple:
+
+        """ Return message id and error of `send_email` / `send_sms` response """
+
+        if response.status_code != HTTP_OK:
+            return None, Exception(f'UniSender API error: HTTP {response.status_code}')
+        payload = get_payload(response)
+        if payload.get('error') is not None:
+            return None, Exception(f"UniSender API error: {payload['error']}")
+        result = payload.get('result')
+        if isinstance(result, list):
+            result = result[0] if result else None
+        if not isinstance(result, dict):
+            return None, None
+        errors = result.get('errors')
+        if errors:
+            return None, Exception('UniSender API error: ' + '; '.join(
+                str(error.get('message') or error.get('code')) if isinstance(error, dict) else str(error)
+                for error in errors
+            ))
+        return next((result[key] for key in cls.MESSAGE_ID_KEYS if result.get(key) is not None), None), None
+
+    def _send(self, method: str, params: dict, result: SendResult) -> SendResult:
+
+        """ Send one job, store its message id or error in result """
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        try:
+            response = self.client._api_request(method=method, **params)
+            result.message_id, result.error = self._parse_response(response)
+        except Exception as e:
+            result.error = e
+        result.done = True
+        return result
+
+    @staticmethod
+    def _resolve(original: SendResult, duplicate: SendResult) -> SendResult:
+        duplicate.message_id = original.message_id
+        duplicate.error = original.error
+        duplicate.done = True
+        return duplicate
+
+    def _accept(self, param: str, index: int, job, originals: OrderedDict, duplicates: dict) -> tuple:
+
+        """
+        Build job result and params, register job for deduplication
+
+        :return: tuple of SendResult and request params, params are None for duplicate job,
+                 which is resolved at once if the first identical job is finished
+        """
+
+        recipient, params = self._build_job(param, job)
+        result = SendResult(index, recipient)
+        if not self.dedup:
+            return result, params
+        key = get_fingerprint(params)
+        original = originals.get(key)
+        if original is None:
+            originals[key] = result
+            if self.dedup_window is not None and len(originals) > self.dedup_window:
+                originals.popitem(last=False)
+            return result, params
+        originals.move_to_end(key)
+        result.duplicate_of = original.index
+        if original.done:
+            self._resolve(original, result)
+        else:
+            duplicates.setdefault(original.index, []).append(result)
+        return result, None
+
+    def _finish(self, results, duplicates: dict):
+
+        """ Yield finished results followed by their duplicates """
+
+        for result in results:
+            yield result
+            for duplicate in duplicates.pop(result.index, ()):
+                yield self._resolve(result, duplicate)
+
+    def iter_send(self, method: str, jobs):
+
+        """
+        Send jobs concurrently
+
+        :param method: str, "send_email" or "send_sms"
+        :param jobs: iterable, of (recipient, params dict) pairs or params dicts with "email"/"phone"
+        :return: generator of SendResult in order of completion, `index` is job position in `jobs`
+
+        .. note::
+            Fingerprints of the last `dedup_window` distinct jobs are kept until the generator is exhausted.
+            If iteration stops early, already started jobs are finished.
+        """
+
+        param = self._get_recipient_param(method)
+        originals = OrderedDict()
+        duplicates = {}
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for index, job in enumerate(jobs):
+                result, params = self._accept(param, index, job, originals, duplicates)
+                if params is None:
+                    if result.done:
+                        yield result
+                    continue
+                in_flight.add(executor.submit(self._send, method, params, result))
+                if len(in_flight) >= self.workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    yield from self._finish((future.result() for future in done), duplicates)
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from self._finish((future.result() for future in done), duplicates)
+
+    def send(self, method: str, jobs) -> list:
+
+        """ Send jobs concurrently, return list of SendResult in order of `jobs`, see `iter_send` """
+
+        return sorted(self.iter_send(method, jobs), key=lambda result: result.index)
+
+    def send_email(self, jobs) -> list:
+
+        """ Send transactional emails, jobs are (email, params) pairs or params dicts, see `iter_send` """
+
+        return self.send('send_email', jobs)
+
+    def send_sms(self, jobs) -> list:
+
+        """ Send SMS messages, jobs are (phone, params) pairs or params dicts, see `iter_send` """
+
+        return self.send('send_sms', jobs)
+
+
+class AsyncBulkSender(BulkSender):
+
+    """
+    Asyncio transactional sender for `AsyncClient`, see `BulkSender`
+
+    .. note::
+        `jobs` may be an iterable or an async iterable.
+        Usage example:
+            sender = AsyncBulkSender(async_client, workers=50)
+            async for result in sender.iter_send('send_sms', jobs):
+                print(result.index, result.message_id, result.error)
+    """
+
+    async def _send(self, method: str, params: dict, result: SendResult) -> SendResult:
+        if self.rate_limiter is not None:
+            await asyncio.sleep(self.rate_limiter.reserve())
+        try:
+            response = await self.client._api_request(method=method, **params)
+            result.message_id, result.error = self._parse_response(response)
+        except Exception as e:
+            result.error = e
+        result.done = True
+        return result
+
+    @staticmethod
+    async def _iter_jobs(jobs):
+        if hasattr(jobs, '__aiter__'):
+            async for job in jobs:
+                yield job
+        else:
+            for job in jobs:
+                yield job
+
+    async def iter_send(self, method: str, jobs):
+
+        """ Send jobs by concurrent tasks, async generator of SendResult in order of completion """
+
+        param = self._get_recipient_param(method)
+        originals = OrderedDict()
+        duplicates = {}
+        in_flight = set()
+        index = 0
+        try:
+            async for job in self._iter_jobs(jobs):
+                result, params = self._accept(param, index, job, originals, duplicates)
+                index += 1
+                if params is None:
+                    if result.done:
+                        yield result
+                    continue
+                in_flight.add(asyncio.ensure_future(self._send(method, params, result)))
+                if len(in_flight) >= self.workers:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for finished in self._finish((task.result() for task in done), duplicates):
+                        yield finished
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for finished in self._finish((task.result() for task in done), duplicates):
+                    yield finished
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def send(self, method: str, jobs) -> list:
+
+        """ Send jobs concurrently, return list of SendResult in order of `jobs` """
+
+        results = [result async for result in self.iter_send(method, jobs)]
+        return sorted(results, key=lambda result: result.index)
+
+    async def send_email(self, jobs) -> list:
+        return await self.send('send_email', jobs)
+
+    async def send_sms(self, jobs) -> list:
+        return await self.send('send_sms', jobs)
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from unisender.utils import get_fingerprint
+
+
+class MemoryCacheBackend(object):
+
+    """ In-process LRU cache with per-entry expiration time, thread safe """
+
+    def __init__(self, max_size: int = 256):
+
+        """
+        :param max_size: int, max number of entries, least recently used entries are evicted
+        """
+
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+
+        """ Return cached value or None if it is absent or expired """
+
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl=None) -> None:
+
+        """
+        Store value
+
+        :param key: str, cache key
+        :param value: any object
+        :param ttl: None|float, time to live in seconds, None for no expiration
+        """
+
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate(self, prefix: str) -> None:
+
+        """ Delete all entries which keys start with prefix """
+
+        with self._lock:
+            for key in [key for key in self._data if key.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCacheBackend(object):
+
+    """
+    LRU cache with per-entry expiration time stored in local SQLite file
+
+    .. note::
+        File may be shared by several processes on the same host.
+        Values must be bytes.
+    """
+
+    def __init__(self, path: str, max_size: int = 1024):
+
+        """
+        :param path: str, SQLite database file path, ":memory:" for private in-memory database
+        :param max_size: int, max number of entries, least recently used entries are evicted
+        """
+
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS unisender_cache '
+            '(key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL)'
+        )
+
+    def get(self, key: str):
+
+        """ Return cached value or None if it is absent or expired """
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires FROM unisender_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                self._conn.execute('DELETE FROM unisender_cache WHERE key = ?', (key,))
+                return None
+            self._conn.execute('UPDATE unisender_cache SET accessed = ? WHERE key = ?', (now, key))
+            return row[0]
+
+    def set(self, key: str, value: bytes, ttl=None) -> None:
+
+        """
+        Store value
+
+        :param key: str, cache key
+        :param value: bytes
+        :param ttl: None|float, time to live in seconds, None for no expiration
+        """
+
+        now = time.time()
+        expires = None if ttl is None else now + ttl
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO unisender_cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                (key, value, expires, now)
+            )
+            self._conn.execute(
+                'DELETE FROM unisender_cache WHERE key IN '
+                '(SELECT key FROM unisender_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_size,)
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM unisender_cache WHERE key = ?', (key,))
+
+    def invalidate(self, prefix: str) -> None:
+
+        """ Delete all entries which keys start with prefix """
+
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM unisender_cache WHERE substr(key, 1, ?) = ?', (len(prefix), prefix)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM unisender_cache')
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class ResponseCache(object):
+
+    """
+    Cache of read-mostly API responses
+
+    .. note::
+        Only methods listed in `ttl` are cached, cache key is built from method name and request body,
+        so clients of different accounts do not share entries.
+        Methods from `INVALIDATES` evict cached responses of related read methods
+        after successful call (write-through invalidation).
+        Backend is any object with `get`, `set`, `delete`, `invalidate` methods,
+        see `MemoryCacheBackend` and `SQLiteCacheBackend`.
+        Usage example:
+            cache = ResponseCache(SQLiteCacheBackend('/tmp/unisender.sqlite'), ttl={'get_lists': 60})
+            client = SimpleClient(api_key, platform, cache=cache)
+    """
+
+    DEFAULT_TTL = {
+        'get_lists': 300,
+        'get_fields': 300,
+        'get_templates': 300,
+        'list_templates': 300,
+        'get_template': 300,
+    }
+    INVALIDATES = {
+        'create_list': ('get_lists',),
+        'update_list': ('get_lists',),
+        'delete_list': ('get_lists',),
+        'create_field': ('get_fields',),
+        'update_field': ('get_fields',),
+        'delete_field': ('get_fields',),
+        'create_email_template': ('get_templates', 'list_templates'),
+        'update_email_template': ('get_templates', 'list_templates', 'get_template'),
+        'delete_template': ('get_templates', 'list_templates', 'get_template'),
+    }
+
+    def __init__(self, backend=None, ttl=None):
+
+        """
+        :param backend: None|object, cache storage, `MemoryCacheBackend` by default
+        :param ttl: None|dict, method name -> time to live in seconds, `DEFAULT_TTL` by default
+        """
+
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = dict(self.DEFAULT_TTL if ttl is None else ttl)
+
+    def is_cached(self, method: str) -> bool:
+        return method in self.ttl
+
+    @staticmethod
+    def get_key(method: str, body: bytes) -> str:
+        return f'{method}:{hashlib.sha1(body).hexdigest()}'
+
+    def get(self, method: str, body: bytes):
+
+        """ Return cached response content or None """
+
+        return self.backend.get(self.get_key(method, body))
+
+    def set(self, method: str, body: bytes, content: bytes) -> None:
+
+        """ Store response content of cached method """
+
+        self.backend.set(self.get_key(method, body), content, self.ttl[method])
+
+    def invalidate(self, method: str) -> None:
+
+        """ Evict cached responses affected by successful call of given method """
+
+        for cached_method in self.INVALIDATES.get(method, ()):
+            self.backend.invalidate(f'{cached_method}:')
+
+
+class MessageCache(object):
+
+    """
+    Content-addressed cache of email templates created for repeated messages
+
+    .. note::
+        HTML body, text body, subject and language of a message are uploaded once by `createEmailTemplate`,
+        later messages with the same content reference the template by `template_id`
+        instead of uploading the body again. Cache key is built from API key and message content,
+        sender, list and other message params are sent with every message.
+        Messages with `template_id` / `system_template_id` and bodies shorter than `min_size` are not cached.
+        Cached template is dropped only if message fails with one of `MISSING_TEMPLATE_CODES` API error codes
+        (template deleted from account), other errors are re-raised and keep the template.
+        Backend is any object with `get`, `set`, `delete` methods, see `MemoryCacheBackend` and `SQLiteCacheBackend`,
+        `SQLiteCacheBackend` keeps template ids across restarts.
+        Usage example:
+            client = SimpleClient(api_key, platform, message_cache=MessageCache(SQLiteCacheBackend(path), ttl=86400))
+    """
+
+    TEMPLATE_FIELDS = ('subject', 'body', 'text_body', 'lang')
+    MISSING_TEMPLATE_CODES = {'template_not_found', 'object_not_found'}
+
+    def __init__(self, backend=None, ttl=7 * 86400, min_size: int = 4096):
+
+        """
+        :param backend: None|object, cache storage, `MemoryCacheBackend` by default
+        :param ttl: None|float, seconds a template is reused, None for no expiration
+        :param min_size: int, min body length in characters to upload it as template
+        """
+
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self.min_size = min_size
+
+    def get_key(self, api_key: str, data: dict):
+
+        """ Return cache key of `create_email_message` data or None if message is not cached """
+
+        body = data.get('body')
+        if not body or 'template_id' in data or 'system_template_id' in data or len(body) < self.min_size:
+            return None
+        content = {key: data[key] for key in self.TEMPLATE_FIELDS if data.get(key) is not None}
+        return f'message_template:{get_fingerprint([api_key, content])}'
+
+    @classmethod
+    def split(cls, data: dict) -> tuple:
+
+        """ Return `create_email_template` content and `create_email_message` params of message data """
+
+        template_data = {key: data[key] for key in cls.TEMPLATE_FIELDS if data.get(key) is not None}
+        message_data = {key: val for key, val in data.items() if key not in cls.TEMPLATE_FIELDS}
+        return template_data, message_data
+
+    @staticmethod
+    def get_title(key: str) -> str:
+
+        """ Return title of template created for cache key """
+
+        return f'message_template_{int(key.rsplit(":", 1)[-1], 16) % 10 ** 10}'
+
+    def get(self, key: str):
+
+        """ Return cached template id or None """
+
+        value = self.backend.get(key)
+        return None if value is None else int(value)
+
+    def set(self, key: str, template_id) -> None:
+        self.backend.set(key, str(template_id).encode('ascii'), self.ttl)
+
+    def delete(self, key: str) -> None:
+
+        """ Forget template, e.g. deleted from account """
+
+        self.backend.delete(key)
@@ -1,7 +1,37 @@
 # -*- coding: utf-8 -*-
-import requests
+import time
+from types import MappingProxyType
+from unisender.encoding import (
+    CONTENT_ENCODINGS, FORM_CONTENT_TYPE, compress_body, encode_request_data, flatten_request_data,
+)
+from unisender.response import HTTP_OK, get_error_code, has_error
+from unisender.retry import RetryPolicy, TokenBucket
 from unisender.utils import to_camel_case
 
+HTTP_UNSUPPORTED_MEDIA_TYPE = 415
+FORM_HEADERS = MappingProxyType({'Content-Type': FORM_CONTENT_TYPE})
+
+API_METHODS = frozenset([
+    'get_lists', 'create_list', 'update_list', 'delete_list',
+    'subscribe', 'exclude', 'unsubscribe',
+    'import_contacts', 'export_contacts',
+    'get_total_contacts_count', 'get_contact_count', 'get_contact',
+    'get_fields', 'create_field', 'update_field', 'delete_field',
+    'get_tags', 'delete_tag',
+    'create_email_message', 'update_email_message', 'delete_message',
+    'send_email', 'send_test_email', 'check_email', 'update_opt_in_email',
+    'get_messages', 'get_message', 'list_messages', 'get_checked_email',
+    'create_campaign', 'cancel_campaign',
+    'create_sms_message', 'send_sms', 'check_sms', 'get_actual_message_version',
+    'get_web_version',
+    'create_email_template', 'update_email_template', 'delete_template',
+    'get_template', 'get_templates', 'list_templates',
+    'get_campaign_delivery_stats', 'get_campaign_common_stats', 'get_visited_links',
+    'get_campaigns', 'get_campaign_status',
+    'validate_sender', 'register', 'check_user_exists', 'get_user_info', 'get_users',
+    'transfer_money', 'get_available_tariffs', 'change_tariff', 'set_sender_domain',
+])
+
 
 class Client(object):
 
@@ -22,15 +52,34 @@ class Client(object):
                 ]
             )
             assert response.ok and not response.json().get('error')
+
+        All API calls share one keep-alive HTTP session with a connection pool,
+        release it with `close()` or use the client as a context manager:
+            with Client(api_key, platform, pool_maxsize=20) as cl:
+                cl.get_lists()
     """
 
-    DEFAULT_CONF = {
+    DEFAULT_CONF = MappingProxyType({
         "base_url": "https://api.unisender.com",
         "lang": "en",
         'format': 'json',
         "api_key": None,
         'platform': None,
-    }
+        'pool_connections': 10,
+        'pool_maxsize': 10,
+        'pool_block': False,
+        'host_pools': None,
+        'max_retries': 3,
+        'retry_backoff': 0.5,
+        'retry_max_backoff': 30.0,
+        'rate_limit': None,
+        'rate_limit_burst': 1,
+        'compression': None,
+        'compression_level': 1,
+        'compression_min_size': 1024,
+    })
+
+    _api_methods = API_METHODS
 
     def _get_default_request_data(self) -> dict:
 
@@ -42,13 +91,12 @@ class Client(object):
             'format': self._config['format']
         }
 
-    def _build_request_data(self, data: dict, extra_key=None) -> dict:
+    def _build_request_data(self, data: dict) -> dict:
 
         """
         Add default request data and converts data to unisender request data format
 
         :param data: dict, request params
-        :param extra_key: str, name for list param (for recursive call)
         :return: specific unisender request data format, see below
 
         .. note::
@@ -76,16 +124,20 @@ class Client(object):
 
         """
         result = self._get_default_request_data()
-        for key, val in data.items():
-            _key = f'{extra_key}[{key}]' if isinstance(extra_key, str) else key
-            if isinstance(val, dict):
-                result.update(self._build_request_data(val, _key))
-            elif isinstance(val, list):
-                result.update(self._build_request_data(dict(enumerate(val)), _key))
-            elif val is not None:
-                result[_key] = val
+        result.update(flatten_request_data(data))
         return result
 
+    def _encode_request_data(self, data: dict) -> bytes:
+
+        """
+        Add default request data and encode it to urlencoded request body
+
+        :param data: dict, request params
+        :return: bytes, body equal to urlencoded `_build_request_data` result
+        """
+
+        return encode_request_data(data, self._get_default_request_data())
+
     def _get_request_url(self, method: str) -> str:
 
         """
@@ -95,19 +147,137 @@ class Client(object):
         :return: request url in unisender API format
         """
 
-        return '{base_url}/{lang}/api/{method}'.format(
-            base_url=self._config['base_url'],
-            lang=self._config['lang'],
-            method=to_camel_case(method),
+        url = self._urls.get(method)
+        if url is None:
+            url = self._urls[method] = self._url_prefix + to_camel_case(method)
+        return url
+
+    def _create_adapter(self, pool_connections: int = None, pool_maxsize: int = None,
+                        pool_block: bool = None, **kwargs):
+
+        """
+        Create HTTP adapter with keep-alive connection pool
+
+        :param pool_connections: int, number of cached host pools, default from config
+        :param pool_maxsize: int, max number of connections kept alive per host
+        :param pool_block: bool, wait for a free connection instead of opening an extra one
+        :param kwargs: dict, any other `requests.adapters.HTTPAdapter` params
+        :return: requests.adapters.HTTPAdapter
+        """
+
+        from requests.adapters import HTTPAdapter
+        return HTTPAdapter(
+            pool_connections=pool_connections or self._config['pool_connections'],
+            pool_maxsize=pool_maxsize or self._config['pool_maxsize'],
+            pool_block=self._config['pool_block'] if pool_block is None else pool_block,
+            **kwargs
         )
 
-    def after_request(self, response: requests.Response) -> None:
+    def _create_session(self):
+
+        """
+        Create HTTP session for API requests
+
+        .. note::
+            API server url gets the adapter configured by `pool_*` params,
+            `host_pools` maps other url prefixes to their own adapter params, e.g.:
+            {'https://proxy.example.com': {'pool_maxsize': 50}}
+        """
+
+        import requests
+        session = requests.Session()
+        session.headers['Connection'] = 'keep-alive'
+        session.mount(self._config['base_url'], self._create_adapter())
+        for prefix, pool_conf in (self._config['host_pools'] or {}).items():
+            session.mount(prefix, self._create_adapter(**pool_conf))
+        return session
+
+    @property
+    def session(self):
+
+        """ Return HTTP session (or injected transport), create it on first use """
+
+        if self._session is None:
+            self._session = self._create_session()
+            self._own_session = True
+        return self._session
+
+    def close(self) -> None:
+
+        """ Close pooled connections of the session created by client """
+
+        if self._session is not None and self._own_session:
+            self._session.close()
+        self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _get_transport_errors(self) -> tuple:
+
+        """ Return exception classes of transport failures which may be retried """
+
+        import requests
+        return requests.ConnectionError, requests.Timeout
+
+    def _is_connect_error(self, error: Exception) -> bool:
+
+        """ Check if transport error happened before request was sent """
+
+        import requests
+        from urllib3.exceptions import NewConnectionError
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    @staticmethod
+    def _get_api_error_code(response):
+
+        """ Return API error code of response, body is decoded only if it contains error """
+
+        return get_error_code(response)
+
+    @staticmethod
+    def _has_api_error(response) -> bool:
+
+        """ Check if response is HTTP error or contains API error """
+
+        return has_error(response)
+
+    def _get_retry_delay(self, method: str, attempt: int, started: float, response=None, error=None):
+
+        """
+        Ask retry policy if request should be repeated
+
+        :param method: str, snake case API method name
+        :param attempt: int, number of already made retries
+        :param started: float, `time.monotonic()` of the first attempt
+        :param response: None|response obj of the last attempt
+        :param error: None|Exception, transport error of the last attempt
+        :return: None if request should not be repeated, else float seconds to wait
+        """
+
+        policy = self._retry_policy
+        if error is not None:
+            if policy.should_retry(method, attempt, started, error=error, sent=not self._is_connect_error(error)):
+                return policy.get_delay(attempt)
+            return None
+        if policy.should_retry(method, attempt, started, status_code=response.status_code,
+                               error_code=self._get_api_error_code(response)):
+            return policy.get_delay(attempt, response.headers.get('Retry-After'))
+        return None
+
+    def after_request(self, response: 'requests.Response') -> None:
 
         """ Do something with api response """
 
         pass
 
-    def _api_request(self, method: str, **kwargs) -> requests.Response:
+    def _api_request(self, method: str, **kwargs) -> 'requests.Response':
 
         """
         Calls the API method by the given name and request data
@@ -117,61 +287,243 @@ class Client(object):
         :return: requests.Response, API response obj
         """
 
-        data = self._build_request_data(kwargs)
         url = self._get_request_url(method)
-        response = requests.post(url, data)
+        event, body = self._start_request(method, url, kwargs)
+        response = self._get_cached_response(method, url, body)
+        if response is None:
+            try:
+                response = self._send_request(method, url, body, event)
+            except Exception as e:
+                if event is not None:
+                    self._instrumentation.fail(event, e)
+                raise
+            self._update_cache(method, body, response)
+        elif event is not None:
+            event.cached = True
+        if event is not None:
+            self._finish_request(event, response)
         self.after_request(response)
         return response
 
-    @property
-    def _api_methods(self) -> list:
-
-        """ Return list of allowed unisender api methods """
-
-        return [
-            'get_lists', 'create_list', 'update_list', 'delete_list',
-            'subscribe', 'exclude', 'unsubscribe',
-            'import_contacts', 'export_contacts',
-            'get_total_contacts_count', 'get_contact_count', 'get_contact',
-            'get_fields', 'create_field', 'update_field', 'delete_field',
-            'get_tags', 'delete_tag',
-            'create_email_message', 'update_email_message', 'delete_message',
-            'send_email', 'send_test_email', 'check_email', 'update_opt_in_email',
-            'get_messages', 'get_message', 'list_messages', 'get_checked_email',
-            'create_campaign', 'cancel_campaign',
-            'create_sms_message', 'send_sms', 'check_sms', 'get_actual_message_version',
-            'get_web_version',
-            'create_email_template', 'update_email_template', 'delete_template',
-            'get_template', 'get_templates', 'list_templates',
-            'get_campaign_delivery_stats', 'get_campaign_common_stats', 'get_visited_links',
-            'get_campaigns', 'get_campaign_status',
-            'validate_sender', 'register', 'check_user_exists', 'get_user_info', 'get_users',
-            'transfer_money', 'get_available_tariffs', 'change_tariff', 'set_sender_domain',
-        ]
-
-    def __init__(self, api_key: str, platform: str, **kwargs):
+    def _start_request(self, method: str, url: str, data: dict):
+
+        """
+        Encode request body, notify instrumentation before hooks
+
+        :return: tuple of RequestEvent (None if instrumentation is disabled) and request body
+        """
+
+        if self._instrumentation is None:
+            return None, self._encode_request_data(data)
+        event = self._instrumentation.start(method, url)
+        body = self._encode_request_data(data)
+        event.encode_time = time.perf_counter() - event.started
+        event.request_bytes = len(body)
+        self._instrumentation.before(event)
+        return event, body
+
+    def _finish_request(self, event: 'RequestEvent', response) -> None:
+
+        """ Notify instrumentation after/error hooks """
+
+        event.response = response
+        event.error_code = self._get_api_error_code(response)
+        self._instrumentation.after(event)
+
+    def _compress_request(self, body: bytes, event=None) -> tuple:
+
+        """
+        Compress request body if `compression` is enabled and body is not smaller than `compression_min_size`
+
+        :param body: bytes, urlencoded request body
+        :param event: None|RequestEvent, instrumentation event to report compressed size
+        :return: tuple of request body and headers
+        """
+
+        encoding = self._compression
+        if encoding is None or len(body) < self._config['compression_min_size']:
+            return body, FORM_HEADERS
+        body = compress_body(body, encoding, self._config['compression_level'])
+        if event is not None:
+            event.request_bytes = len(body)
+        return body, {'Content-Type': FORM_CONTENT_TYPE, 'Content-Encoding': encoding}
+
+    def _is_compression_rejected(self, headers, response) -> bool:
+
+        """ Check if server rejected compressed body, disable compression for next requests then """
+
+        if headers is FORM_HEADERS or response.status_code != HTTP_UNSUPPORTED_MEDIA_TYPE:
+            return False
+        self._compression = None
+        return True
+
+    def _send_request(self, method: str, url: str, body: bytes, event=None) -> 'requests.Response':
+
+        """
+        Send request body, repeat it according to retry policy
+
+        :param method: str, snake case API method name
+        :param url: str, request url
+        :param body: bytes, urlencoded request body
+        :param event: None|RequestEvent, instrumentation event to count retries and wire time
+        :return: requests.Response, API response obj of the last attempt
+
+        .. note::
+            Body is compressed once for all attempts. If server answers HTTP 415 to compressed body,
+            compression is disabled and the body is sent again as is.
+        """
+
+        attempt = 0
+        started = time.monotonic()
+        data, headers = self._compress_request(body, event)
+        while True:
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire()
+            sent = time.perf_counter()
+            try:
+                response = self.session.post(url, data=data, headers=headers)
+            except self._get_transport_errors() as e:
+                delay = self._get_retry_delay(method, attempt, started, error=e)
+                if delay is None:
+                    raise
+            else:
+                if self._is_compression_rejected(headers, response):
+                    data, headers = body, FORM_HEADERS
+                    continue
+                delay = self._get_retry_delay(method, attempt, started, response=response)
+                if delay is None:
+                    return response
+            finally:
+                if event is not None:
+                    event.wire_time += time.perf_counter() - sent
+                    event.retries = attempt
+            attempt += 1
+            time.sleep(delay)
+
+    def _get_cached_response(self, method: str, url: str, body: bytes):
+
+        """ Return cached response of read-mostly method or None """
+
+        if self._cache is None or not self._cache.is_cached(method):
+            return None
+        content = self._cache.get(method, body)
+        return None if content is None else self._build_cached_response(url, content)
+
+    def _update_cache(self, method: str, body: bytes, response) -> None:
+
+        """ Store successful response of cached method, evict responses affected by other successful methods """
+
+        if self._cache is None or self._has_api_error(response):
+            return
+        if self._cache.is_cached(method):
+            self._cache.set(method, body, response.content)
+        else:
+            self._cache.invalidate(method)
+
+    @staticmethod
+    def _build_cached_response(url: str, content: bytes) -> 'requests.Response':
+
+        """ Build response obj from cached response content """
+
+        import requests
+        response = requests.Response()
+        response.status_code = HTTP_OK
+        response._content = content
+        response.encoding = 'utf-8'
+        response.url = url
+        response.request = requests.Request('POST', url).prepare()
+        return response
+
+    def __init__(self, api_key: str, platform: str, session=None, retry_policy=None, rate_limiter=None,
+                 cache=None, instrumentation=None, **kwargs):
 
         """
         Configures api client
 
         :param api_key:  str, API key
         :param platform: str, API tracking marker
+        :param session:  None|object, custom transport with `requests.Session` compatible
+                         `post(url, data=..., headers=...)` method, it is not closed by the client
+        :param retry_policy: None|RetryPolicy, custom retry rules, built from `max_retries`,
+                             `retry_backoff`, `retry_max_backoff` by default
+        :param rate_limiter: None|TokenBucket, limiter shared with other clients of the same account,
+                             built from `rate_limit` and `rate_limit_burst` by default
+        :param cache: None|bool|ResponseCache, cache of read-mostly responses,
+                      True for in-memory cache with default TTLs
+        :param instrumentation: None|bool|Instrumentation, request hooks and metrics,
+                                True for built-in `Metrics` only
         :param format:   str, API response format
         :param base_url: str, API server url
         :param lang:     str, API message language, available: ru,en,it
+        :param pool_connections: int, number of cached host connection pools
+        :param pool_maxsize:     int, max number of keep-alive connections per host
+        :param pool_block:       bool, block when pool is exhausted instead of opening new connection
+        :param host_pools:       None|dict, url prefix -> pool params for other hosts
+        :param max_retries:       int, max number of request repeats, 0 disables retries
+        :param retry_backoff:     float, base retry delay in seconds
+        :param retry_max_backoff: float, max retry delay in seconds
+        :param rate_limit:        None|float, max number of requests per minute
+        :param rate_limit_burst:  int, number of requests allowed without delay after idle period
+        :param compression:          None|str, "gzip" or "deflate" request body `Content-Encoding`,
+                                     enable only if API server or proxy accepts compressed requests
+        :param compression_level:    int, zlib compression level 1..9
+        :param compression_min_size: int, bodies smaller than this number of bytes are sent uncompressed
         """
 
-        self._config = self.DEFAULT_CONF
-        self._config['api_key'] = api_key
-        self._config['platform'] = platform
-        self._config.update(kwargs)
+        self._config = MappingProxyType(dict(self.DEFAULT_CONF, api_key=api_key, platform=platform, **kwargs))
+        self._url_prefix = f"{self._config['base_url']}/{self._config['lang']}/api/"
+        self._urls = {}
+        self._compression = self._config['compression']
+        if self._compression is not None and self._compression not in CONTENT_ENCODINGS:
+            raise ValueError(f'Unknown request compression "{self._compression}", use one of: gzip, deflate')
+        self._session = session
+        self._own_session = False
+        self._retry_policy = retry_policy or RetryPolicy(
+            max_retries=self._config['max_retries'],
+            backoff=self._config['retry_backoff'],
+            max_backoff=self._config['retry_max_backoff'],
+        )
+        self._rate_limiter = rate_limiter
+        if rate_limiter is None and self._config['rate_limit']:
+            self._rate_limiter = TokenBucket(self._config['rate_limit'], self._config['rate_limit_burst'])
+        if cache is True:
+            from unisender.cache import ResponseCache
+            cache = ResponseCache()
+        self._cache = cache or None
+        if instrumentation is True:
+            from unisender.instrumentation import Instrumentation, Metrics
+            instrumentation = Instrumentation(Metrics())
+        self._instrumentation = instrumentation or None
+
+    @property
+    def metrics(self):
+
+        """ Return built-in metrics of client instrumentation or None """
+
+        return self._instrumentation.metrics if self._instrumentation is not None else None
 
     def __getattr__(self, name: str):
 
-        """ Check if attr name in _api_methods, call _api_request function """
+        """ Call _api_request for method registered in subclass `_api_methods`, see `_add_api_method` """
+
+        if name.startswith('_') or name not in self._api_methods:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return _add_api_method(type(self), name).__get__(self)
+
+
+def _add_api_method(cls, name: str):
+
+    """ Define method calling API method `name` on class, return the function """
+
+    def api_method(self, **kwargs):
+        return self._api_request(method=name, **kwargs)
+
+    api_method.__name__ = api_method.__qualname__ = name
+    api_method.__doc__ = f'Call UniSender API method "{to_camel_case(name)}"'
+    setattr(cls, name, api_method)
+    return api_method
 
-        def get(self, **kwargs):
-            return self._api_request(method=name, **kwargs)
 
-        if name in self._api_methods:
-            return get.__get__(self)
+for _name in API_METHODS:
+    if not hasattr(Client, _name):
+        _add_api_method(Client, _name)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import csv
+from itertools import zip_longest
+from unisender.utils import iter_chunks
+
+
+def get_column_names(columns) -> list:
+
+    """
+    Return column names of column-oriented data
+
+    :param columns: dict of sequences, pandas DataFrame, pyarrow Table or NumPy structured array
+    :return: list of str
+    """
+
+    if hasattr(columns, 'column_names'):
+        return list(columns.column_names)
+    if hasattr(columns, 'columns'):
+        return list(columns.columns)
+    dtype = getattr(columns, 'dtype', None)
+    if dtype is not None and dtype.names:
+        return list(dtype.names)
+    return list(columns.keys())
+
+
+def get_column(columns, name: str):
+    if hasattr(columns, 'column_names'):
+        return columns.column(name)
+    return columns[name]
+
+
+def column_to_strings(column, start: int, stop: int) -> list:
+
+    """
+    Convert column slice to list of str
+
+    .. note::
+        NumPy arrays and pandas Series are converted by one `astype(str)` call,
+        pyarrow arrays are converted to Python objects at once,
+        str cells of other sequences are taken as is.
+    """
+
+    part = column.iloc[start:stop] if hasattr(column, 'iloc') else column[start:stop]
+    if hasattr(part, 'astype'):
+        return part.astype(str).tolist()
+    if hasattr(part, 'to_pylist'):
+        part = part.to_pylist()
+    return [val if type(val) is str else str(val) for val in part]
+
+
+def iter_column_batches(columns, names: list, batch_size: int):
+
+    """
+    Split column-oriented data to batches of str columns
+
+    :param columns: dict of sequences, pandas DataFrame, pyarrow Table or NumPy structured array
+    :param names: list, column names
+    :param batch_size: int, rows per batch
+    :return: generator of (offset, list of str columns) pairs
+    """
+
+    data = [get_column(columns, name) for name in names]
+    size = len(data[0]) if data else 0
+    for column, name in zip(data, names):
+        if len(column) != size:
+            raise ValueError(f'Column "{name}" length differs from column "{names[0]}" length')
+    for offset in range(0, size, batch_size):
+        stop = min(offset + batch_size, size)
+        yield offset, [column_to_strings(column, offset, stop) for column in data]
+
+
+def iter_csv_batches(reader, width: int, batch_size: int):
+
+    """
+    Split CSV rows to batches of str columns
+
+    :param reader: iterator of row lists, e.g. `csv.reader` after header, empty rows are skipped
+    :param width: int, number of columns, short rows are padded with empty strings
+    :param batch_size: int, rows per batch
+    :return: generator of (offset, list of str columns) pairs
+    """
+
+    offset = 0
+    for rows in iter_chunks((row for row in reader if row), batch_size):
+        columns = [list(column) for column in zip_longest(*rows, fillvalue='')]
+        if len(columns) > width:
+            raise ValueError(f'CSV row after data row {offset} has more than {width} columns')
+        yield offset, columns + [[''] * len(rows) for _ in range(width - len(columns))]
+        offset += len(rows)
+
+
+def open_csv(file, encoding: str = 'utf-8', **csv_params):
+
+    """
+    Open CSV file for streaming read
+
+    :param file: str|file object, file path or text file object
+    :param encoding: str, file encoding, used for path only
+    :param csv_params: dict, `csv.reader` params, e.g. delimiter
+    :return: tuple of opened file object or None for passed file object, and `csv.reader`
+    """
+
+    if isinstance(file, str):
+        fh = open(file, newline='', encoding=encoding)
+        return fh, csv.reader(fh, **csv_params)
+    return None, csv.reader(file, **csv_params)
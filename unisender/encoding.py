@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+import zlib
+from urllib.parse import quote_plus
+
+FORM_CONTENT_TYPE = 'application/x-www-form-urlencoded'
+CONTENT_ENCODINGS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+_INDEX_CACHE_SIZE = 1024
+_RAW_INDEX_KEYS = [f'[{i}]' for i in range(_INDEX_CACHE_SIZE)]
+_QUOTED_INDEX_KEYS = [f'%5B{i}%5D' for i in range(_INDEX_CACHE_SIZE)]
+
+_SAFE_CHARS = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~')
+_QUOTE_TABLE = {
+    code: chr(code) if code in _SAFE_CHARS else ('+' if code == 0x20 else f'%{code:02X}')
+    for code in range(128)
+}
+
+
+def _quote(val: str) -> str:
+
+    """ `urllib.parse.quote_plus` for str, ASCII strings are translated in C without utf-8 encoding """
+
+    if val.isascii():
+        return val.translate(_QUOTE_TABLE)
+    return quote_plus(val)
+
+
+def _raw_key(key) -> str:
+
+    """ Return bracketed nested key part, e.g. `[17]` """
+
+    if type(key) is int and 0 <= key < _INDEX_CACHE_SIZE:
+        return _RAW_INDEX_KEYS[key]
+    return f'[{key}]'
+
+
+def _quoted_key(key) -> str:
+
+    """ Return urlencoded bracketed nested key part, e.g. `%5B17%5D` """
+
+    if type(key) is int and 0 <= key < _INDEX_CACHE_SIZE:
+        return _QUOTED_INDEX_KEYS[key]
+    return f'%5B{_quote(str(key))}%5D'
+
+
+def _quote_value(val) -> str:
+
+    """ Urlencode scalar value the same way as `requests` does """
+
+    if type(val) is int:
+        return str(val)
+    if isinstance(val, str):
+        return _quote(val)
+    if isinstance(val, bytes):
+        return quote_plus(val)
+    return quote_plus(str(val))
+
+
+def _quote_column(values: list) -> list:
+
+    """ Urlencode list of str, ASCII columns are translated by one call for the whole column """
+
+    joined = '\x00'.join(values)
+    if joined.isascii() and values:
+        quoted = joined.translate(_QUOTE_TABLE).split('%00')
+        if len(quoted) == len(values):
+            return quoted
+    return [_quote(val) for val in values]
+
+
+class FormMatrix(object):
+
+    """
+    Matrix of str cells given by columns, e.g. `importContacts` data
+
+    .. note::
+        Encoded as `key[row][column]=value` params like a list of row lists,
+        but cells are urlencoded column by column and rows are never built.
+        All columns must have the same length.
+    """
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns: list):
+
+        """
+        :param columns: list, of equal length lists of str
+        """
+
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def to_rows(self) -> list:
+        return [list(row) for row in zip(*self.columns)]
+
+    def encode(self, quoted_key: str) -> str:
+
+        """ Return urlencoded params of the matrix joined by "&" """
+
+        cells = [
+            [_quoted_key(j) + '=' + val for val in _quote_column(column)]
+            for j, column in enumerate(self.columns)
+        ]
+        parts = []
+        append = parts.append
+        for i, row in enumerate(zip(*cells)):
+            prefix = quoted_key + _quoted_key(i)
+            append(prefix + ('&' + prefix).join(row))
+        return '&'.join(parts)
+
+
+def flatten_request_data(data: dict):
+
+    """
+    Iterate request params flattened to PHP-style bracketed keys
+
+    :param data: dict, request params with nested lists and dicts
+    :return: generator of (key, value) pairs, None values are skipped
+
+    .. note::
+        Example:
+        data: {'field_names': ['email', 'name'], 'data': [['a@gmail.com', 'John']]}
+        yields: ('field_names[0]', 'email'), ('field_names[1]', 'name'),
+                ('data[0][0]', 'a@gmail.com'), ('data[0][1]', 'John')
+    """
+
+    stack = [(None, iter(data.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for key, val in items:
+            _key = key if prefix is None else prefix + _raw_key(key)
+            if isinstance(val, dict):
+                stack.append((_key, iter(val.items())))
+                break
+            elif isinstance(val, list):
+                stack.append((_key, enumerate(val)))
+                break
+            elif isinstance(val, FormMatrix):
+                stack.append((_key, enumerate(val.to_rows())))
+                break
+            elif val is not None:
+                yield _key, val
+        else:
+            stack.pop()
+
+
+def encode_request_data(data: dict, default_data=None) -> bytes:
+
+    """
+    Encode request params to `application/x-www-form-urlencoded` body in a single pass
+
+    :param data: dict, request params with nested lists and dicts
+    :param default_data: None|dict, flat params placed before `data`, overridden by `data` scalar values
+    :return: bytes, same body as `requests` builds from `Client._build_request_data` result
+
+    .. note::
+        Keys are urlencoded by parts, quoted `[index]` parts are taken from cache,
+        so `data[i][j]` keys of import matrix cost one string concatenation.
+    """
+
+    parts = []
+    append = parts.append
+    skip = ()
+    if default_data:
+        skip = set()
+        for key, val in default_data.items():
+            override = data.get(key)
+            if override is not None and not isinstance(override, (dict, list)):
+                val = override
+                skip.add(key)
+            if val is not None:
+                _append_pair(append, _quote(str(key)), val)
+
+    stack = [(None, iter(data.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for key, val in items:
+            if prefix is None:
+                if key in skip:
+                    continue
+                _key = _quote(str(key))
+            else:
+                _key = prefix + _quoted_key(key)
+            if isinstance(val, dict):
+                stack.append((_key, iter(val.items())))
+                break
+            elif isinstance(val, list):
+                stack.append((_key, enumerate(val)))
+                break
+            elif isinstance(val, FormMatrix):
+                if len(val):
+                    append(val.encode(_key))
+            elif val is not None:
+                if type(val) is str:
+                    append(_key + '=' + _quote(val))
+                else:
+                    _append_pair(append, _key, val)
+        else:
+            stack.pop()
+    return '&'.join(parts).encode('ascii')
+
+
+def _append_pair(append, quoted_key: str, val) -> None:
+
+    """ Append `key=value` part, non-string iterable values are repeated as `requests` does """
+
+    if isinstance(val, (str, bytes)) or not hasattr(val, '__iter__'):
+        append(quoted_key + '=' + _quote_value(val))
+    else:
+        for elem in val:
+            if elem is not None:
+                append(quoted_key + '=' + _quote_value(elem))
+
+
+def compress_body(body: bytes, encoding: str, level: int = 6) -> bytes:
+
+    """
+    Compress request body for `Content-Encoding` header
+
+    :param body: bytes, request body
+    :param encoding: str, "gzip" or "deflate" (zlib format, as HTTP defines it)
+    :param level: int, compression level 1 (fastest) .. 9 (smallest)
+    :return: bytes, compressed body
+
+    .. note::
+        zlib releases GIL while compressing, so bodies built by parallel import workers are compressed in parallel.
+    """
+
+    wbits = CONTENT_ENCODINGS.get(encoding)
+    if wbits is None:
+        raise ValueError(f'Unknown request content encoding "{encoding}", use one of: {", ".join(CONTENT_ENCODINGS)}')
+    compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+    return compressor.compress(body) + compressor.flush()
+
+
+def decompress_body(body: bytes, encoding=None) -> bytes:
+
+    """ Return body compressed by `compress_body`, body without `Content-Encoding` is returned as is """
+
+    if not encoding:
+        return body
+    wbits = CONTENT_ENCODINGS.get(encoding)
+    if wbits is None:
+        raise ValueError(f'Unknown request content encoding "{encoding}", use one of: {", ".join(CONTENT_ENCODINGS)}')
+    return zlib.decompress(body, wbits)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import csv
+import json
+import re
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+def _skip(text: str, pos: int) -> int:
+    return _whitespace.match(text, pos).end()
+
+
+def _iter_array(text: str, pos: int):
+
+    """ Decode JSON array started at `pos` element by element """
+
+    pos = _skip(text, pos + 1)
+    if text[pos] == ']':
+        return
+    while True:
+        value, pos = _decoder.raw_decode(text, pos)
+        yield value
+        pos = _skip(text, pos)
+        if text[pos] == ']':
+            return
+        if text[pos] != ',':
+            raise ValueError(f'Expecting "," delimiter at {pos}')
+        pos = _skip(text, pos + 1)
+
+
+def _iter_object(text: str, pos: int):
+
+    """ Iterate (key, value position) pairs of JSON object started at `pos`, values must be skipped by caller """
+
+    pos = _skip(text, pos + 1)
+    if text[pos] == '}':
+        return
+    while True:
+        key, pos = _decoder.raw_decode(text, pos)
+        pos = _skip(text, pos)
+        if text[pos] != ':':
+            raise ValueError(f'Expecting ":" delimiter at {pos}')
+        pos = yield key, _skip(text, pos + 1)
+        pos = _skip(text, pos)
+        if text[pos] == '}':
+            return
+        if text[pos] != ',':
+            raise ValueError(f'Expecting "," delimiter at {pos}')
+        pos = _skip(text, pos + 1)
+
+
+def iter_export_rows(content: bytes, field_names=None):
+
+    """
+    Decode `exportContacts` response rows one by one without building the whole page
+
+    :param content: bytes, response body {"result": {"field_names": [...], "data": [[...], ...]}}
+    :param field_names: None|list, requested field names, used if response `data` goes before `field_names`
+    :return: tuple of field names list and generator of row lists
+    """
+
+    text = content.decode('utf-8')
+    pos = _skip(text, 0)
+    result_pos = None
+    if text[pos] == '{':
+        objects = _iter_object(text, pos)
+        item = next(objects, None)
+        while item is not None:
+            key, pos = item
+            if key == 'result' and text[pos] == '{':
+                result_pos = pos
+                break
+            item = _send(objects, _skip_value(text, pos))
+    if result_pos is None:
+        payload = json.loads(text)
+        result = payload.get('result') or {} if isinstance(payload, dict) else {}
+        return result.get('field_names') or field_names, iter(result.get('data') or [])
+
+    data_pos = None
+    objects = _iter_object(text, result_pos)
+    item = next(objects, None)
+    while item is not None:
+        key, pos = item
+        if key == 'field_names':
+            field_names, pos = _decoder.raw_decode(text, pos)
+        elif key == 'data' and text[pos] == '[':
+            data_pos = pos
+            if field_names is not None:
+                break
+            pos = _skip_value(text, pos)
+        else:
+            pos = _skip_value(text, pos)
+        item = _send(objects, pos)
+    return field_names, iter(()) if data_pos is None else _iter_array(text, data_pos)
+
+
+def _skip_value(text: str, pos: int) -> int:
+
+    """ Return position after JSON value started at `pos` """
+
+    return _decoder.raw_decode(text, pos)[1]
+
+
+def _send(generator, value):
+    try:
+        return generator.send(value)
+    except StopIteration:
+        return None
+
+
+def csv_row_writer(file, field_names: list):
+
+    """ Write CSV header to file object, return function writing one row """
+
+    writer = csv.writer(file)
+    writer.writerow(field_names)
+    return writer.writerow
+
+
+def ndjson_row_writer(file, field_names: list):
+
+    """ Return function writing one row to file object as JSON object line """
+
+    def write(row):
+        file.write(json.dumps(dict(zip(field_names, row)), ensure_ascii=False))
+        file.write('\n')
+
+    return write
+
+
+WRITERS = {
+    'csv': csv_row_writer,
+    'ndjson': ndjson_row_writer,
+}
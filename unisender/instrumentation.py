@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+
+class RequestEvent(object):
+
+    """
+    This class represents one API call for instrumentation hooks
+
+    .. note::
+        `encode_time` is time spent building request body, `wire_time` is time spent in transport
+        for all attempts, `duration` is total time of the call including retry delays.
+    """
+
+    __slots__ = (
+        'method', 'url', 'started', 'duration', 'encode_time', 'wire_time', 'request_bytes', 'response_bytes',
+        'status_code', 'error_code', 'error', 'retries', 'cached', 'response',
+    )
+
+    def __init__(self, method: str, url: str):
+        self.method = method
+        self.url = url
+        self.started = time.perf_counter()
+        self.duration = None
+        self.encode_time = 0.0
+        self.wire_time = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.status_code = None
+        self.error_code = None
+        self.error = None
+        self.retries = 0
+        self.cached = False
+        self.response = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or self.error_code is not None or (
+            self.status_code is not None and self.status_code != 200
+        )
+
+    def get_error_label(self):
+
+        """ Return API error code, HTTP status or exception class name of failed call """
+
+        if self.error is not None:
+            return type(self.error).__name__
+        if self.error_code is not None:
+            return self.error_code
+        if self.status_code != 200:
+            return f'http_{self.status_code}'
+        return None
+
+    def __repr__(self):
+        return f'<RequestEvent {self.method} status={self.status_code} duration={self.duration}>'
+
+
+class Instrumentation(object):
+
+    """
+    Registry of before/after/error hooks receiving RequestEvent
+
+    .. note::
+        Before hooks are called when request body is encoded, after hooks for every finished call
+        (including API errors), error hooks for transport exceptions and HTTP/API errors.
+        Usage example:
+            instrumentation = Instrumentation(metrics=Metrics())
+
+            @instrumentation.on_error
+            def log_error(event):
+                logger.warning('%s failed: %s', event.method, event.get_error_label())
+
+            client = Client(api_key, platform, instrumentation=instrumentation)
+    """
+
+    def __init__(self, metrics=None):
+
+        """
+        :param metrics: None|Metrics, built-in counters and histograms
+        """
+
+        self.before_hooks = []
+        self.after_hooks = []
+        self.error_hooks = []
+        self.metrics = metrics
+        if metrics is not None:
+            self.after_hooks.append(metrics.record)
+            self.error_hooks.append(metrics.record_error)
+
+    def on_before(self, hook):
+        self.before_hooks.append(hook)
+        return hook
+
+    def on_after(self, hook):
+        self.after_hooks.append(hook)
+        return hook
+
+    def on_error(self, hook):
+        self.error_hooks.append(hook)
+        return hook
+
+    def start(self, method: str, url: str) -> RequestEvent:
+        return RequestEvent(method, url)
+
+    def before(self, event: RequestEvent) -> None:
+        for hook in self.before_hooks:
+            hook(event)
+
+    def after(self, event: RequestEvent) -> None:
+
+        """ Finish event of completed call with response """
+
+        response = event.response
+        event.duration = time.perf_counter() - event.started
+        event.status_code = response.status_code
+        event.response_bytes = len(response.content)
+        for hook in self.after_hooks:
+            hook(event)
+        if event.failed:
+            for hook in self.error_hooks:
+                hook(event)
+
+    def fail(self, event: RequestEvent, error: Exception) -> None:
+
+        """ Finish event of call failed with transport exception """
+
+        event.duration = time.perf_counter() - event.started
+        event.error = error
+        for hook in self.error_hooks:
+            hook(event)
+
+
+class Histogram(object):
+
+    """ Cumulative histogram with fixed upper bounds, Prometheus compatible """
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        buckets = {}
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            buckets[str(bound)] = total
+        buckets['+Inf'] = self.count
+        return {'buckets': buckets, 'sum': self.sum, 'count': self.count}
+
+
+class Metrics(object):
+
+    """
+    In-process counters and histograms of API calls, labeled by method
+
+    .. note::
+        Counters: requests, retries, cache hits, request/response bytes, errors by API error code.
+        Histograms: latency (call duration), wire time and body encoding time in seconds.
+    """
+
+    DEFAULT_BOUNDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    COUNTERS = ('requests', 'retries', 'cache_hits', 'request_bytes', 'response_bytes')
+    HISTOGRAMS = ('latency', 'wire_time', 'encode_time')
+
+    def __init__(self, bounds=None):
+
+        """
+        :param bounds: None|tuple, histogram bucket upper bounds in seconds
+        """
+
+        self.bounds = tuple(bounds or self.DEFAULT_BOUNDS)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters = {name: {} for name in self.COUNTERS}
+            self.errors = {}
+            self.histograms = {name: {} for name in self.HISTOGRAMS}
+
+    def _observe(self, name: str, method: str, value: float) -> None:
+        histograms = self.histograms[name]
+        histogram = histograms.get(method)
+        if histogram is None:
+            histogram = histograms[method] = Histogram(self.bounds)
+        histogram.observe(value)
+
+    def _inc(self, name: str, method: str, value=1) -> None:
+        counter = self.counters[name]
+        counter[method] = counter.get(method, 0) + value
+
+    def record(self, event: RequestEvent) -> None:
+
+        """ Record completed call """
+
+        method = event.method
+        with self._lock:
+            self._inc('requests', method)
+            self._inc('request_bytes', method, event.request_bytes)
+            self._inc('response_bytes', method, event.response_bytes)
+            if event.retries:
+                self._inc('retries', method, event.retries)
+            if event.cached:
+                self._inc('cache_hits', method)
+            self._observe('latency', method, event.duration)
+            self._observe('encode_time', method, event.encode_time)
+            if not event.cached:
+                self._observe('wire_time', method, event.wire_time)
+
+    def record_error(self, event: RequestEvent) -> None:
+
+        """ Record failed call by error label """
+
+        key = (event.method, event.get_error_label())
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+            if event.error is not None:
+                self._inc('requests', event.method)
+                if event.retries:
+                    self._inc('retries', event.method, event.retries)
+
+    def snapshot(self) -> dict:
+
+        """ Return metrics as plain dictionaries """
+
+        with self._lock:
+            return {
+                'counters': {name: dict(values) for name, values in self.counters.items()},
+                'errors': [
+                    {'method': method, 'code': code, 'count': count}
+                    for (method, code), count in self.errors.items()
+                ],
+                'histograms': {
+                    name: {method: histogram.snapshot() for method, histogram in values.items()}
+                    for name, values in self.histograms.items()
+                },
+            }
+
+
+class PrometheusExporter(object):
+
+    """
+    Export metrics in Prometheus text format
+
+    .. note::
+        `render()` result may be served by any HTTP handler,
+        `export()` writes file for node_exporter textfile collector.
+    """
+
+    def __init__(self, path=None, prefix: str = 'unisender'):
+
+        """
+        :param path: None|str, file path for `export()`
+        :param prefix: str, metric names prefix
+        """
+
+        self.path = path
+        self.prefix = prefix
+
+    def render(self, metrics: Metrics) -> str:
+        snapshot = metrics.snapshot()
+        lines = []
+        for name, values in snapshot['counters'].items():
+            metric = f'{self.prefix}_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            for method, value in sorted(values.items()):
+                lines.append(f'{metric}{{method="{method}"}} {value}')
+        metric = f'{self.prefix}_errors_total'
+        lines.append(f'# TYPE {metric} counter')
+        for error in snapshot['errors']:
+            code = str(error['code']).replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'{metric}{{method="{error["method"]}",code="{code}"}} {error["count"]}')
+        for name, values in snapshot['histograms'].items():
+            metric = f'{self.prefix}_{name}_seconds'
+            lines.append(f'# TYPE {metric} histogram')
+            for method, histogram in sorted(values.items()):
+                for bound, count in histogram['buckets'].items():
+                    lines.append(f'{metric}_bucket{{method="{method}",le="{bound}"}} {count}')
+                lines.append(f'{metric}_sum{{method="{method}"}} {histogram["sum"]}')
+                lines.append(f'{metric}_count{{method="{method}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, metrics: Metrics) -> None:
+
+        """ Atomically replace file at `path` with rendered metrics """
+
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as fh:
+            fh.write(self.render(metrics))
+        os.replace(tmp_path, self.path)
+
+
+class JSONLinesExporter(object):
+
+    """ Append metrics snapshots to file, one JSON object per line """
+
+    def __init__(self, file):
+
+        """
+        :param file: str|file object, file path or text file object
+        """
+
+        self.file = file
+
+    def export(self, metrics: Metrics) -> None:
+        line = json.dumps(dict(metrics.snapshot(), time=time.time())) + '\n'
+        if isinstance(self.file, str):
+            with open(self.file, 'a') as fh:
+                fh.write(line)
+        else:
+            self.file.write(line)
+            self.file.flush()
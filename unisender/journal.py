@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+import json
+import sqlite3
+import threading
+from unisender.sync import _Transaction
+from unisender.utils import get_fingerprint
+
+
+class SQLiteJobJournal(object):
+
+    """
+    Completed steps of multi-step jobs stored in local SQLite file
+
+    .. note::
+        Keeps outputs of finished API steps (list id, imported batches, message id, ...) by job key,
+        so a job restarted after crash resumes from the first incomplete step.
+        File may be shared by several processes on the same host.
+    """
+
+    def __init__(self, path: str):
+
+        """
+        :param path: str, SQLite database file path, ":memory:" for private in-memory database
+        """
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS unisender_journal '
+            '(job_key TEXT, step TEXT, value TEXT, PRIMARY KEY (job_key, step))'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS unisender_journal_batches '
+            '(job_key TEXT, batch_offset INTEGER, size INTEGER, PRIMARY KEY (job_key, batch_offset))'
+        )
+
+    def job(self, *key_data) -> 'JournalJob':
+
+        """ Return job keyed by fingerprint of `key_data` """
+
+        return JournalJob(self, get_fingerprint(key_data))
+
+    def load(self, job_key: str) -> dict:
+
+        """ Return step -> output of completed steps of job """
+
+        with self._lock:
+            return {
+                step: json.loads(value) for step, value in self._conn.execute(
+                    'SELECT step, value FROM unisender_journal WHERE job_key = ?', (job_key,)
+                )
+            }
+
+    def save(self, job_key: str, step: str, value) -> None:
+
+        """ Store output of completed step, value must be JSON serializable """
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO unisender_journal (job_key, step, value) VALUES (?, ?, ?)',
+                (job_key, step, json.dumps(value))
+            )
+
+    def load_batches(self, job_key: str) -> set:
+
+        """ Return (offset, size) pairs of completed batches of job """
+
+        with self._lock:
+            return set(self._conn.execute(
+                'SELECT batch_offset, size FROM unisender_journal_batches WHERE job_key = ?', (job_key,)
+            ))
+
+    def save_batch(self, job_key: str, offset: int, size: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO unisender_journal_batches (job_key, batch_offset, size) VALUES (?, ?, ?)',
+                (job_key, offset, size)
+            )
+
+    def delete(self, job_key: str) -> None:
+
+        """ Forget all steps of job """
+
+        with self._lock:
+            with _Transaction(self._conn):
+                self._conn.execute('DELETE FROM unisender_journal WHERE job_key = ?', (job_key,))
+                self._conn.execute('DELETE FROM unisender_journal_batches WHERE job_key = ?', (job_key,))
+
+    def clear(self) -> None:
+
+        """ Forget all jobs """
+
+        with self._lock:
+            with _Transaction(self._conn):
+                self._conn.execute('DELETE FROM unisender_journal')
+                self._conn.execute('DELETE FROM unisender_journal_batches')
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class JournalJob(object):
+
+    """
+    Completed steps of one job, see `SQLiteJobJournal`
+
+    .. note::
+        Usage example:
+            job = journal.job('report', report_date)
+            if job.get('uploaded') is None:
+                job.set('uploaded', upload(report))
+            ...
+            job.finish()
+    """
+
+    def __init__(self, journal: SQLiteJobJournal, key: str):
+        self.journal = journal
+        self.key = key
+        self.steps = journal.load(key)
+        self._batches = None
+
+    def get(self, step: str, default=None):
+        return self.steps.get(step, default)
+
+    def set(self, step: str, value) -> None:
+        self.journal.save(self.key, step, value)
+        self.steps[step] = value
+
+    @property
+    def batches(self) -> set:
+
+        """ Return (offset, size) pairs of batches completed by previous runs and this run """
+
+        if self._batches is None:
+            self._batches = self.journal.load_batches(self.key)
+        return self._batches
+
+    def add_batch(self, offset: int, size: int) -> None:
+        self.journal.save_batch(self.key, offset, size)
+        self.batches.add((offset, size))
+
+    def finish(self) -> None:
+
+        """ Forget job after all its steps are completed """
+
+        self.journal.delete(self.key)
+        self.steps = {}
+        self._batches = set()
+
+    def __repr__(self):
+        return f'<JournalJob key={self.key} steps={sorted(self.steps)}>'
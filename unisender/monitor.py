@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from unisender.response import get_payload
+
+
+class CampaignStatus(object):
+
+    """
+    Last known state of monitored campaign
+
+    .. note::
+        `status` and `start_time` come from `getCampaignStatus`, `stats` from `getCampaignCommonStats`
+        (if monitor requests them), `error` keeps the last failed check.
+        Whether the status is terminal is decided by monitor, see `CampaignMonitor.is_terminal`.
+    """
+
+    __slots__ = (
+        'campaign_id', 'status', 'previous_status', 'start_time', 'stats', 'error',
+        'checks', 'interval', 'next_check',
+    )
+
+    def __init__(self, campaign_id):
+        self.campaign_id = campaign_id
+        self.status = None
+        self.previous_status = None
+        self.start_time = None
+        self.stats = None
+        self.error = None
+        self.checks = 0
+        self.interval = None
+        self.next_check = 0.0
+
+    def __repr__(self):
+        return f'<CampaignStatus campaign_id={self.campaign_id} status={self.status} stats={self.stats}>'
+
+
+def parse_start_time(value):
+
+    """ Parse API "YYYY-MM-DD hh:mm[:ss]" UTC time, return aware datetime or None """
+
+    if not value:
+        return None
+    for time_format in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M'):
+        try:
+            return datetime.strptime(value, time_format).replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    return None
+
+
+class CampaignMonitor(object):
+
+    """
+    Polls status of many campaigns concurrently and streams status changes
+
+    .. note::
+        Polling interval adapts to campaign state:
+            - campaigns waiting for moderation or scheduled far ahead are checked less and less often
+              (interval doubles up to `max_interval`), scheduled campaigns are checked again at `start_time`
+              and every `interval` seconds after it;
+            - sending campaigns are checked every `interval` seconds;
+            - campaigns in `TERMINAL_STATUSES` are not checked any more.
+        Concurrent checks of the same campaign share one request, see `check`.
+        Usage example:
+            monitor = CampaignMonitor(client, campaign_ids, stats=True)
+            for campaign in monitor.watch(timeout=3600):
+                print(campaign.campaign_id, campaign.previous_status, '->', campaign.status)
+    """
+
+    TERMINAL_STATUSES = {'completed', 'stopped', 'canceled', 'declined'}
+    WAITING_STATUSES = {'waits_censor', 'censor_hold', 'waits_schedule', 'scheduled'}
+    STATS_STATUSES = {'in_progress', 'analysed', 'completed', 'stopped'}
+
+    def __init__(self, client, campaign_ids=(), interval: float = 30.0, min_interval: float = 5.0,
+                 max_interval: float = 600.0, workers: int = 8, stats: bool = False, on_change=None):
+
+        """
+        :param client: Client|SimpleClient, API client
+        :param campaign_ids: iterable, ids of campaigns to monitor, more may be added by `add`
+        :param interval: float, seconds between checks of sending campaigns
+        :param min_interval: float, min seconds between checks of one campaign
+        :param max_interval: float, max seconds between checks of waiting campaigns
+        :param workers: int, max number of concurrent requests
+        :param stats: bool, request `get_campaign_common_stats` of sending and finished campaigns
+        :param on_change: None|callable, called with CampaignStatus on every status or stats change
+        """
+
+        self.client = client
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.workers = workers
+        self.stats = stats
+        self.on_change = on_change
+        self.campaigns = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        for campaign_id in campaign_ids:
+            self.add(campaign_id)
+
+    def add(self, campaign_id) -> CampaignStatus:
+
+        """ Start monitoring campaign, return its state """
+
+        with self._lock:
+            campaign = self.campaigns.get(campaign_id)
+            if campaign is None:
+                campaign = self.campaigns[campaign_id] = CampaignStatus(campaign_id)
+            return campaign
+
+    def remove(self, campaign_id) -> None:
+        with self._lock:
+            self.campaigns.pop(campaign_id, None)
+
+    def is_terminal(self, campaign: CampaignStatus) -> bool:
+
+        """ Return True if campaign is in one of monitor `TERMINAL_STATUSES` and is not checked any more """
+
+        return campaign.status in self.TERMINAL_STATUSES
+
+    @property
+    def active(self) -> list:
+
+        """ Return monitored campaigns not in terminal state """
+
+        with self._lock:
+            return [campaign for campaign in self.campaigns.values() if not self.is_terminal(campaign)]
+
+    def get_interval(self, campaign: CampaignStatus, changed: bool) -> float:
+
+        """
+        Return seconds until the next check of campaign
+
+        :param campaign: CampaignStatus, checked campaign
+        :param changed: bool, True if status changed by the last check
+        """
+
+        if campaign.error is not None:
+            interval = min(self.max_interval, (campaign.interval or self.interval) * 2)
+        elif campaign.status in self.WAITING_STATUSES:
+            interval = self.interval if changed or not campaign.interval else min(
+                self.max_interval, campaign.interval * 2
+            )
+            if campaign.start_time is not None:
+                until_start = (campaign.start_time - datetime.now(timezone.utc)).total_seconds()
+                interval = min(interval, until_start) if until_start > 0 else self.interval
+        else:
+            interval = self.interval
+        return max(self.min_interval, interval)
+
+    def _fetch(self, campaign_id):
+
+        """ Request campaign status and stats, return (status result, stats result) """
+
+        response = self.client._api_request(method='get_campaign_status', campaign_id=campaign_id)
+        result = self._get_result(response)
+        stats = None
+        if self.stats and result.get('status') in self.STATS_STATUSES:
+            response = self.client._api_request(method='get_campaign_common_stats', campaign_id=campaign_id)
+            stats = self._get_result(response)
+        return result, stats
+
+    @staticmethod
+    def _get_result(response) -> dict:
+        payload = get_payload(response)
+        if payload.get('error') is not None:
+            raise Exception(f"UniSender API error: {payload['error']}")
+        return payload.get('result') or {}
+
+    def _update(self, campaign: CampaignStatus, result=None, stats=None, error=None) -> bool:
+
+        """ Apply check result to campaign state, return True if status or stats changed """
+
+        now = time.monotonic()
+        campaign.checks += 1
+        campaign.error = error
+        changed = False
+        if error is None:
+            status = result.get('status')
+            if status != campaign.status:
+                campaign.previous_status = campaign.status
+                campaign.status = status
+                changed = True
+            campaign.start_time = parse_start_time(result.get('start_time')) or campaign.start_time
+            if stats is not None and stats != campaign.stats:
+                campaign.stats = stats
+                changed = True
+        campaign.interval = self.get_interval(campaign, changed)
+        campaign.next_check = now + campaign.interval
+        if changed and self.on_change is not None:
+            self.on_change(campaign)
+        return changed
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def check(self, campaign_id):
+
+        """
+        Start check of campaign, return Future of (status result, stats result)
+
+        .. note::
+            If the campaign is being checked already, Future of that request is returned.
+        """
+
+        with self._lock:
+            future = self._in_flight.get(campaign_id)
+            if future is not None:
+                return future
+            future = self._get_executor().submit(self._fetch, campaign_id)
+            self._in_flight[campaign_id] = future
+        # callback of already finished future runs at once, so it is added without holding the lock
+        future.add_done_callback(lambda _: self._forget(campaign_id, future))
+        return future
+
+    def _forget(self, campaign_id, future) -> None:
+        with self._lock:
+            if self._in_flight.get(campaign_id) is future:
+                del self._in_flight[campaign_id]
+
+    def _get_due(self) -> list:
+        now = time.monotonic()
+        return [campaign for campaign in self.active if campaign.next_check <= now]
+
+    def _get_delay(self, deadline=None):
+
+        """ Return seconds until the next due check, None if nothing is left to check before deadline """
+
+        active = self.active
+        if not active:
+            return None
+        now = time.monotonic()
+        if deadline is not None and now >= deadline:
+            return None
+        delay = min(campaign.next_check for campaign in active) - now
+        if deadline is not None:
+            delay = min(delay, deadline - now)
+        return max(0.0, delay)
+
+    def poll(self) -> list:
+
+        """ Check all due campaigns concurrently, return list of changed CampaignStatus """
+
+        return list(self._poll_due(self._get_due()))
+
+    def _poll_due(self, due: list):
+        futures = {self.check(campaign.campaign_id): campaign for campaign in due}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                campaign = futures[future]
+                error = future.exception()
+                if error is not None:
+                    self._update(campaign, error=error)
+                elif self._update(campaign, *future.result()):
+                    yield campaign
+
+    def watch(self, timeout=None):
+
+        """
+        Poll campaigns until all of them reach terminal state
+
+        :param timeout: None|float, stop after given number of seconds
+        :return: generator of CampaignStatus, yielded on every status or stats change
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.active:
+            yield from self._poll_due(self._get_due())
+            delay = self._get_delay(deadline)
+            if delay is None:
+                return
+            time.sleep(delay)
+
+    def run(self, timeout=None) -> dict:
+
+        """ Poll until all campaigns finish or timeout, return campaign id -> CampaignStatus """
+
+        for _ in self.watch(timeout):
+            pass
+        return dict(self.campaigns)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AsyncCampaignMonitor(CampaignMonitor):
+
+    """
+    Asyncio campaign monitor for `AsyncClient`, see `CampaignMonitor`
+
+    .. note::
+        Usage example:
+            async with AsyncCampaignMonitor(async_client, campaign_ids) as monitor:
+                async for campaign in monitor.watch():
+                    print(campaign.campaign_id, campaign.status)
+    """
+
+    def __init__(self, client, campaign_ids=(), **kwargs):
+        super().__init__(client, campaign_ids, **kwargs)
+        self._semaphore = None
+
+    async def _fetch(self, campaign_id):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+        async with self._semaphore:
+            response = await self.client._api_request(method='get_campaign_status', campaign_id=campaign_id)
+            result = self._get_result(response)
+            stats = None
+            if self.stats and result.get('status') in self.STATS_STATUSES:
+                response = await self.client._api_request(method='get_campaign_common_stats', campaign_id=campaign_id)
+                stats = self._get_result(response)
+        return result, stats
+
+    def check(self, campaign_id):
+
+        """ Start check of campaign, return Task of (status result, stats result), shared by concurrent calls """
+
+        task = self._in_flight.get(campaign_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(campaign_id))
+            self._in_flight[campaign_id] = task
+            task.add_done_callback(lambda _: self._forget(campaign_id, task))
+        return task
+
+    async def poll(self) -> list:
+
+        """ Check all due campaigns concurrently, return list of changed CampaignStatus """
+
+        return [campaign async for campaign in self._poll_due(self._get_due())]
+
+    async def _poll_due(self, due: list):
+        tasks = {self.check(campaign.campaign_id): campaign for campaign in due}
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                campaign = tasks[task]
+                error = task.exception()
+                if error is not None:
+                    self._update(campaign, error=error)
+                elif self._update(campaign, *task.result()):
+                    yield campaign
+
+    async def watch(self, timeout=None):
+
+        """ Poll campaigns until all of them reach terminal state, async generator of CampaignStatus """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.active:
+            async for campaign in self._poll_due(self._get_due()):
+                yield campaign
+            delay = self._get_delay(deadline)
+            if delay is None:
+                return
+            await asyncio.sleep(delay)
+
+    async def run(self, timeout=None) -> dict:
+
+        """ Poll until all campaigns finish or timeout, return campaign id -> CampaignStatus """
+
+        async for _ in self.watch(timeout):
+            pass
+        return dict(self.campaigns)
+
+    async def close(self) -> None:
+
+        """ Cancel checks in flight and wait until they finish """
+
+        tasks = list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def __enter__(self):
+
+        """ Sync context would not await `close`, checks must be cancelled by `async with` """
+
+        raise TypeError(f'UniSender client error: Use "async with {type(self).__name__}(...)" instead of "with"')
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        raise TypeError(f'UniSender client error: Use "async with {type(self).__name__}(...)" instead of "with"')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
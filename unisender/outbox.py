@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+import json
+import sqlite3
+import threading
+import time
+from itertools import islice
+from unisender.response import HTTP_OK, get_error, get_result
+from unisender.sync import _Transaction, get_contact_key
+
+
+class SQLiteOutboxSpool(object):
+
+    """
+    Pending contact operations of `ContactOutbox` stored in local SQLite file
+
+    .. note::
+        Keeps coalesced state of every contact not imported yet, so operations accepted before
+        a crash or restart are sent by the next outbox started with the same file.
+        File must not be shared by running outboxes.
+    """
+
+    def __init__(self, path: str):
+
+        """
+        :param path: str, SQLite database file path, ":memory:" for private in-memory database
+        """
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS unisender_outbox (email TEXT PRIMARY KEY, state TEXT)')
+
+    def load(self) -> list:
+
+        """ Return (email, state) pairs of pending contacts in order of the last change """
+
+        with self._lock:
+            return [
+                (email, json.loads(state)) for email, state in self._conn.execute(
+                    'SELECT email, state FROM unisender_outbox ORDER BY rowid'
+                )
+            ]
+
+    def save(self, email: str, state: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO unisender_outbox (email, state) VALUES (?, ?)', (email, json.dumps(state))
+            )
+
+    def update(self, saved: dict, deleted) -> None:
+
+        """
+        Store and forget states of many contacts in one transaction
+
+        :param saved: dict, email -> state of contacts still pending
+        :param deleted: iterable, emails of imported contacts
+        """
+
+        with self._lock:
+            with _Transaction(self._conn):
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO unisender_outbox (email, state) VALUES (?, ?)',
+                    ((email, json.dumps(state)) for email, state in saved.items())
+                )
+                self._conn.executemany('DELETE FROM unisender_outbox WHERE email = ?', ((email,) for email in deleted))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM unisender_outbox')
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def merge_states(older, newer) -> dict:
+
+    """ Return contact state with changes of `newer` applied over `older`, either of them may be None """
+
+    if not older or not newer:
+        return newer or older
+    return {
+        'fields': dict(older['fields'], **newer['fields']),
+        'lists': dict(older['lists'], **newer['lists']),
+    }
+
+
+class ContactOutbox(object):
+
+    """
+    Write-behind queue of single contact operations sent by batched `importContacts` calls
+
+    .. note::
+        `subscribe`, `exclude`, `unsubscribe` and `update` return at once, a background thread
+        imports pending contacts when `batch_size` contacts are pending or the oldest one waits `flush_interval`.
+        Operations on the same email are coalesced: fields are merged, the last action on a list wins.
+        No more than `max_pending` contacts are kept, further calls block until the thread catches up.
+        Failed requests are retried every `flush_interval` (client `retry` policy applies to every request),
+        rows rejected by API are dropped and passed to `on_error`.
+        Usage example:
+            outbox = ContactOutbox(client, spool=SQLiteOutboxSpool('/var/lib/app/outbox.sqlite'))
+            outbox.subscribe('user@example.com', list_ids=[list_id], fields={'Name': 'John'})
+            ...
+            outbox.close()
+    """
+
+    ACTIONS = {
+        'subscribe': 'email_list_ids',
+        'exclude': 'email_excluded_list_ids',
+        'unsubscribe': 'email_unsubscribed_list_ids',
+    }
+    ERROR_MESSAGES = {
+        'closed':        'UniSender client error: Contact outbox is closed',
+        'full':          'UniSender client error: Contact outbox is full, %s contacts are pending',
+        'list_ids':      'UniSender client error: Please set "list_ids" to %s contact',
+        'email_missing': 'UniSender client error: Contact email should not be empty',
+        'system_field':  'UniSender client error: Field "%s" is set by outbox actions, not by fields',
+    }
+
+    def __init__(self, client, batch_size: int = 500, flush_interval: float = 5.0, max_pending: int = 100000,
+                 block: bool = True, timeout=None, email_status='active', spool=None, on_error=None):
+
+        """
+        :param client: Client|SimpleClient, API client, custom fields are created by `SimpleClient` only
+        :param batch_size: int, max contacts per `importContacts` request
+        :param flush_interval: float, max seconds a contact waits for import, also retry interval
+        :param max_pending: int, max number of pending contacts
+        :param block: bool, wait for free room when outbox is full, else raise Exception at once
+        :param timeout: None|float, max seconds to wait for free room
+        :param email_status: None|str, status of subscribed contacts, None to keep the current one
+        :param spool: None|SQLiteOutboxSpool, durable storage of pending contacts
+        :param on_error: None|callable, called with email and Exception for every row rejected by API
+        """
+
+        self.client = client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.block = block
+        self.timeout = timeout
+        self.email_status = email_status
+        self.spool = spool
+        self.on_error = on_error
+        self.imported = 0
+        self.rejected = 0
+        self.last_error = None
+        self._pending = {}
+        self._times = {}
+        self._in_flight = {}
+        self._cond = threading.Condition()
+        self._flushing = False
+        self._closing = False
+        self._retry_at = 0.0
+        if spool is not None:
+            now = time.monotonic()
+            for email, state in spool.load():
+                self._pending[email] = state
+                self._times[email] = now
+        self._thread = threading.Thread(target=self._run, name='unisender-outbox', daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+
+        """ Return number of contacts not imported yet """
+
+        with self._cond:
+            return self._count()
+
+    def _count(self) -> int:
+        return len(self._pending) + len(self._in_flight)
+
+    @staticmethod
+    def _get_list_ids(list_ids) -> list:
+        if list_ids is None:
+            return []
+        if isinstance(list_ids, (int, str)):
+            list_ids = str(list_ids).split(',')
+        return [str(list_id).strip() for list_id in list_ids if str(list_id).strip()]
+
+    def _wait_room(self, email: str) -> None:
+
+        """ Block until pending contacts of outbox include email or there is room for it """
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while email not in self._pending and self._count() >= self.max_pending:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if not self.block or (remaining is not None and remaining <= 0):
+                raise Exception(self.ERROR_MESSAGES['full'] % self._count())
+            self._cond.wait(remaining)
+            if self._closing:
+                raise Exception(self.ERROR_MESSAGES['closed'])
+
+    def _add(self, email: str, fields=None, action=None, list_ids=None) -> None:
+
+        """ Coalesce operation into pending state of contact """
+
+        key = get_contact_key({'email': email})
+        if key is None:
+            raise Exception(self.ERROR_MESSAGES['email_missing'])
+        fields = dict(fields or {})
+        for name in fields:
+            if name in self.ACTIONS.values() or name in ('email', 'email_status'):
+                raise Exception(self.ERROR_MESSAGES['system_field'] % name)
+        change = {'fields': fields, 'lists': dict.fromkeys(list_ids or (), action)}
+        with self._cond:
+            if self._closing:
+                raise Exception(self.ERROR_MESSAGES['closed'])
+            self._wait_room(key)
+            state = self._pending.get(key)
+            if state is None:
+                self._times[key] = time.monotonic()
+            state = self._pending[key] = merge_states(state, change)
+            if self.spool is not None:
+                self.spool.save(key, merge_states(self._in_flight.get(key), state))
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    def _add_action(self, action: str, email: str, list_ids, fields=None) -> None:
+        list_ids = self._get_list_ids(list_ids)
+        if not list_ids:
+            raise Exception(self.ERROR_MESSAGES['list_ids'] % action)
+        self._add(email, fields, action, list_ids)
+
+    def subscribe(self, email: str, list_ids, fields=None) -> None:
+
+        """
+        Queue subscription of contact to lists
+
+        :param email: str, contact email
+        :param list_ids: int|str|list, ids of mailing lists, comma separated string or list
+        :param fields: None|dict, contact fields to set, e.g. {"Name": "John"}
+        """
+
+        self._add_action('subscribe', email, list_ids, fields)
+
+    def exclude(self, email: str, list_ids) -> None:
+
+        """ Queue exclusion of contact from lists, contact may be subscribed to them again """
+
+        self._add_action('exclude', email, list_ids)
+
+    def unsubscribe(self, email: str, list_ids) -> None:
+
+        """ Queue unsubscription of contact from lists """
+
+        self._add_action('unsubscribe', email, list_ids)
+
+    def update(self, email: str, fields: dict) -> None:
+
+        """ Queue update of contact fields, subscriptions are not changed """
+
+        self._add(email, fields)
+
+    def _get_row(self, email: str, state: dict) -> tuple:
+
+        """ Return import columns and values of contact """
+
+        names = ['email']
+        values = [email]
+        for name in sorted(state['fields']):
+            names.append(name)
+            value = state['fields'][name]
+            values.append('' if value is None else str(value))
+        for action, column in self.ACTIONS.items():
+            list_ids = [list_id for list_id, list_action in state['lists'].items() if list_action == action]
+            if list_ids:
+                names.append(column)
+                values.append(','.join(list_ids))
+                if action == 'subscribe' and self.email_status is not None:
+                    names.append('email_status')
+                    values.append(self.email_status)
+        return tuple(names), values
+
+    def _group_rows(self, batch: dict) -> dict:
+
+        """ Return import columns -> (emails, rows), contacts with different columns are imported separately """
+
+        groups = {}
+        for email, state in batch.items():
+            names, values = self._get_row(email, state)
+            emails, rows = groups.setdefault(names, ([], []))
+            emails.append(email)
+            rows.append(values)
+        return groups
+
+    def _import(self, field_names: tuple, emails: list, rows: list) -> None:
+
+        """ Send one `importContacts` request, report rows rejected by API """
+
+        create_fields = getattr(self.client, 'create_fields', None)
+        if create_fields is not None:
+            create_fields(list(field_names))
+        response = self.client._api_request(
+            method='import_contacts', field_names=list(field_names), data=rows, overwrite_lists=0
+        )
+        if response.status_code != HTTP_OK:
+            raise Exception(f'UniSender API error: HTTP {response.status_code}')
+        error = get_error(response)
+        if error is not None:
+            raise Exception(f'UniSender API error: {error}')
+        log = get_result(response).get('log') or []
+        self.imported += len(rows) - len(log)
+        self.rejected += len(log)
+        if self.on_error is not None:
+            for row in log:
+                self.on_error(emails[int(row.get('index', 0))], Exception(f"UniSender API error: {row.get('message')}"))
+
+    def _send(self, batch: dict) -> None:
+
+        """ Import batch of contacts, return failed contacts to pending """
+
+        failed = {}
+        for field_names, (emails, rows) in self._group_rows(batch).items():
+            try:
+                self._import(field_names, emails, rows)
+            except Exception as e:
+                self.last_error = e
+                failed.update((email, batch[email]) for email in emails)
+        with self._cond:
+            self._in_flight = {}
+            if failed:
+                self._times = dict(dict.fromkeys(failed, time.monotonic()), **self._times)
+                self._pending = dict(
+                    {email: merge_states(state, self._pending.get(email)) for email, state in failed.items()},
+                    **{email: state for email, state in self._pending.items() if email not in failed}
+                )
+                self._retry_at = time.monotonic() + self.flush_interval
+            else:
+                self._retry_at = 0.0
+            if self.spool is not None:
+                self.spool.update(
+                    {email: self._pending[email] for email in batch if email in self._pending and email not in failed},
+                    [email for email in batch if email not in self._pending]
+                )
+            self._cond.notify_all()
+
+    def _get_delay(self):
+
+        """ Return seconds until the next batch is due, None if the thread should stop """
+
+        now = time.monotonic()
+        if self._retry_at > now:
+            return None if self._closing else self._retry_at - now
+        if self._flushing or self._closing or len(self._pending) >= self.batch_size:
+            return 0.0
+        return self._times[next(iter(self._pending))] + self.flush_interval - now
+
+    def _take_batch(self):
+
+        """ Wait until batch is due, move it to in-flight contacts, return None if the thread should stop """
+
+        while True:
+            if not self._pending:
+                self._flushing = False
+                if self._closing:
+                    return None
+                self._cond.wait()
+                continue
+            delay = self._get_delay()
+            if delay is None:
+                return None
+            if delay <= 0:
+                break
+            self._cond.wait(delay)
+        emails = list(islice(self._pending, self.batch_size))
+        batch = {email: self._pending.pop(email) for email in emails}
+        for email in emails:
+            del self._times[email]
+        self._in_flight = batch
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+                if batch is None:
+                    self._cond.notify_all()
+                    return
+            self._send(batch)
+
+    def flush(self, timeout=None) -> bool:
+
+        """
+        Import all pending contacts now and wait for it
+
+        :param timeout: None|float, max seconds to wait
+        :return: bool, True if no contacts are pending, False if import failed or timed out
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flushing = True
+            self._retry_at = 0.0
+            self._cond.notify_all()
+            while self._count():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if self._retry_at or (remaining is not None and remaining <= 0) or not self._thread.is_alive():
+                    break
+                self._cond.wait(remaining)
+            return not self._count()
+
+    def close(self, timeout=None) -> None:
+
+        """
+        Import pending contacts and stop background thread
+
+        .. note::
+            Contacts which failed to import are kept in `spool` (if set) and sent by the next outbox.
+        """
+
+        with self._cond:
+            self._closing = True
+            self._retry_at = 0.0
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
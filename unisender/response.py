@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+HTTP_OK = 200
+
+_MISSING = object()
+_JSON_START = re.compile(rb'\s*[{\[]')
+
+
+def loads(content: bytes):
+
+    """
+    Decode JSON body by `orjson` if it is installed, else by standard `json`
+
+    .. note::
+        Bodies `orjson` rejects (e.g. unpaired surrogate escapes) are decoded by `json`.
+        `orjson` decodes integers out of 64-bit range as float, API ids and counters fit in 64 bits.
+    """
+
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(content)
+
+
+def get_payload(response):
+
+    """
+    Return decoded JSON body of API response
+
+    .. note::
+        Body is decoded once, the result is memoised on the response obj,
+        so validation, hooks and result access share one decode.
+    """
+
+    payload = getattr(response, '_unisender_payload', _MISSING)
+    if payload is _MISSING:
+        payload = loads(response.content)
+        try:
+            response._unisender_payload = payload
+        except AttributeError:
+            pass
+    return payload
+
+
+def get_result(response):
+
+    """ Return `result` of API response """
+
+    return get_payload(response)['result']
+
+
+def _looks_like_json(content: bytes) -> bool:
+
+    """ Check if body starts as JSON object or array, without copying it """
+
+    return _JSON_START.match(content) is not None
+
+
+def _get_error_payload(response, strict: bool = False):
+
+    """
+    Return decoded body if it may contain API error, JSON body without "error" key is not decoded
+
+    :param strict: bool, raise ValueError for body which is not JSON, else return None for it
+    """
+
+    content = response.content
+    if b'"error"' not in content and (not strict or _looks_like_json(content)):
+        return None
+    try:
+        payload = get_payload(response)
+    except ValueError:
+        if strict:
+            raise
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def get_error(response):
+
+    """
+    Return API error message of response or None
+
+    .. note::
+        Raises ValueError for HTTP 200 body which is not JSON (e.g. HTML page of proxy), as `response.json()` does.
+    """
+
+    payload = _get_error_payload(response, strict=response.status_code == HTTP_OK)
+    return payload.get('error') if payload is not None else None
+
+
+def get_error_code(response):
+
+    """ Return API error code of response or None, HTTP errors have no API error code """
+
+    if response.status_code != HTTP_OK:
+        return None
+    payload = _get_error_payload(response)
+    return payload.get('code') if payload is not None else None
+
+
+def has_error(response) -> bool:
+
+    """
+    Check if response is HTTP error, is not JSON or contains API error,
+    body is decoded only if it contains "error" key
+    """
+
+    if response.status_code != HTTP_OK:
+        return True
+    if b'"error"' not in response.content:
+        return not _looks_like_json(response.content)
+    try:
+        payload = get_payload(response)
+    except ValueError:
+        return True
+    return not isinstance(payload, dict) or payload.get('error') is not None
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import random
+import threading
+import time
+
+
+class RetryPolicy(object):
+
+    """
+    This class decides whether failed API request should be repeated and how long to wait
+
+    .. note::
+        Request is retried when:
+            - connection to server was not established (any method);
+            - server rejected request by rate limit: HTTP 429 or `RATE_LIMIT_CODES` API error (any method);
+            - HTTP 5xx, `RETRY_CODES` API error or connection lost after sending,
+              only for idempotent methods, see `is_idempotent`.
+        Delay grows exponentially with "full jitter": random(0, min(max_backoff, backoff * 2 ** attempt)),
+        `Retry-After` header of rate-limited response is respected.
+    """
+
+    SAFE_PREFIXES = ('get_', 'check_', 'list_', 'export_', 'validate_')
+    IDEMPOTENT_METHODS = {
+        'import_contacts', 'exclude', 'unsubscribe',
+        'update_list', 'delete_list', 'update_field', 'delete_field', 'delete_tag',
+        'update_email_message', 'delete_message', 'update_email_template', 'delete_template',
+        'update_opt_in_email', 'cancel_campaign',
+    }
+    RETRY_STATUSES = {500, 502, 503, 504}
+    RATE_LIMIT_STATUSES = {429}
+    RETRY_CODES = {'retry_later'}
+    RATE_LIMIT_CODES = {'api_call_limit_exceeded_for_api_key', 'api_call_limit_exceeded_for_ip'}
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0,
+                 max_elapsed: float = None):
+
+        """
+        :param max_retries: int, max number of repeats of one request
+        :param backoff: float, base delay in seconds
+        :param max_backoff: float, max delay in seconds between attempts
+        :param max_elapsed: None|float, do not retry after this number of seconds since first attempt
+        """
+
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+
+    def is_idempotent(self, method: str) -> bool:
+
+        """ Check if repeated call of API method has the same effect as a single one """
+
+        return method.startswith(self.SAFE_PREFIXES) or method in self.IDEMPOTENT_METHODS
+
+    def is_rate_limited(self, status_code=None, error_code=None) -> bool:
+        return status_code in self.RATE_LIMIT_STATUSES or error_code in self.RATE_LIMIT_CODES
+
+    def should_retry(self, method: str, attempt: int, started: float, status_code=None, error_code=None,
+                     error=None, sent: bool = True) -> bool:
+
+        """
+        Check if request should be repeated
+
+        :param method: str, snake case API method name
+        :param attempt: int, number of already made retries
+        :param started: float, `time.monotonic()` of the first attempt
+        :param status_code: None|int, HTTP status of response
+        :param error_code: None|str, API error code of response
+        :param error: None|Exception, transport error
+        :param sent: bool, False if transport error happened before request was sent
+        :return: bool
+        """
+
+        if attempt >= self.max_retries:
+            return False
+        if self.max_elapsed is not None and time.monotonic() - started >= self.max_elapsed:
+            return False
+        if error is not None:
+            return not sent or self.is_idempotent(method)
+        if self.is_rate_limited(status_code, error_code):
+            return True
+        if status_code in self.RETRY_STATUSES or error_code in self.RETRY_CODES:
+            return self.is_idempotent(method)
+        return False
+
+    def get_delay(self, attempt: int, retry_after=None) -> float:
+
+        """
+        Return seconds to wait before next attempt
+
+        :param attempt: int, number of already made retries
+        :param retry_after: None|str, `Retry-After` response header
+        """
+
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), self.max_backoff)
+        except ValueError:
+            pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+class TokenBucket(object):
+
+    """
+    Client-side rate limiter, keeps requests rate under account quota
+
+    .. note::
+        Thread safe. `reserve()` books a token and returns delay before it may be used,
+        so sync and async clients sleep their own way.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+
+        """
+        :param rate_per_minute: float, allowed number of requests per minute
+        :param burst: int, number of requests allowed without delay after idle period
+        """
+
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+
+        """ Take one token, return seconds to wait until it becomes available """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+
+        """ Block until request is allowed """
+
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
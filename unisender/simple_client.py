@@ -1,8 +1,83 @@
 # -*- coding: utf-8 -*-
-import requests
-from copy import deepcopy
-from unisender.client import Client
-from unisender.utils import get_unique_hash
+import re
+import threading
+import time
+import weakref
+from itertools import chain
+from unisender.client import HTTP_OK, Client
+from unisender.columnar import get_column_names, iter_column_batches, iter_csv_batches, open_csv
+from unisender.encoding import FormMatrix
+from unisender.export import WRITERS, iter_export_rows
+from unisender.response import get_error, get_error_code, get_result
+from unisender.sync import ContactDiff, SyncResult
+from unisender.utils import get_fingerprint, get_unique_hash, iter_chunks
+
+_LIST_TITLE = re.compile(r'mailing_list_\d+$')
+
+
+class ImportResult(object):
+
+    """
+    Combined result of batched `importContacts` calls
+
+    .. note::
+        `log` keeps API row-level errors with `index` shifted to the position in the whole input,
+        `errors` keeps failed batches as {'offset': int, 'size': int, 'error': str}
+    """
+
+    COUNTERS = ('total', 'inserted', 'updated', 'deleted', 'new_emails', 'invalid')
+
+    def __init__(self):
+        self.batches = 0
+        self.log = []
+        self.errors = []
+        for key in self.COUNTERS:
+            setattr(self, key, 0)
+
+    def add_batch(self, offset: int, result: dict) -> None:
+
+        """ Add `importContacts` API result of the batch started from `offset` """
+
+        self.batches += 1
+        for key in self.COUNTERS:
+            setattr(self, key, getattr(self, key) + int(result.get(key) or 0))
+        for row in result.get('log') or []:
+            self.log.append(dict(row, index=offset + int(row.get('index', 0))))
+
+    def add_error(self, offset: int, size: int, error) -> None:
+
+        """ Add failed batch started from `offset` """
+
+        self.batches += 1
+        self.errors.append({'offset': offset, 'size': size, 'error': str(error)})
+
+    def sort(self) -> None:
+
+        """ Order row errors and failed batches by position in the input """
+
+        self.log.sort(key=lambda row: row['index'])
+        self.errors.sort(key=lambda batch: batch['offset'])
+
+    def __repr__(self):
+        counters = ', '.join(f'{key}={getattr(self, key)}' for key in self.COUNTERS)
+        return f'<ImportResult batches={self.batches}, {counters}, errors={len(self.errors)}>'
+
+
+class CampaignResult(object):
+
+    """ Result of campaign creation: `campaign_id` if created, else `error` """
+
+    def __init__(self, index: int, campaign_id=None, error=None):
+        self.index = index
+        self.campaign_id = campaign_id
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.campaign_id is not None
+
+    def __repr__(self):
+        return f'<CampaignResult index={self.index}, campaign_id={self.campaign_id}, error={self.error!r}>'
 
 
 class SimpleClient(Client):
@@ -10,6 +85,13 @@ class SimpleClient(Client):
     """ This class represents the client for simple mailing """
 
     COMMON_EMAIL_ARGS = []
+    IMPORT_BATCH_SIZE = 500
+    IMPORT_WORKERS = 4
+    EXPORT_PAGE_SIZE = 5000
+    CAMPAIGN_WORKERS = 4
+    LEGACY_LIST_TITLES = True
+    MESSAGE_LOCK_CLASS = threading.Lock
+    SYNC_REMOVE_METHODS = ('exclude', 'unsubscribe')
     REQUIRED_EMAIL_ARGS = {
         'text': ['sender_name', 'sender_email', 'text_body', 'subject'],
         'html': ['sender_name', 'sender_email', 'body', 'subject'],
@@ -24,6 +106,9 @@ class SimpleClient(Client):
         'email_missing_fields':   'UniSender client error: Please fill "email_data" required field(s): %s',
         'email_recipients_empty': 'UniSender client error: The recipient list should not be empty!',
         'request_error':          'UniSender client error: Request failed [status: %s] [URL: %s] Details: %s',
+        'import_error':           'UniSender client error: %s contacts batch(es) failed to import. First error: %s',
+        'sync_store_missing':     'UniSender client error: Please set "sync_store" to sync contacts',
+        'sync_remove_error':      'UniSender client error: Unknown removed contacts action "%s", use one of: %s',
     }
 
     def _validate_recipients(self, recipients: list) -> None:
@@ -50,42 +135,183 @@ class SimpleClient(Client):
             fields = set(self.REQUIRED_EMAIL_ARGS[email_type]) - set(data.keys())
             raise Exception(self.ERROR_MESSAGES['email_missing_fields'] % ', '.join(fields))
 
-    def _validate_response(self, response: requests.Response) -> None:
+    def _validate_response(self, response: 'requests.Response') -> None:
 
-        """ Raise Exception for failed API response """
+        """ Raise Exception for failed API response, API error code is kept in its `code` attribute """
 
-        if response.status_code == requests.codes.ok:
-            error = response.json().get('error')
+        if response.status_code == HTTP_OK:
+            error = get_error(response)
             if error is not None:
-                raise Exception(
+                exception = Exception(
                     self.ERROR_MESSAGES['request_error'] % (response.status_code, response.request.url, error)
                 )
+                exception.code = get_error_code(response)
+                raise exception
         else:
             raise Exception(
                 self.ERROR_MESSAGES['request_error'] % (response.status_code, response.request.url, 'HTTP error')
             )
 
-    def after_request(self, response: requests.Response) -> None:
+    def after_request(self, response: 'requests.Response') -> None:
 
         """ Check API response """
 
         self._validate_response(response)
 
+    def __init__(self, api_key: str, platform: str, sync_store=None, journal=None, message_cache=None, **kwargs):
+
+        """
+        Configures simple mailing client
+
+        :param sync_store: None|SQLiteSyncStore, state of synchronized contacts,
+                           if set, campaigns import new and changed recipients only, see `sync_contacts`
+        :param journal: None|SQLiteJobJournal, completed steps of campaign creation,
+                        if set, campaign restarted after failure resumes from the first incomplete step
+        :param message_cache: None|bool|MessageCache, templates of repeated email messages,
+                              True for in-memory cache, see `create_email_message`
+        :param index_ttl: None|float, seconds after which list and field indexes are reloaded,
+                          None to keep them until `refresh()`, campaign list missing in the index reloads it anyway
+        :param kwargs: dict, see `Client.__init__`
+        """
+
+        super().__init__(api_key, platform, **kwargs)
+        self._sync_store = sync_store
+        self._journal = journal
+        if message_cache is True:
+            from unisender.cache import MessageCache
+            message_cache = MessageCache()
+        self._message_cache = message_cache or None
+        self._message_locks = weakref.WeakValueDictionary()
+        self._message_locks_lock = threading.Lock()
+        self._list_index = None
+        self._field_index = None
+        self._index_loaded = {}
+
+    def _is_index_fresh(self, name: str) -> bool:
+
+        """ Check if index `lists` or `fields` is loaded and not expired """
+
+        loaded = self._index_loaded.get(name)
+        ttl = self._config.get('index_ttl')
+        return loaded is not None and (ttl is None or time.monotonic() - loaded < ttl)
+
+    def _load_list_index(self, lists: list) -> dict:
+
+        """ Build title -> id index from `get_lists` result, the last list wins for duplicate titles """
+
+        self._list_index = {elem['title']: elem['id'] for elem in lists}
+        self._index_loaded['lists'] = time.monotonic()
+        return self._list_index
+
+    def _load_field_index(self, fields: list) -> set:
+
+        """ Build field names index from `get_fields` result """
+
+        self._field_index = {api_field['name'] for api_field in fields}
+        self._index_loaded['fields'] = time.monotonic()
+        return self._field_index
+
+    def _get_list_index(self) -> dict:
+        if self._is_index_fresh('lists'):
+            return self._list_index
+        return self._load_list_index(get_result(self.get_lists()))
+
+    def _get_field_index(self) -> set:
+        if self._is_index_fresh('fields'):
+            return self._field_index
+        return self._load_field_index(get_result(self.get_fields()))
+
+    def _index_created_list(self, title, response) -> None:
+
+        """ Add list created by client to index """
+
+        if self._list_index is not None and title is not None:
+            self._list_index[title] = get_result(response)['id']
+
+    def _index_created_field(self, name, response) -> None:
+
+        """ Add field created by client to index """
+
+        if self._field_index is not None and name is not None:
+            self._field_index.add(name)
+
+    def refresh(self) -> None:
+
+        """ Reload list and field indexes """
+
+        self._load_list_index(get_result(self.get_lists()))
+        self._load_field_index(get_result(self.get_fields()))
+
+    def create_list(self, **data) -> 'requests.Response':
+
+        """ Create mailing list, see `createList` API method """
+
+        response = self._api_request(method='create_list', **data)
+        self._index_created_list(data.get('title'), response)
+        return response
+
+    def update_list(self, **data) -> 'requests.Response':
+
+        """ Update mailing list, list index is reloaded on next lookup """
+
+        self._index_loaded.pop('lists', None)
+        return self._api_request(method='update_list', **data)
+
+    def delete_list(self, **data) -> 'requests.Response':
+
+        """ Delete mailing list, list index is reloaded on next lookup """
+
+        self._index_loaded.pop('lists', None)
+        return self._api_request(method='delete_list', **data)
+
+    def create_field(self, **data) -> 'requests.Response':
+
+        """ Create contacts field, see `createField` API method """
+
+        response = self._api_request(method='create_field', **data)
+        self._index_created_field(data.get('name'), response)
+        return response
+
+    def update_field(self, **data) -> 'requests.Response':
+
+        """ Update contacts field, field index is reloaded on next lookup """
+
+        self._index_loaded.pop('fields', None)
+        return self._api_request(method='update_field', **data)
+
+    def delete_field(self, **data) -> 'requests.Response':
+
+        """ Delete contacts field, field index is reloaded on next lookup """
+
+        self._index_loaded.pop('fields', None)
+        return self._api_request(method='delete_field', **data)
+
     def find_list_id(self, title: str):
 
         """
-        Get or create mailing list by the specified unique title
+        Get mailing list id by the specified unique title
 
         :param title: str, mailing list unique title
         :return:  mailing list id or None
+
+        .. note::
+            `get_lists` is requested once, then lists are looked up in the client index,
+            see `refresh()` and `index_ttl` config param
         """
 
-        result = None
-        response = self.get_lists()
-        for elem in response.json()['result']:
-            if elem['title'] == title:
-                result = elem['id']
-        return result
+        return self._get_list_index().get(title)
+
+    def find_list_ids(self, titles) -> dict:
+
+        """
+        Get mailing list ids for many titles in a single pass
+
+        :param titles: iterable, mailing list titles
+        :return: dict, title -> list id or None
+        """
+
+        index = self._get_list_index()
+        return {title: index.get(title) for title in titles}
 
     def create_fields(self, field_names: list, field_type: str = 'string') -> None:
 
@@ -96,94 +322,490 @@ class SimpleClient(Client):
         :param field_type: str, field type, one of: string, text, number, date, bool
         """
 
-        response = self.get_fields()
-        existing_field_names = self.EMAIL_SYSTEM_FIELDS.copy()
-        for api_field in response.json()['result']:
-            existing_field_names.add(api_field['name'])
-
-        field_names = set(field_names) - existing_field_names
-        for field_name in field_names:
+        for field_name in self._get_missing_fields(self._get_field_index(), field_names):
             self.create_field(name=field_name, type=field_type)
 
-    def import_contacts(self, recipients: list, email_list_ids=None) -> requests.Response:
+    def _get_missing_fields(self, field_index: set, field_names: list) -> set:
+
+        """ Return field names absent in field index and system fields """
+
+        return set(field_names) - self.EMAIL_SYSTEM_FIELDS - field_index
+
+    @staticmethod
+    def _create_contacts_field_names(recipients: list) -> list:
 
         """
-        Import and subscribe recipients list in API
+        Creates `field_names` list from `recipients` for 'create_contacts' method
 
         :param recipients: list, of dictionaries that represents contacts data
-        :param email_list_ids: list, ids of the mailing lists to which created contacts will be subscribed
-        :return: requests.Response
+        :return: list contacts data fields names
+
+        .. note::
+            Example:
+            recipients = [
+                {"name": "John Lennon", "email": "example_1@gmail.com"},
+                {"name": "Paul McCartney", "email": "example2@gmail.com"}
+            ]
+
+            return ["name", "email", "email_status", "email_list_ids"]
         """
 
-        def _create_contacts_field_names(recipients: list) -> list:
+        field_names = list(recipients[0].keys())
+        for field_name in ('email_status', 'email_list_ids'):
+            if field_name not in field_names:
+                field_names.append(field_name)
+        return field_names
 
-            """
-            Creates `field_names` list from `recipients` for 'create_contacts' method
+    @staticmethod
+    def _create_contacts_data(field_names: list, recipients: list, email_list_ids: list) -> list:
 
-            :param recipients: list, of dictionaries that represents contacts data
-            :return: list contacts data fields names
+        """
+        Converts `recipients` data to format accepted for 'create_contacts' method
 
-            .. note::
-                Example:
-                recipients = [
-                    {"name": "John Lennon", "email": "example_1@gmail.com"},
-                    {"name": "Paul McCartney", "email": "example2@gmail.com"}
-                ]
+        :param field_names: list, represents fields of created contacts
+        :param recipients: list, of dictionaries with created contacts data
+        :param email_list_ids: list, ids of the lists to which created contacts will be subscribed
+        :return: list of lists with contacts data ordered by field_names
 
-                return ["name", "email"]
-            """
+        .. note::
+            Example:
+            recipients = [
+                {"name": "John Lennon", "email": "example_1@gmail.com"},
+                {"name": "Paul McCartney", "email": "example2@gmail.com"}
+            ]
 
-            field_names = set(recipients[0].keys())
-            field_names.add('email_status')
-            field_names.add('email_list_ids')
-            return list(field_names)
+            field_names = ["name", "email"]
 
-        def _create_contacts_data(field_names: list, recipients: list, email_list_ids: list) -> list:
+            return [
+                ["John Lennon", "example_1@gmail.com"],
+                ["Paul McCartney", "example_2@gmail.com"],
+            ]
+        """
+
+        system_values = {
+            'email_status': 'active',
+            'email_list_ids': ','.join([str(el) for el in email_list_ids]),
+        }
+        return [
+            [system_values[key] if key in system_values else str(contact[key]) for key in field_names]
+            for contact in recipients
+        ]
 
-            """
-            Converts `recipients` data to format accepted for 'create_contacts' method
+    def _import_contacts_batch(self, field_names: list, recipients: list, email_list_ids: list):
 
-            :param field_names: list, represents fields of created contacts
-            :param recipients: list, of dictionaries with created contacts data
-            :param email_list_ids: list, ids of the lists to which created contacts will be subscribed
-            :return: list of lists with contacts data ordered by field_names
+        """ Send one `import_contacts` request for recipients batch """
 
-            .. note::
-                Example:
-                recipients = [
-                    {"name": "John Lennon", "email": "example_1@gmail.com"},
-                    {"name": "Paul McCartney", "email": "example2@gmail.com"}
-                ]
+        return self._api_request(
+            method='import_contacts',
+            field_names=field_names,
+            data=self._create_contacts_data(field_names, recipients, email_list_ids),
+            overwrite_lists=1
+        )
 
-                field_names = ["name", "email"]
+    def _iter_import_batches(self, recipients, batch_size=None):
 
-                return [
-                    ["John Lennon", "example_1@gmail.com"],
-                    ["Paul McCartney", "example_2@gmail.com"],
-                ]
-            """
+        """
+        Split recipients to `importContacts` batches
 
-            data = []
-            contacts = deepcopy(recipients)
-            for contact in contacts:
-                contact['email_status'] = 'active'
-                contact['email_list_ids'] = ','.join([str(el) for el in email_list_ids])
-                data.append([str(contact[key]) for key in field_names])
-            return data
+        :param recipients: iterable, of dictionaries that represents contacts data
+        :param batch_size: None|int, batch size, API maximum by default
+        :return: tuple of field names and generator of (offset, batch) pairs
+        """
+
+        iterator = iter(recipients)
+        first = next(iterator, None)
+        if first is None:
+            raise Exception(self.ERROR_MESSAGES['email_recipients_empty'])
+        field_names = self._create_contacts_field_names([first])
+
+        def batches():
+            offset = 0
+            for batch in iter_chunks(chain([first], iterator), batch_size or self.IMPORT_BATCH_SIZE):
+                yield offset, batch
+                offset += len(batch)
+
+        return field_names, batches()
+
+    def import_contacts(self, recipients: list, email_list_ids=None) -> 'requests.Response':
+
+        """
+        Import and subscribe recipients list in API
+
+        :param recipients: list, of dictionaries that represents contacts data
+        :param email_list_ids: list, ids of the mailing lists to which created contacts will be subscribed
+        :return: requests.Response
+        """
 
         if not email_list_ids:
             email_list_ids = []
-        field_names = _create_contacts_field_names(recipients)
-        data = _create_contacts_data(field_names, recipients, email_list_ids)
+        field_names = self._create_contacts_field_names(recipients)
         self.create_fields(field_names)
+        return self._import_contacts_batch(field_names, recipients, email_list_ids)
+
+    def import_contacts_stream(self, recipients, email_list_ids=None, batch_size=None, workers=None,
+                               job=None) -> ImportResult:
+
+        """
+        Import and subscribe recipients of any size by batches of API maximum size
+
+        :param recipients: iterable, list or generator of dictionaries that represents contacts data
+        :param email_list_ids: list, ids of the mailing lists to which created contacts will be subscribed
+        :param batch_size: None|int, contacts per request, `IMPORT_BATCH_SIZE` by default
+        :param workers: None|int, number of parallel requests, `IMPORT_WORKERS` by default
+        :param job: None|JournalJob, journal job recording imported batches, see `SQLiteJobJournal`
+        :return: ImportResult, combined result of all batches
+
+        .. note::
+            Recipients are read lazily, only `workers` batches are kept in memory.
+            Failed batches do not stop the import, see `ImportResult.errors`.
+            Batches recorded by `job` are skipped and not counted in the result,
+            so repeated import of the same recipients with the same `batch_size` uploads the rest only.
+        """
+
+        email_list_ids = email_list_ids or []
+        field_names, batches = self._iter_import_batches(recipients, batch_size)
+        self.create_fields(field_names)
+        return self._run_import(
+            batches, lambda batch: self._import_contacts_batch(field_names, batch, email_list_ids), workers, job
+        )
+
+    @staticmethod
+    def _skip_imported_batches(batches, job):
+
+        """ Filter out batches recorded by journal job """
+
+        if job is None or not job.batches:
+            return batches
+        imported = job.batches
+        return ((offset, batch) for offset, batch in batches if (offset, len(batch)) not in imported)
+
+    def _run_import(self, batches, send, workers=None, job=None) -> ImportResult:
+
+        """
+        Send import batches in parallel threads
+
+        :param batches: iterator of (offset, batch) pairs, read under lock
+        :param send: callable, sends one batch and returns `import_contacts` response
+        :param workers: None|int, number of parallel requests, `IMPORT_WORKERS` by default
+        :param job: None|JournalJob, skip batches recorded by job and record imported ones
+        :return: ImportResult
+
+        .. note::
+            Exception raised by `batches` (e.g. malformed input) stops the import and is re-raised.
+        """
+
+        batches = self._skip_imported_batches(batches, job)
+        result = ImportResult()
+        lock = threading.Lock()
+        failures = []
+
+        def worker():
+            while True:
+                with lock:
+                    if failures:
+                        return
+                    try:
+                        item = next(batches, None)
+                    except Exception as e:
+                        failures.append(e)
+                        return
+                if item is None:
+                    return
+                offset, batch = item
+                try:
+                    batch_result = get_result(send(batch))
+                    if job is not None:
+                        job.add_batch(offset, len(batch))
+                except Exception as e:
+                    with lock:
+                        result.add_error(offset, len(batch), e)
+                else:
+                    with lock:
+                        result.add_batch(offset, batch_result)
+
+        threads = [threading.Thread(target=worker) for _ in range(workers or self.IMPORT_WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if failures:
+            raise failures[0]
+        result.sort()
+        return result
+
+    @staticmethod
+    def _get_system_columns(field_names: list, email_list_ids: list) -> list:
+
+        """ Return (field name, value) pairs of system import columns absent in field names """
+
+        system_values = (
+            ('email_status', 'active'),
+            ('email_list_ids', ','.join([str(el) for el in email_list_ids])),
+        )
+        return [(key, val) for key, val in system_values if key not in field_names]
+
+    def _import_columns_batch(self, field_names: list, columns: list, system_values: list):
+
+        """ Send one `import_contacts` request for batch of str columns """
+
+        size = len(columns[0]) if columns else 0
         return self._api_request(
             method='import_contacts',
             field_names=field_names,
-            data=data,
+            data=FormMatrix(columns + [[val] * size for val in system_values]),
             overwrite_lists=1
         )
 
-    def create_email_message(self, **data) -> requests.Response:
+    def _prepare_columns_import(self, column_names: list, email_list_ids) -> tuple:
+
+        """ Return import field names and system column values """
+
+        system_columns = self._get_system_columns(column_names, email_list_ids or [])
+        field_names = list(column_names) + [key for key, _ in system_columns]
+        return field_names, [val for _, val in system_columns]
+
+    def import_contacts_columns(self, columns, email_list_ids=None, batch_size=None, workers=None) -> ImportResult:
+
+        """
+        Import and subscribe contacts given by columns, without building a dictionary per contact
+
+        :param columns: dict of column name -> list|NumPy array|pandas Series|pyarrow array,
+                        pandas DataFrame, pyarrow Table or NumPy structured array
+        :param email_list_ids: list, ids of the mailing lists to which created contacts will be subscribed
+        :param batch_size: None|int, contacts per request, `IMPORT_BATCH_SIZE` by default
+        :param workers: None|int, number of parallel requests, `IMPORT_WORKERS` by default
+        :return: ImportResult, combined result of all batches
+
+        .. note::
+            Column slices are converted to str by one call per batch (`astype(str)` for NumPy and pandas)
+            and urlencoded column by column. "email_status" and "email_list_ids" columns are added
+            unless present in `columns`.
+        """
+
+        column_names = get_column_names(columns)
+        if not column_names:
+            raise Exception(self.ERROR_MESSAGES['email_recipients_empty'])
+        field_names, system_values = self._prepare_columns_import(column_names, email_list_ids)
+        batches = iter_column_batches(columns, column_names, batch_size or self.IMPORT_BATCH_SIZE)
+        self.create_fields(field_names)
+        return self._run_import(
+            batches, lambda batch: self._import_columns_batch(field_names, batch, system_values), workers
+        )
+
+    def import_contacts_csv(self, file, email_list_ids=None, batch_size=None, workers=None,
+                            encoding: str = 'utf-8', **csv_params) -> ImportResult:
+
+        """
+        Import and subscribe contacts from CSV file with header row, reading it by batches
+
+        :param file: str|file object, file path or text file object
+        :param email_list_ids: list, ids of the mailing lists to which created contacts will be subscribed
+        :param batch_size: None|int, contacts per request, `IMPORT_BATCH_SIZE` by default
+        :param workers: None|int, number of parallel requests, `IMPORT_WORKERS` by default
+        :param encoding: str, file encoding, used for file path only
+        :param csv_params: dict, `csv.reader` params, e.g. delimiter=";"
+        :return: ImportResult, combined result of all batches
+
+        .. note::
+            Header row gives field names. Only `workers` batches of rows are kept in memory,
+            CSV cells are sent as is, short rows are padded with empty cells.
+        """
+
+        fh, reader = open_csv(file, encoding, **csv_params)
+        try:
+            column_names = next(reader, None)
+            if not column_names:
+                raise Exception(self.ERROR_MESSAGES['email_recipients_empty'])
+            field_names, system_values = self._prepare_columns_import(column_names, email_list_ids)
+            batches = iter_csv_batches(reader, len(column_names), batch_size or self.IMPORT_BATCH_SIZE)
+            self.create_fields(field_names)
+            return self._run_import(
+                batches, lambda batch: self._import_columns_batch(field_names, batch, system_values), workers
+            )
+        finally:
+            if fh is not None:
+                fh.close()
+
+    def _check_import_result(self, result: ImportResult) -> None:
+
+        """ Raise Exception if any contacts batch failed """
+
+        if result.errors:
+            raise Exception(self.ERROR_MESSAGES['import_error'] % (len(result.errors), result.errors[0]['error']))
+
+    def _get_sync_store(self, store=None):
+        store = store if store is not None else self._sync_store
+        if store is None:
+            raise Exception(self.ERROR_MESSAGES['sync_store_missing'])
+        return store
+
+    def _check_remove_method(self, removed) -> None:
+        if removed is not None and removed not in self.SYNC_REMOVE_METHODS:
+            raise Exception(self.ERROR_MESSAGES['sync_remove_error'] % (removed, ', '.join(self.SYNC_REMOVE_METHODS)))
+
+    def _remove_contact(self, list_id: int, email: str, removed: str):
+        return self._api_request(method=removed, contact_type='email', contact=email, list_ids=list_id)
+
+    def sync_contacts(self, recipients, list_id: int, removed=None, full: bool = False, store=None,
+                      batch_size=None, workers=None) -> SyncResult:
+
+        """
+        Incrementally synchronize mailing list with recipients: import new and changed contacts only
+
+        :param recipients: iterable, list or generator of dictionaries that represents contacts data
+        :param list_id: int, mailing list id
+        :param removed: None|str, "exclude" or "unsubscribe" contacts synchronized before but absent in recipients,
+                        None to keep them in the list
+        :param full: bool, forget stored state and import all recipients
+        :param store: None|SQLiteSyncStore, `sync_store` of the client by default
+        :param batch_size: None|int, contacts per request, `IMPORT_BATCH_SIZE` by default
+        :param workers: None|int, number of parallel requests, `IMPORT_WORKERS` by default
+        :return: SyncResult
+
+        .. note::
+            Contacts are matched by email, content hash of every imported contact is stored per list.
+            Hashes are stored only for successfully imported contacts, so contacts of failed batches
+            and rows rejected by API are retried by the next sync. Repeated emails are imported once, the first wins.
+            Contacts kept in the list (`removed` is None) are reported as removed by every sync.
+            Usage example:
+                client = SimpleClient(api_key, platform, sync_store=SQLiteSyncStore('/var/lib/app/sync.sqlite'))
+                result = client.sync_contacts(read_contacts(), list_id=123, removed='exclude')
+        """
+
+        store = self._get_sync_store(store)
+        self._check_remove_method(removed)
+        if full:
+            store.clear(list_id)
+        diff = ContactDiff(store.load(list_id))
+        contacts = diff.filter(recipients)
+        import_result = None
+        first = next(contacts, None)
+        if first is not None:
+            import_result = self.import_contacts_stream(
+                chain([first], contacts), email_list_ids=[list_id], batch_size=batch_size, workers=workers
+            )
+            store.save(list_id, diff.get_imported(import_result))
+
+        result = SyncResult(diff, import_result)
+        if removed is not None and result.removed:
+            def remove(email):
+                try:
+                    self._remove_contact(list_id, email, removed)
+                    return email
+                except Exception as e:
+                    result.add_error(email, e)
+
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=workers or self.IMPORT_WORKERS) as executor:
+                store.delete(list_id, [email for email in executor.map(remove, result.removed) if email])
+        return result
+
+    def _export_contacts_page(self, offset: int, limit: int, field_names, params: dict):
+        return self._api_request(
+            method='export_contacts', field_names=field_names, offset=offset, limit=limit, **params
+        )
+
+    def _iter_export(self, field_names=None, page_size=None, prefetch=True, **params):
+
+        """
+        Iterate exported contacts rows page by page
+
+        :return: generator of (field names, row list) pairs
+        """
+
+        limit = page_size or self.EXPORT_PAGE_SIZE
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        next_page = None
+        try:
+            offset = 0
+            response = self._export_contacts_page(offset, limit, field_names, params)
+            while True:
+                offset += limit
+                names, rows = iter_export_rows(response.content, field_names)
+                if executor is not None:
+                    rows = list(rows)
+                    if len(rows) == limit:
+                        next_page = executor.submit(self._export_contacts_page, offset, limit, field_names, params)
+                del response
+                count = 0
+                for row in rows:
+                    count += 1
+                    yield names, row
+                if count < limit:
+                    return
+                if next_page is not None:
+                    response = next_page.result()
+                    next_page = None
+                else:
+                    response = self._export_contacts_page(offset, limit, field_names, params)
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def iter_export_contacts(self, field_names=None, columns=None, page_size=None, prefetch=True, **params):
+
+        """
+        Export contacts one by one with offset paging
+
+        :param field_names: None|list, exported fields, API default fields if None
+        :param columns: None|list, yield tuples of these fields instead of dictionaries
+        :param page_size: None|int, contacts per request, `EXPORT_PAGE_SIZE` (API maximum) by default
+        :param prefetch: bool, request next page in background while current one is consumed
+        :param params: dict, other `exportContacts` params, e.g. list_id, email_status
+        :return: generator of dictionaries or tuples
+
+        .. note::
+            Rows are decoded from the page one by one, so only one raw page is kept in memory.
+            With prefetch the page is decoded at once and the next page is requested
+            in background only if the page is full, so the last page costs no extra request.
+            Usage example:
+                for email, name in client.iter_export_contacts(['email', 'name'], columns=['email', 'name'], list_id=1):
+                    ...
+        """
+
+        indexes = None
+        for names, row in self._iter_export(field_names, page_size, prefetch, **params):
+            if columns is None:
+                yield dict(zip(names, row))
+                continue
+            if indexes is None:
+                indexes = [names.index(column) for column in columns]
+            yield tuple(row[index] for index in indexes)
+
+    def export_contacts_to_file(self, file, file_format: str = 'csv', field_names=None, page_size=None,
+                                prefetch=True, **params) -> int:
+
+        """
+        Export contacts to CSV or NDJSON file at constant memory
+
+        :param file: str|file object, file path or text file object
+        :param file_format: str, one of: csv, ndjson
+        :param field_names: None|list, exported fields, API default fields if None
+        :param page_size: None|int, contacts per request, `EXPORT_PAGE_SIZE` by default
+        :param prefetch: bool, request next page in background while current one is written
+        :param params: dict, other `exportContacts` params, e.g. list_id, email_status
+        :return: int, number of exported contacts
+        """
+
+        if isinstance(file, str):
+            with open(file, 'w', newline='', encoding='utf-8') as fh:
+                return self.export_contacts_to_file(fh, file_format, field_names, page_size, prefetch, **params)
+
+        write = None
+        count = 0
+        for names, row in self._iter_export(field_names, page_size, prefetch, **params):
+            if write is None:
+                write = WRITERS[file_format](file, names)
+            write(row)
+            count += 1
+        if write is None:
+            WRITERS[file_format](file, field_names or [])
+        return count
+
+    def create_email_message(self, **data) -> 'requests.Response':
 
         """
         Create email message with given data
@@ -194,12 +816,206 @@ class SimpleClient(Client):
         .. note::
             Convert category list to specific API format:
             from list: ['first', 'second'] to str: 'first, second'
+            With `message_cache` set, HTML body is uploaded once as email template and messages
+            with the same content reference it by `template_id`, see `MessageCache`.
+        """
+
+        key = self._get_message_cache_key(data)
+        if key is None:
+            return self._api_request(method='create_email_message', **self._prepare_email_message_data(data))
+        template_data, message_data = self._message_cache.split(data)
+        template_id = self._get_message_template(key, template_data)
+        try:
+            return self._create_template_message(template_id, message_data)
+        except Exception as e:
+            if not self._is_missing_template_error(e):
+                raise
+            self._forget_message_template(key, template_id)
+        template_id = self._get_message_template(key, template_data)
+        return self._create_template_message(template_id, message_data)
+
+    def _get_message_template(self, key: str, template_data: dict) -> int:
+
+        """
+        Return cached template id of message content, create template if it is not cached
+
+        .. note::
+            Template creation is guarded by per-key lock, so concurrent messages with the same content
+            wait for one `createEmailTemplate` request instead of creating a template each.
         """
 
+        template_id = self._message_cache.get(key)
+        if template_id is not None:
+            return template_id
+        with self._get_message_lock(key):
+            template_id = self._message_cache.get(key)
+            if template_id is None:
+                response = self._api_request(
+                    method='create_email_template', title=self._message_cache.get_title(key), **template_data
+                )
+                template_id = get_result(response)['template_id']
+                self._message_cache.set(key, template_id)
+        return template_id
+
+    def _forget_message_template(self, key: str, template_id: int) -> None:
+
+        """ Drop missing template from `message_cache` unless it was replaced by another request already """
+
+        with self._get_message_lock(key):
+            if self._message_cache.get(key) == template_id:
+                self._message_cache.delete(key)
+
+    def _get_message_lock(self, key: str):
+
+        """ Return lock of `message_cache` key, the lock lives while anybody holds or waits for it """
+
+        with self._message_locks_lock:
+            lock = self._message_locks.get(key)
+            if lock is None:
+                lock = self._message_locks[key] = self.MESSAGE_LOCK_CLASS()
+            return lock
+
+    def _is_missing_template_error(self, error: Exception) -> bool:
+
+        """ Check if message failed because cached template was deleted from account """
+
+        return getattr(error, 'code', None) in self._message_cache.MISSING_TEMPLATE_CODES
+
+    def _get_message_cache_key(self, data: dict):
+
+        """ Return `message_cache` key of message data or None if message is not cached """
+
+        if self._message_cache is None:
+            return None
+        return self._message_cache.get_key(self._config['api_key'], data)
+
+    def _create_template_message(self, template_id: int, message_data: dict):
+        data = self._prepare_email_message_data(dict(message_data, template_id=template_id))
+        return self._api_request(method='create_email_message', **data)
+
+    @staticmethod
+    def _prepare_email_message_data(data: dict) -> dict:
+
+        """ Convert `create_email_message` data to API format """
+
         categories = data.get('categories')
         if categories is not None:
             data['categories'] = ','.join(str(el) for el in categories)
-        return self._api_request(method='create_email_message', **data)
+        return data
+
+    @staticmethod
+    def _get_list_title(recipients: list, fingerprint=None) -> str:
+
+        """ Return unique mailing list title for given recipients or their precomputed `get_fingerprint` """
+
+        fingerprint = fingerprint or get_fingerprint(recipients)
+        return f'mailing_list_{int(fingerprint, 16) % 10 ** 10}'
+
+    @staticmethod
+    def _get_legacy_list_title(recipients: list) -> str:
+
+        """ Return mailing list title given to recipients by versions before `get_fingerprint` titles """
+
+        return f'mailing_list_{get_unique_hash(recipients)}'
+
+    def _find_recipients_list_id(self, recipients: list, list_title: str):
+
+        """
+        Get id of mailing list created for recipients or None
+
+        .. note::
+            Lists created by previous versions are titled by `get_unique_hash`, if `LEGACY_LIST_TITLES` is set
+            and there is no list with the current title, the list with legacy title is reused.
+            If the list is not found in the index loaded earlier, the index is reloaded before giving up,
+            so the list created outside the client is not created again.
+        """
+
+        cached = self._is_index_fresh('lists')
+        list_id = self._match_recipients_list(self._get_list_index(), recipients, list_title)
+        if list_id is None and cached:
+            index = self._load_list_index(get_result(self.get_lists()))
+            list_id = self._match_recipients_list(index, recipients, list_title)
+        return list_id
+
+    def _match_recipients_list(self, index: dict, recipients: list, list_title: str):
+
+        """
+        Look up recipients mailing list in list index by current and legacy title
+
+        .. note::
+            Legacy title hashes all recipients, it is computed only if the current title is not found
+            and the index has other lists titled like mailing lists of the client.
+        """
+
+        list_id = index.get(list_title)
+        if list_id is None and self.LEGACY_LIST_TITLES and any(
+            title != list_title and _LIST_TITLE.match(title) for title in index
+        ):
+            list_id = index.get(self._get_legacy_list_title(recipients))
+        return list_id
+
+    def _get_journal_jobs(self, recipients: list, campaigns: list) -> tuple:
+
+        """
+        Return journal jobs of mailing list preparation and of every campaign
+
+        :param recipients: list, of dictionaries that represents contacts data
+        :param campaigns: list, of (email_data, campaign_data) pairs
+        :return: tuple of recipients fingerprint, list job and list of campaign jobs, jobs are None without journal
+
+        .. note::
+            List job is keyed by API key and recipients, campaign job also by campaign position and data,
+            so the same call restarted after failure gets the same jobs.
+        """
+
+        fingerprint = get_fingerprint(recipients)
+        if self._journal is None:
+            return fingerprint, None, [None] * len(campaigns)
+        api_key = self._config['api_key']
+        list_job = self._journal.job('mailing_list', api_key, fingerprint)
+        jobs = [
+            self._journal.job('campaign', api_key, fingerprint, index, email_data, campaign_data)
+            for index, (email_data, campaign_data) in enumerate(campaigns)
+        ]
+        return fingerprint, list_job, jobs
+
+    @staticmethod
+    def _finish_journal_jobs(list_job, jobs: list) -> None:
+
+        """ Forget journal jobs of successfully created campaigns """
+
+        for job in chain([list_job], jobs):
+            if job is not None:
+                job.finish()
+
+    @staticmethod
+    def _prepare_campaign_data(campaign_data, message_id) -> dict:
+
+        """
+        Build `create_campaign` data for created email message
+
+        :param campaign_data: None|dict, data for `create_campaign` method, it is not changed
+        :param message_id: int, created email message id
+        :return: dict
+        """
+
+        campaign_data = dict(campaign_data or {}, message_id=message_id)
+        start_time = campaign_data.get('start_time')
+        if start_time:
+            campaign_data['start_time'] = start_time.strftime("%Y-%m-%d %H:%M")
+        return campaign_data
+
+    @staticmethod
+    def _apply_campaign_defaults(campaign: dict, default_email_data=None, default_campaign_data=None) -> dict:
+
+        """ Return copy of campaign with `email_data` and `campaign_data` filled with default values """
+
+        email_data = dict(default_email_data or {})
+        email_data.update(campaign.get('email_data') or {})
+        campaign_data = dict(campaign.get('campaign_data') or {})
+        if default_campaign_data and campaign_data:
+            campaign_data = dict(default_campaign_data, **campaign_data)
+        return dict(campaign, email_data=email_data, campaign_data=campaign_data)
 
     def create_email_campaign(self, recipients: list, email_data: dict, campaign_data=None) -> int:
 
@@ -218,6 +1034,8 @@ class SimpleClient(Client):
                 3. import_contacts
                 4. create_email_message
                 5. create_campaign
+            With `journal` set, completed steps are recorded and the same call restarted after failure
+            resumes from the first incomplete step or import batch.
 
             Usage example:
             # -----------------
@@ -277,41 +1095,95 @@ class SimpleClient(Client):
 
         self._validate_recipients(recipients)
         self._validate_email_data(email_data)
+        fingerprint, list_job, jobs = self._get_journal_jobs(recipients, [(email_data, campaign_data)])
+        list_id = self._prepare_mailing_list(recipients, fingerprint, list_job)
+        campaign_id = self._create_list_campaign(list_id, email_data, campaign_data, jobs[0])
+        self._finish_journal_jobs(list_job, jobs)
+        return campaign_id
+
+    def _prepare_mailing_list(self, recipients, fingerprint=None, job=None) -> int:
+
+        """
+        Get or create mailing list for recipients, create fields and import contacts
 
-        recipients_hash = get_unique_hash(recipients)
-        list_title = f'mailing_list_{recipients_hash}'
-        list_id = self.find_list_id(list_title)
+        :param recipients: list, of dictionaries that represents contacts data
+        :param fingerprint: None|str, precomputed `get_fingerprint` of recipients
+        :param job: None|JournalJob, skip steps and import batches completed by previous run
+        :return: int, mailing list id
+        """
+
+        steps = job.steps if job is not None else {}
+        list_id = steps.get('list_id')
+        created = steps.get('list_created', False)
         if list_id is None:
-            response = self.create_list(title=list_title)
-            list_id = response.json()['result']['id']
+            list_title = self._get_list_title(recipients, fingerprint)
+            list_id = self._find_recipients_list_id(recipients, list_title)
+            created = list_id is None
+            if created:
+                response = self.create_list(title=list_title)
+                list_id = get_result(response)['id']
+            if job is not None:
+                job.set('list_created', created)
+                job.set('list_id', list_id)
+        if steps.get('imported'):
+            return list_id
+
+        if self._sync_store is not None:
+            import_result = self.sync_contacts(recipients, list_id, full=created).import_result
+        else:
+            import_result = self.import_contacts_stream(recipients, email_list_ids=[list_id], job=job)
+        if import_result is not None:
+            self._check_import_result(import_result)
+        if job is not None:
+            job.set('imported', True)
+        return list_id
 
-        email_data['list_id'] = list_id
+    def _create_list_campaign(self, list_id: int, email_data: dict, campaign_data=None, job=None) -> int:
 
-        self.import_contacts(recipients, email_list_ids=[list_id])
-        response = self.create_email_message(**email_data)
+        """
+        Create email message and campaign for prepared mailing list
 
-        if campaign_data is None:
-            campaign_data = {}
-        campaign_data['message_id'] = response.json()['result']['message_id']
-        start_time = campaign_data.get('start_time')
-        if start_time:
-            campaign_data['start_time'] = start_time.strftime("%Y-%m-%d %H:%M")
+        :param list_id: int, mailing list id
+        :param email_data: dict, data for `create_email_message` method
+        :param campaign_data: None|dict, data for `create_campaign` method
+        :param job: None|JournalJob, skip steps completed by previous run
+        :return: int, created campaign id
+        """
 
+        steps = job.steps if job is not None else {}
+        if steps.get('campaign_id') is not None:
+            return steps['campaign_id']
+        message_id = steps.get('message_id')
+        if message_id is None:
+            response = self.create_email_message(**dict(email_data, list_id=list_id))
+            message_id = get_result(response)['message_id']
+            if job is not None:
+                job.set('message_id', message_id)
+
+        campaign_data = self._prepare_campaign_data(campaign_data, message_id)
         response = self._api_request(method='create_campaign', **campaign_data)
-        return response.json()['result']['campaign_id']
+        campaign_id = get_result(response)['campaign_id']
+        if job is not None:
+            job.set('campaign_id', campaign_id)
+        return campaign_id
 
     def create_email_campaigns(self, campaigns: list, recipients: list,
-                                    default_email_data=None, default_campaign_data=None):
+                                    default_email_data=None, default_campaign_data=None, workers=None):
 
         """
-        Create many email campaigns. Makes a set of calls the "create_email_campaign" method
+        Create many email campaigns for the same recipients, see `create_email_campaigns_pipeline`
 
         :param campaigns: list, see example below
         :param recipients: list of dictionaries, represents contacts data
         :param default_email_data: None|dict, default data for `create_email_message` method
         :param default_campaign_data: None|dict, default data for `create_campaign` method
+        :param workers: None|int, number of campaigns created in parallel, `CAMPAIGN_WORKERS` by default
         :return: list, created campaigns ids
 
+        .. note::
+            Raises Exception with number of the first failed campaign,
+            other campaigns are created anyway.
+
         ..note::
 
             Usage example:
@@ -351,24 +1223,86 @@ class SimpleClient(Client):
             )
         """
 
-        campaign_ids = []
+        results = self.create_email_campaigns_pipeline(
+            campaigns, recipients, default_email_data, default_campaign_data, workers=workers
+        )
+        return self._get_campaign_ids(results)
+
+    def _get_campaign_ids(self, results: list) -> list:
+
+        """ Return created campaign ids, raise Exception for the first failed campaign """
+
+        for result in results:
+            if result.error is not None:
+                raise Exception(f'{result.error}. Campaign number: {result.index}')
+        return [result.campaign_id for result in results]
+
+    def _prepare_campaigns(self, campaigns: list, recipients: list,
+                           default_email_data=None, default_campaign_data=None) -> tuple:
+
+        """
+        Apply defaults and validate campaigns
+
+        :return: tuple of campaigns copies with defaults and list of CampaignResult for each of them,
+                 given campaigns are not changed
+        """
+
+        self._validate_recipients(recipients)
+        prepared = []
+        results = []
         for campaign_num, campaign in enumerate(campaigns):
-            campaign.setdefault('email_data', {})
-            campaign.setdefault('campaign_data', {})
-            if default_email_data:
-                for key, val in default_email_data.items():
-                    campaign['email_data'].setdefault(key, val)
-            if default_campaign_data and campaign.get('campaign_data'):
-                for key, val in default_campaign_data.items():
-                    campaign['campaign_data'].setdefault(key, val)
+            campaign = self._apply_campaign_defaults(campaign, default_email_data, default_campaign_data)
+            result = CampaignResult(campaign_num)
+            try:
+                self._validate_email_data(campaign['email_data'])
+            except Exception as e:
+                result.error = e
+            prepared.append(campaign)
+            results.append(result)
+        return prepared, results
+
+    def create_email_campaigns_pipeline(self, campaigns: list, recipients: list, default_email_data=None,
+                                        default_campaign_data=None, workers=None) -> list:
+
+        """
+        Create many email campaigns for the same recipients concurrently
+
+        :param campaigns: list, of dictionaries with `email_data` and `campaign_data`, see `create_email_campaigns`
+        :param recipients: list of dictionaries, represents contacts data
+        :param default_email_data: None|dict, default data for `create_email_message` method
+        :param default_campaign_data: None|dict, default data for `create_campaign` method
+        :param workers: None|int, number of campaigns created in parallel, `CAMPAIGN_WORKERS` by default
+        :return: list of CampaignResult in order of `campaigns`
+
+        .. note::
+            Mailing list, fields and contacts import are made once for all campaigns,
+            then `create_email_message` and `create_campaign` run in parallel.
+            Failed campaign does not stop others, see `CampaignResult.error`.
+            With `journal` set, repeated call skips steps and campaigns completed by the failed one,
+            journal forgets them when all campaigns are created.
+        """
+
+        campaigns, results = self._prepare_campaigns(campaigns, recipients, default_email_data, default_campaign_data)
+        pending = [result for result in results if result.error is None]
+        if not pending:
+            return results
+        fingerprint, list_job, jobs = self._get_journal_jobs(
+            recipients, [(campaign['email_data'], campaign.get('campaign_data')) for campaign in campaigns]
+        )
+        list_id = self._prepare_mailing_list(recipients, fingerprint, list_job)
+
+        def create(result):
+            campaign = campaigns[result.index]
             try:
-                campaign_id = self.create_email_campaign(
-                    recipients=recipients,
-                    email_data=campaign['email_data'],
-                    campaign_data=campaign.get('campaign_data')
+                result.campaign_id = self._create_list_campaign(
+                    list_id, campaign['email_data'], campaign.get('campaign_data'), jobs[result.index]
                 )
             except Exception as e:
-                raise Exception(f'{e}. Campaign number: {campaign_num}')
-            else:
-                campaign_ids.append(campaign_id)
-        return campaign_ids
+                result.error = e
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers or self.CAMPAIGN_WORKERS) as executor:
+            list(executor.map(create, pending))
+        if all(result.ok for result in pending):
+            self._finish_journal_jobs(list_job, jobs)
+        return results
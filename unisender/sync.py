@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import threading
+from unisender.utils import get_fingerprint
+
+
+def get_contact_key(contact: dict):
+
+    """ Return normalized email of contact or None if it has no email """
+
+    email = contact.get('email')
+    if not email:
+        return None
+    return str(email).strip().lower()
+
+
+def get_contact_hash(contact: dict) -> str:
+    return get_fingerprint(contact)
+
+
+class SQLiteSyncStore(object):
+
+    """
+    Per-list state of synchronized contacts stored in local SQLite file
+
+    .. note::
+        Keeps content hash of every contact imported to a list,
+        so the next sync uploads new and changed contacts only.
+        File may be shared by several processes on the same host.
+    """
+
+    def __init__(self, path: str):
+
+        """
+        :param path: str, SQLite database file path, ":memory:" for private in-memory database
+        """
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS unisender_sync '
+            '(list_id INTEGER, email TEXT, hash TEXT, PRIMARY KEY (list_id, email))'
+        )
+
+    def load(self, list_id: int) -> dict:
+
+        """ Return email -> content hash of contacts synchronized to list """
+
+        with self._lock:
+            return dict(self._conn.execute(
+                'SELECT email, hash FROM unisender_sync WHERE list_id = ?', (list_id,)
+            ))
+
+    def save(self, list_id: int, items) -> None:
+
+        """
+        Store content hashes of imported contacts
+
+        :param list_id: int, mailing list id
+        :param items: iterable, of (email, hash) pairs
+        """
+
+        with self._lock:
+            with self._transaction():
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO unisender_sync (list_id, email, hash) VALUES (?, ?, ?)',
+                    ((list_id, email, contact_hash) for email, contact_hash in items)
+                )
+
+    def delete(self, list_id: int, emails) -> None:
+
+        """ Forget contacts removed from list """
+
+        with self._lock:
+            with self._transaction():
+                self._conn.executemany(
+                    'DELETE FROM unisender_sync WHERE list_id = ? AND email = ?',
+                    ((list_id, email) for email in emails)
+                )
+
+    def clear(self, list_id=None) -> None:
+
+        """ Forget all contacts of list or of all lists if `list_id` is None """
+
+        with self._lock:
+            if list_id is None:
+                self._conn.execute('DELETE FROM unisender_sync')
+            else:
+                self._conn.execute('DELETE FROM unisender_sync WHERE list_id = ?', (list_id,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+
+class _Transaction(object):
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN')
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+class ContactDiff(object):
+
+    """
+    Diff of incoming recipients against synchronized state of a list
+
+    .. note::
+        `filter` lazily passes through new and changed contacts only and remembers their hashes
+        in order, so hashes of successfully imported contacts can be stored afterwards.
+        Repeated emails are passed once: the first occurrence wins, later ones are counted in `duplicates`.
+        Contacts left in `known` after filtering are removed since the last sync.
+    """
+
+    def __init__(self, known: dict):
+
+        """
+        :param known: dict, email -> content hash loaded from sync store
+        """
+
+        self.known = known
+        self.pending = []
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.duplicates = 0
+
+    def filter(self, recipients):
+
+        """ Yield new and changed contacts of recipients """
+
+        known = self.known
+        seen = set()
+        for contact in recipients:
+            key = get_contact_key(contact)
+            if key is not None:
+                if key in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(key)
+            contact_hash = get_contact_hash(contact)
+            previous = known.pop(key, None)
+            if previous == contact_hash:
+                self.unchanged += 1
+                continue
+            if previous is None:
+                self.inserted += 1
+            else:
+                self.updated += 1
+            self.pending.append((key, contact_hash))
+            yield contact
+
+    @property
+    def removed(self) -> list:
+        return list(self.known)
+
+    def get_imported(self, import_result) -> list:
+
+        """ Return (email, hash) pairs of imported contacts, except failed batches and rows rejected by API """
+
+        failed = [False] * len(self.pending)
+        for error in import_result.errors:
+            failed[error['offset']:error['offset'] + error['size']] = [True] * error['size']
+        for row in import_result.log:
+            if 0 <= row['index'] < len(failed):
+                failed[row['index']] = True
+        return [
+            item for item, is_failed in zip(self.pending, failed)
+            if not is_failed and item[0] is not None
+        ]
+
+
+class SyncResult(object):
+
+    """
+    Result of incremental contacts sync
+
+    .. note::
+        `import_result` is None if nothing was imported,
+        `errors` keeps failed removals as {'email': str, 'error': str}
+    """
+
+    def __init__(self, diff: ContactDiff, import_result=None):
+        self.inserted = diff.inserted
+        self.updated = diff.updated
+        self.unchanged = diff.unchanged
+        self.duplicates = diff.duplicates
+        self.removed = diff.removed
+        self.import_result = import_result
+        self.errors = []
+
+    def add_error(self, email: str, error) -> None:
+        self.errors.append({'email': email, 'error': str(error)})
+
+    def __repr__(self):
+        return (
+            f'<SyncResult inserted={self.inserted} updated={self.updated} unchanged={self.unchanged} '
+            f'duplicates={self.duplicates} removed={len(self.removed)} errors={len(self.errors)}>'
+        )
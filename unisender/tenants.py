@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+from collections import deque
+from unisender.client import Client
+
+
+class FairScheduler(object):
+
+    """
+    Shares concurrent request slots between tenants in round-robin order
+
+    .. note::
+        No more than `max_concurrency` requests run at once and no more than tenant quota per tenant.
+        When all slots are busy, freed slot goes to the next tenant with waiting requests,
+        so a tenant with thousands of queued requests gets the same share as a tenant with one.
+        Thread safe, `acquire` blocks the calling thread, see `AsyncFairScheduler` for asyncio.
+    """
+
+    def __init__(self, max_concurrency: int = 10, tenant_concurrency: int = None):
+
+        """
+        :param max_concurrency: int, max number of requests of all tenants in flight
+        :param tenant_concurrency: None|int, default max number of requests of one tenant in flight
+        """
+
+        self.max_concurrency = max_concurrency
+        self.tenant_concurrency = tenant_concurrency or max_concurrency
+        self.quotas = {}
+        self.active = 0
+        self._tenant_active = {}
+        self._waiters = {}
+        self._rotation = deque()
+        self._lock = threading.Lock()
+
+    def set_quota(self, tenant, concurrency: int) -> None:
+
+        """ Set max number of requests of tenant in flight """
+
+        with self._lock:
+            self.quotas[tenant] = concurrency
+            granted = self._dispatch()
+        self._wake(granted)
+
+    def remove(self, tenant) -> None:
+
+        """ Forget quota of tenant, its requests in flight and waiting requests are served as usual """
+
+        with self._lock:
+            self.quotas.pop(tenant, None)
+            granted = self._dispatch()
+        self._wake(granted)
+
+    def get_quota(self, tenant) -> int:
+        return self.quotas.get(tenant, self.tenant_concurrency)
+
+    def get_active(self, tenant) -> int:
+
+        """ Return number of requests of tenant in flight """
+
+        return self._tenant_active.get(tenant, 0)
+
+    def _can_start(self, tenant) -> bool:
+        return self.active < self.max_concurrency and self.get_active(tenant) < self.get_quota(tenant)
+
+    def _start(self, tenant) -> None:
+        self.active += 1
+        self._tenant_active[tenant] = self.get_active(tenant) + 1
+
+    def _enqueue(self, tenant, waiter) -> None:
+        waiters = self._waiters.get(tenant)
+        if waiters is None:
+            waiters = self._waiters[tenant] = deque()
+            self._rotation.append(tenant)
+        waiters.append(waiter)
+
+    def _discard(self, tenant, waiter) -> None:
+
+        """ Remove waiter which stopped waiting before it got a slot """
+
+        waiters = self._waiters.get(tenant)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        if not waiters:
+            del self._waiters[tenant]
+            self._rotation.remove(tenant)
+
+    def _dispatch(self) -> list:
+
+        """ Grant free slots to waiting tenants in round-robin order, return granted waiters """
+
+        granted = []
+        rotation = self._rotation
+        skipped = 0
+        while rotation and self.active < self.max_concurrency and skipped < len(rotation):
+            tenant = rotation.popleft()
+            if self.get_active(tenant) >= self.get_quota(tenant):
+                rotation.append(tenant)
+                skipped += 1
+                continue
+            skipped = 0
+            waiters = self._waiters[tenant]
+            granted.append(waiters.popleft())
+            self._start(tenant)
+            if waiters:
+                rotation.append(tenant)
+            else:
+                del self._waiters[tenant]
+        return granted
+
+    def _release(self, tenant) -> list:
+        self.active -= 1
+        active = self._tenant_active[tenant] - 1
+        if active:
+            self._tenant_active[tenant] = active
+        else:
+            del self._tenant_active[tenant]
+        return self._dispatch()
+
+    @staticmethod
+    def _wake(granted: list) -> None:
+        for waiter in granted:
+            waiter.set()
+
+    def acquire(self, tenant) -> None:
+
+        """ Block until tenant gets a request slot """
+
+        with self._lock:
+            if not self._rotation and self._can_start(tenant):
+                self._start(tenant)
+                return
+            waiter = threading.Event()
+            self._enqueue(tenant, waiter)
+            granted = self._dispatch()
+        self._wake(granted)
+        waiter.wait()
+
+    def release(self, tenant) -> None:
+
+        """ Free request slot of tenant """
+
+        with self._lock:
+            granted = self._release(tenant)
+        self._wake(granted)
+
+
+class AsyncFairScheduler(FairScheduler):
+
+    """ Asyncio version of `FairScheduler`, waiters are futures of the running event loop """
+
+    @staticmethod
+    def _wake(granted: list) -> None:
+        for waiter in granted:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def acquire(self, tenant) -> None:
+
+        """ Wait until tenant gets a request slot """
+
+        with self._lock:
+            if not self._rotation and self._can_start(tenant):
+                self._start(tenant)
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._enqueue(tenant, waiter)
+            granted = self._dispatch()
+        self._wake(granted)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.done() and not waiter.cancelled():
+                    granted = self._release(tenant)
+                else:
+                    self._discard(tenant, waiter)
+                    granted = self._dispatch()
+            self._wake(granted)
+            raise
+
+
+class TenantSession(object):
+
+    """ Transport of one tenant: sends request by shared session when scheduler grants a slot """
+
+    def __init__(self, session, scheduler: FairScheduler, tenant):
+        self.session = session
+        self.scheduler = scheduler
+        self.tenant = tenant
+
+    def post(self, url: str, **kwargs):
+        self.scheduler.acquire(self.tenant)
+        try:
+            return self.session.post(url, **kwargs)
+        finally:
+            self.scheduler.release(self.tenant)
+
+
+class AsyncTenantSession(TenantSession):
+
+    async def post(self, url: str, **kwargs):
+        await self.scheduler.acquire(self.tenant)
+        try:
+            return await self.session.post(url, **kwargs)
+        finally:
+            self.scheduler.release(self.tenant)
+
+
+class ClientPool(object):
+
+    """
+    Hands out per-API-key clients sharing one connection pool
+
+    .. note::
+        Every tenant (API key) gets its own lightweight client with its own config and rate limiter,
+        requests of all tenants go through one HTTP session and are scheduled fairly, see `FairScheduler`.
+        Usage example:
+            with ClientPool(SimpleClient, max_concurrency=20, tenant_concurrency=4, rate_limit=1200) as pool:
+                client = pool.get(customer.api_key, platform='shop')
+                client.import_contacts_stream(contacts, email_list_ids=[list_id])
+    """
+
+    scheduler_class = FairScheduler
+    session_class = TenantSession
+
+    def __init__(self, client_class=None, max_concurrency: int = 10, tenant_concurrency: int = None,
+                 platform: str = None, **client_kwargs):
+
+        """
+        :param client_class: None|type, class of handed out clients, `Client` by default
+        :param max_concurrency: int, max number of requests of all tenants in flight, also connection pool size
+        :param tenant_concurrency: None|int, default max number of requests of one tenant in flight
+        :param platform: None|str, default API tracking marker
+        :param client_kwargs: dict, params of every client, see `Client.__init__`,
+                              e.g. `rate_limit` for per-tenant requests per minute
+        """
+
+        self.client_class = client_class or self._get_default_client_class()
+        self.platform = platform
+        self.client_kwargs = dict(client_kwargs)
+        self.client_kwargs.setdefault('pool_maxsize', max_concurrency)
+        self.scheduler = self.scheduler_class(max_concurrency, tenant_concurrency)
+        self._clients = {}
+        self._session = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_default_client_class():
+        return Client
+
+    @property
+    def session(self):
+
+        """ Return HTTP session shared by all clients, create it on first use """
+
+        if self._session is None:
+            self._session = self.client_class(None, self.platform, **self.client_kwargs)._create_session()
+        return self._session
+
+    def get(self, api_key: str, platform: str = None, concurrency: int = None, **kwargs):
+
+        """
+        Return client of tenant, create it on first call
+
+        :param api_key: str, API key of tenant
+        :param platform: None|str, API tracking marker, pool `platform` by default
+        :param concurrency: None|int, max number of tenant requests in flight, pool `tenant_concurrency` by default
+        :param kwargs: dict, client params overriding pool `client_kwargs`, e.g. `rate_limit`,
+                       connection pool params are ignored
+        :return: client of `client_class`
+
+        .. note::
+            Params are applied when client is created, later calls return the same client.
+        """
+
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                if concurrency is not None:
+                    self.scheduler.set_quota(api_key, concurrency)
+                session = self.session_class(self.session, self.scheduler, api_key)
+                client = self.client_class(
+                    api_key, platform or self.platform, session=session, **dict(self.client_kwargs, **kwargs)
+                )
+                self._clients[api_key] = client
+            return client
+
+    def remove(self, api_key: str) -> None:
+
+        """ Forget client of tenant """
+
+        with self._lock:
+            self._clients.pop(api_key, None)
+            self.scheduler.remove(api_key)
+
+    def __len__(self):
+        return len(self._clients)
+
+    def close(self) -> None:
+
+        """ Close shared connections """
+
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AsyncClientPool(ClientPool):
+
+    """
+    Hands out per-API-key asyncio clients sharing one `httpx.AsyncClient`, see `ClientPool`
+
+    .. note::
+        Usage example:
+            async with AsyncClientPool(max_concurrency=50, tenant_concurrency=10) as pool:
+                await asyncio.gather(*[
+                    pool.get(api_key).send_email(**params) for api_key, params in jobs
+                ])
+    """
+
+    scheduler_class = AsyncFairScheduler
+    session_class = AsyncTenantSession
+
+    @staticmethod
+    def _get_default_client_class():
+        from unisender.async_client import AsyncClient
+        return AsyncClient
+
+    async def close(self) -> None:
+
+        """ Close shared connections """
+
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
+
+    def __enter__(self):
+        raise TypeError(f'UniSender client error: Use "async with {type(self).__name__}(...)" instead of "with"')
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        raise TypeError(f'UniSender client error: Use "async with {type(self).__name__}(...)" instead of "with"')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
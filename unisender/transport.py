@@ -0,0 +1,651 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from urllib.parse import parse_qsl
+from unisender.encoding import decompress_body
+from unisender.response import HTTP_OK
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+RECORDED_HEADERS = ('Content-Type', 'Retry-After')
+DRY_RUN_TIME = '2024-01-01 00:00:00'
+
+_API_KEY_PARAM = re.compile(rb'(^|&)api_key=[^&]*')
+
+
+def get_api_method(url: str) -> str:
+
+    """ Return camel case API method name of request url """
+
+    return url.rsplit('/', 1)[-1].split('?', 1)[0]
+
+
+def get_request_body(data, headers=None) -> bytes:
+
+    """ Return urlencoded request body, decompressed if it was sent with `Content-Encoding` """
+
+    if data is None:
+        return b''
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return decompress_body(data, (headers or {}).get('Content-Encoding'))
+
+
+def get_request_key(body: bytes) -> str:
+
+    """ Return digest of request body without API key, so recordings do not keep and do not depend on it """
+
+    return hashlib.sha1(_API_KEY_PARAM.sub(b'', body)).hexdigest()
+
+
+def build_response(url: str, content: bytes, status_code: int = HTTP_OK, headers=None) -> 'requests.Response':
+
+    """
+    Build `requests.Response` of API request
+
+    .. note::
+        Request obj keeps method and url only, it is not prepared, which takes most of response building time.
+    """
+
+    import requests
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.encoding = 'utf-8'
+    response.url = url
+    if headers:
+        response.headers.update(headers)
+    request = response.request = requests.PreparedRequest()
+    request.method = 'POST'
+    request.url = url
+    return response
+
+
+def build_async_response(url: str, content: bytes, status_code: int = HTTP_OK, headers=None):
+
+    """ Build `httpx.Response` of API request """
+
+    if httpx is None:
+        raise ImportError('UniSender client error: Async transports require "httpx" package')
+    return httpx.Response(status_code, content=content, headers=headers, request=httpx.Request('POST', url))
+
+
+def _open_recording(path: str, mode: str):
+
+    """ Open JSON lines recording, gzip compressed if path ends with ".gz" """
+
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class DryRunRequest(object):
+
+    """ Request seen by `DryRunTransport`, params are parsed on first access """
+
+    __slots__ = ('method', 'data', 'headers', '_body', '_params')
+
+    def __init__(self, method: str, data, headers=None):
+        self.method = method
+        self.data = data
+        self.headers = headers
+        self._body = None
+        self._params = None
+
+    @property
+    def body(self) -> bytes:
+        if self._body is None:
+            self._body = get_request_body(self.data, self.headers)
+        return self._body
+
+    @property
+    def params(self) -> dict:
+        if self._params is None:
+            self._params = dict(parse_qsl(self.body.decode('utf-8'), keep_blank_values=True))
+        return self._params
+
+    def get_list(self, name: str) -> list:
+
+        """ Return values of `name[0]`, `name[1]`, ... params """
+
+        prefix = name + '['
+        return [val for key, val in self.params.items() if key.startswith(prefix)]
+
+    def count_rows(self) -> int:
+
+        """ Return number of `data` rows of import matrix without parsing body """
+
+        fields = self.body.count(b'field_names%5B')
+        cells = self.body.count(b'&data%5B') + self.body.startswith(b'data%5B')
+        return cells // fields if fields else 0
+
+
+class DryRunTransport(object):
+
+    """
+    Offline transport answering every API method with synthesised response of documented shape
+
+    .. note::
+        Pass it as client `session`, no request leaves the process. Lists and fields created by the client
+        are kept and returned by `getLists` / `getFields`, ids are sequential, times are `DRY_RUN_TIME`,
+        so the same flow gets the same responses. `requests` keeps number of calls by API method.
+        Usage example:
+            transport = DryRunTransport(latency=0.05)
+            client = SimpleClient(api_key, platform, session=transport)
+            client.create_email_campaign(recipients, email_data)
+            print(transport.requests)
+    """
+
+    def __init__(self, latency: float = 0.0, export_size: int = 0, campaign_status: str = 'completed'):
+
+        """
+        :param latency: float, seconds added to every response
+        :param export_size: int, number of contacts returned by `exportContacts`
+        :param campaign_status: str, status returned by `getCampaignStatus`
+        """
+
+        self.latency = latency
+        self.export_size = export_size
+        self.campaign_status = campaign_status
+        self.requests = {}
+        self.lists = {}
+        self.fields = {}
+        self._ids = 0
+        self._lock = threading.Lock()
+
+    def _next_id(self) -> int:
+        with self._lock:
+            self._ids += 1
+            return self._ids
+
+    def handle(self, url: str, data, headers=None) -> bytes:
+
+        """ Return JSON body of API response to request """
+
+        method = get_api_method(url)
+        with self._lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+        handler = getattr(self, f'api_{method}', None)
+        if handler is None:
+            payload = {'error': f'Unknown method "{method}"', 'code': 'unknown_method'}
+        else:
+            payload = {'result': handler(DryRunRequest(method, data, headers))}
+        return json.dumps(payload).encode('utf-8')
+
+    def post(self, url: str, data=None, headers=None, **kwargs) -> 'requests.Response':
+        content = self.handle(url, data, headers)
+        if self.latency:
+            time.sleep(self.latency)
+        return build_response(url, content)
+
+    def close(self) -> None:
+        pass
+
+    def api_getLists(self, request: DryRunRequest) -> list:
+        with self._lock:
+            return [{'id': list_id, 'title': title} for list_id, title in self.lists.items()]
+
+    def api_createList(self, request: DryRunRequest) -> dict:
+        list_id = self._next_id()
+        with self._lock:
+            self.lists[list_id] = request.params.get('title', f'list_{list_id}')
+        return {'id': list_id}
+
+    def api_updateList(self, request: DryRunRequest) -> dict:
+        params = request.params
+        with self._lock:
+            list_id = int(params.get('list_id', 0))
+            if list_id in self.lists and 'title' in params:
+                self.lists[list_id] = params['title']
+        return {}
+
+    def api_deleteList(self, request: DryRunRequest) -> dict:
+        with self._lock:
+            self.lists.pop(int(request.params.get('list_id', 0)), None)
+        return {}
+
+    def api_subscribe(self, request: DryRunRequest) -> dict:
+        return {'person_id': self._next_id()}
+
+    def api_exclude(self, request: DryRunRequest) -> dict:
+        return {}
+
+    def api_unsubscribe(self, request: DryRunRequest) -> dict:
+        return {}
+
+    def api_importContacts(self, request: DryRunRequest) -> dict:
+        rows = request.count_rows()
+        return {
+            'total': rows, 'inserted': rows, 'updated': 0, 'deleted': 0, 'new_emails': rows, 'invalid': 0, 'log': [],
+        }
+
+    def api_exportContacts(self, request: DryRunRequest) -> dict:
+        params = request.params
+        offset = int(params.get('offset', 0))
+        limit = int(params.get('limit', 5000))
+        field_names = request.get_list('field_names') or ['email']
+        return {
+            'field_names': field_names,
+            'data': [
+                [f'contact_{i}@example.com' if field == 'email' else f'{field}_{i}' for field in field_names]
+                for i in range(offset, min(self.export_size, offset + limit))
+            ],
+        }
+
+    def api_getTotalContactsCount(self, request: DryRunRequest) -> dict:
+        return {'total': self.export_size}
+
+    def api_getContactCount(self, request: DryRunRequest) -> dict:
+        return {'count': self.export_size}
+
+    def api_getContact(self, request: DryRunRequest) -> dict:
+        return {
+            'email': {
+                'email': request.params.get('email'), 'added_at': DRY_RUN_TIME,
+                'status': 'active', 'availability': 'available', 'last_send_datetime': None,
+                'last_delivery_datetime': None, 'last_read_datetime': None, 'last_click_datetime': None,
+                'rating': 0,
+            },
+            'lists': [],
+            'fields': {},
+        }
+
+    def api_getFields(self, request: DryRunRequest) -> list:
+        with self._lock:
+            return [dict(field, name=name) for name, field in self.fields.items()]
+
+    def api_createField(self, request: DryRunRequest) -> dict:
+        field_id = self._next_id()
+        name = request.params.get('name', f'field_{field_id}')
+        with self._lock:
+            self.fields[name] = {
+                'id': field_id, 'type': request.params.get('type', 'string'), 'is_visible': 1, 'view_pos': 1,
+            }
+        return {'id': field_id}
+
+    def api_updateField(self, request: DryRunRequest) -> dict:
+        return {'id': int(request.params.get('id', 0))}
+
+    def api_deleteField(self, request: DryRunRequest) -> dict:
+        field_id = int(request.params.get('id', 0))
+        with self._lock:
+            for name in [name for name, field in self.fields.items() if field['id'] == field_id]:
+                del self.fields[name]
+        return {}
+
+    def api_getTags(self, request: DryRunRequest) -> list:
+        return []
+
+    def api_deleteTag(self, request: DryRunRequest) -> dict:
+        return {}
+
+    def _get_message(self, request: DryRunRequest) -> dict:
+        params = request.params
+        return {
+            'id': int(params.get('id', 0)), 'sub_user_login': None, 'list_id': None, 'segment_id': None,
+            'created': DRY_RUN_TIME, 'updated': None, 'service_type': 'email', 'active_version_id': None,
+            'lang_code': 'en', 'sender_email': 'sender@example.com', 'sender_name': 'Sender',
+            'subject': 'Subject', 'body': '<html></html>', 'message_format': 'raw_html',
+        }
+
+    def api_createEmailMessage(self, request: DryRunRequest) -> dict:
+        return {'message_id': self._next_id()}
+
+    def api_updateEmailMessage(self, request: DryRunRequest) -> dict:
+        return {'message_id': int(request.params.get('id', 0))}
+
+    def api_deleteMessage(self, request: DryRunRequest) -> dict:
+        return {}
+
+    def api_sendEmail(self, request: DryRunRequest) -> list:
+        return [{'index': 0, 'email': request.params.get('email'), 'id': str(self._next_id())}]
+
+    def api_sendTestEmail(self, request: DryRunRequest) -> dict:
+        return {'message': 'The test letter has been sent'}
+
+    def api_checkEmail(self, request: DryRunRequest) -> dict:
+        return {'statuses': [
+            {'id': email_id, 'status': 'ok_delivered'}
+            for email_id in request.params.get('email_id', '').split(',') if email_id
+        ]}
+
+    def api_updateOptInEmail(self, request: DryRunRequest) -> dict:
+        return {}
+
+    def api_getMessages(self, request: DryRunRequest) -> list:
+        return []
+
+    def api_getMessage(self, request: DryRunRequest) -> list:
+        return [self._get_message(request)]
+
+    def api_listMessages(self, request: DryRunRequest) -> list:
+        return []
+
+    def api_getCheckedEmail(self, request: DryRunRequest) -> dict:
+        return {'login': 'dry_run', 'emails': []}
+
+    def api_getActualMessageVersion(self, request: DryRunRequest) -> dict:
+        message_id = int(request.params.get('message_id', 0))
+        return {'message_id': message_id, 'actual_version_id': message_id}
+
+    def api_getWebVersion(self, request: DryRunRequest) -> dict:
+        campaign_id = request.params.get('campaign_id')
+        return {'letter_id': campaign_id, 'web_letter_link': f'https://example.com/web_version/{campaign_id}'}
+
+    def api_createCampaign(self, request: DryRunRequest) -> dict:
+        return {'campaign_id': self._next_id(), 'status': 'scheduled', 'count': 0}
+
+    def api_cancelCampaign(self, request: DryRunRequest) -> dict:
+        return {}
+
+    def api_getCampaigns(self, request: DryRunRequest) -> list:
+        return []
+
+    def api_getCampaignStatus(self, request: DryRunRequest) -> dict:
+        return {'status': self.campaign_status, 'creation_time': DRY_RUN_TIME, 'start_time': DRY_RUN_TIME}
+
+    def api_getCampaignCommonStats(self, request: DryRunRequest) -> dict:
+        return {
+            'total': 0, 'sent': 0, 'delivered': 0, 'read_unique': 0, 'read_all': 0,
+            'clicked_unique': 0, 'clicked_all': 0, 'unsubscribed': 0, 'spam': 0,
+        }
+
+    def api_getCampaignDeliveryStats(self, request: DryRunRequest) -> dict:
+        return {'fields': ['email', 'send_result', 'last_update'], 'data': []}
+
+    def api_getVisitedLinks(self, request: DryRunRequest) -> dict:
+        return {'fields': ['email', 'url', 'request_time', 'ip', 'count'], 'data': []}
+
+    def api_createSmsMessage(self, request: DryRunRequest) -> dict:
+        return {'message_id': self._next_id()}
+
+    def api_sendSms(self, request: DryRunRequest) -> dict:
+        return {'currency': 'USD', 'price': 0.0, 'sms_id': self._next_id()}
+
+    def api_checkSms(self, request: DryRunRequest) -> dict:
+        return {'status': 'ok_delivered'}
+
+    def _get_template(self, template_id: int) -> dict:
+        return {
+            'id': template_id, 'sub_user_login': None, 'title': f'template_{template_id}', 'description': '',
+            'lang_code': 'en', 'subject': 'Subject', 'attachments': [], 'screenshot_url': None,
+            'created': DRY_RUN_TIME, 'updated': None, 'message_format': 'raw_html', 'type': 'user',
+            'body': '<html></html>', 'raw_body': None,
+        }
+
+    def api_createEmailTemplate(self, request: DryRunRequest) -> dict:
+        return {'template_id': self._next_id()}
+
+    def api_updateEmailTemplate(self, request: DryRunRequest) -> dict:
+        return {}
+
+    def api_deleteTemplate(self, request: DryRunRequest) -> dict:
+        return {}
+
+    def api_getTemplate(self, request: DryRunRequest) -> dict:
+        return self._get_template(int(request.params.get('template_id', 0)))
+
+    def api_getTemplates(self, request: DryRunRequest) -> list:
+        return []
+
+    def api_listTemplates(self, request: DryRunRequest) -> list:
+        return []
+
+    def api_validateSender(self, request: DryRunRequest) -> dict:
+        return {'message': 'Confirmation email has been sent'}
+
+    def api_register(self, request: DryRunRequest) -> dict:
+        return {'user_id': self._next_id()}
+
+    def api_checkUserExists(self, request: DryRunRequest) -> dict:
+        return {'login_exists': 0, 'email_exists': 0}
+
+    def api_getUserInfo(self, request: DryRunRequest) -> dict:
+        return {
+            'login': request.params.get('login', 'dry_run'), 'email': 'user@example.com', 'balance': 0,
+            'currency': 'USD', 'tariff_id': 0, 'emails_paid': 0, 'emails_used': 0, 'period_emails_paid': 0,
+            'period_emails_used': 0, 'reg_time': DRY_RUN_TIME,
+        }
+
+    def api_getUsers(self, request: DryRunRequest) -> list:
+        return []
+
+    def api_transferMoney(self, request: DryRunRequest) -> dict:
+        return {}
+
+    def api_getAvailableTariffs(self, request: DryRunRequest) -> list:
+        return []
+
+    def api_changeTariff(self, request: DryRunRequest) -> dict:
+        return {}
+
+    def api_setSenderDomain(self, request: DryRunRequest) -> dict:
+        return {'dkim': 'v=DKIM1; k=rsa; p=dry_run'}
+
+
+class AsyncDryRunTransport(DryRunTransport):
+
+    """ Offline transport for `AsyncClient`, see `DryRunTransport` """
+
+    async def post(self, url: str, content=None, headers=None, **kwargs):
+        body = self.handle(url, content, headers)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return build_async_response(url, body)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class RecordingTransport(object):
+
+    """
+    Transport sending requests by real session and recording responses to JSON lines file
+
+    .. note::
+        Every record keeps API method, digest of request body without API key (see `get_request_key`),
+        HTTP status, latency and response body, file is gzip compressed if path ends with ".gz".
+        Responses may contain contacts data, keep recordings private.
+        Usage example:
+            with RecordingTransport('campaign.jsonl.gz') as transport:
+                SimpleClient(api_key, platform, session=transport).create_email_campaign(recipients, email_data)
+            client = SimpleClient(api_key, platform, session=ReplayTransport('campaign.jsonl.gz'))
+    """
+
+    def __init__(self, path: str, session=None):
+
+        """
+        :param path: str, recording file path
+        :param session: None|object, transport sending requests, new `requests.Session` by default
+        """
+
+        self.path = path
+        self.records = 0
+        self._session = session
+        self._own_session = False
+        self._file = _open_recording(path, 'w')
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = self._create_session()
+            self._own_session = True
+        return self._session
+
+    @staticmethod
+    def _create_session():
+        import requests
+        return requests.Session()
+
+    def record(self, url: str, data, headers, response, latency: float) -> None:
+
+        """ Write request and response record """
+
+        record = {
+            'method': get_api_method(url),
+            'key': get_request_key(get_request_body(data, headers)),
+            'status': response.status_code,
+            'latency': round(latency, 6),
+            'content': response.content.decode('utf-8', 'replace'),
+        }
+        recorded_headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        if recorded_headers:
+            record['headers'] = recorded_headers
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self.records += 1
+
+    def post(self, url: str, data=None, headers=None, **kwargs):
+        started = time.perf_counter()
+        response = self.session.post(url, data=data, headers=headers, **kwargs)
+        self.record(url, data, headers, response, time.perf_counter() - started)
+        return response
+
+    def close(self) -> None:
+
+        """ Flush recording, close session created by transport """
+
+        with self._lock:
+            self._file.close()
+        if self._own_session:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AsyncRecordingTransport(RecordingTransport):
+
+    """ Recording transport for `AsyncClient`, sends requests by `httpx.AsyncClient`, see `RecordingTransport` """
+
+    @staticmethod
+    def _create_session():
+        if httpx is None:
+            raise ImportError('UniSender client error: Async transports require "httpx" package')
+        return httpx.AsyncClient()
+
+    async def post(self, url: str, content=None, headers=None, **kwargs):
+        started = time.perf_counter()
+        response = await self.session.post(url, content=content, headers=headers, **kwargs)
+        self.record(url, content, headers, response, time.perf_counter() - started)
+        return response
+
+    async def aclose(self) -> None:
+        with self._lock:
+            self._file.close()
+        if self._own_session:
+            await self._session.aclose()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+class ReplayTransport(object):
+
+    """
+    Offline transport serving responses recorded by `RecordingTransport`
+
+    .. note::
+        Request is matched by API method and request body digest, repeated identical requests (e.g. retries)
+        get recorded responses in order, the last one is repeated. Request without exact match
+        (e.g. with other campaign start time) gets the next recorded response of the same API method,
+        unless `strict` is set, `misses` counts such requests.
+        Responses are delayed by recorded latency multiplied by `latency_scale`.
+    """
+
+    ERROR_MESSAGES = {
+        'not_recorded': 'UniSender client error: No recorded response for "%s" request',
+    }
+
+    def __init__(self, path: str, latency_scale: float = 1.0, strict: bool = False):
+
+        """
+        :param path: str, recording file path
+        :param latency_scale: float, multiplier of recorded latencies, 0 to respond at once
+        :param strict: bool, raise Exception for requests without exact match
+        """
+
+        self.path = path
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.misses = 0
+        self._by_key = {}
+        self._by_method = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+        with _open_recording(path, 'r') as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                self._by_key.setdefault((record['method'], record['key']), []).append(record)
+                self._by_method.setdefault(record['method'], []).append(record)
+
+    def __len__(self):
+        return sum(len(records) for records in self._by_method.values())
+
+    def match(self, url: str, data, headers=None) -> dict:
+
+        """ Return recorded response record for request """
+
+        method = get_api_method(url)
+        key = (method, get_request_key(get_request_body(data, headers)))
+        with self._lock:
+            records = self._by_key.get(key)
+            if records is not None:
+                index = self._cursors.get(key, 0)
+                self._cursors[key] = index + 1
+                return records[min(index, len(records) - 1)]
+            records = self._by_method.get(method)
+            if records is None or self.strict:
+                raise Exception(self.ERROR_MESSAGES['not_recorded'] % method)
+            self.misses += 1
+            index = self._cursors.get(method, 0)
+            self._cursors[method] = index + 1
+            return records[index % len(records)]
+
+    def _get_delay(self, record: dict) -> float:
+        return record['latency'] * self.latency_scale
+
+    def post(self, url: str, data=None, headers=None, **kwargs) -> 'requests.Response':
+        record = self.match(url, data, headers)
+        delay = self._get_delay(record)
+        if delay > 0:
+            time.sleep(delay)
+        return build_response(url, record['content'].encode('utf-8'), record['status'], record.get('headers'))
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncReplayTransport(ReplayTransport):
+
+    """ Replay transport for `AsyncClient`, see `ReplayTransport` """
+
+    async def post(self, url: str, content=None, headers=None, **kwargs):
+        record = self.match(url, content, headers)
+        delay = self._get_delay(record)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return build_async_response(url, record['content'].encode('utf-8'), record['status'], record.get('headers'))
+
+    async def aclose(self) -> None:
+        pass
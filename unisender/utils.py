@@ -1,4 +1,8 @@
-import hashlib
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+
+_FEED_PARTS = 4096
 
 
 def get_string_repr(obj) -> str:
@@ -32,10 +36,194 @@ def get_unique_hash(obj) -> int:
 
     :param obj: list|dict|str, given obj
     :return: int
+
+    .. note::
+        Result is the same as hash of `get_string_repr(obj)`, but values are fed to hasher by blocks
+        without building the whole string. Prefer `get_fingerprint` for new code: this hash
+        depends on dict keys order and collides for objects with equal concatenated values.
+    """
+
+    import hashlib
+    hasher = hashlib.sha1()
+    feeder = _HashFeeder(hasher)
+    _feed_string_repr(obj, feeder.write)
+    feeder.flush()
+    return int(hasher.hexdigest(), 16) % 10 ** 10
+
+
+def _feed_string_repr(obj, write) -> None:
+
+    """ Write `get_string_repr(obj)` by pieces """
+
+    if isinstance(obj, list):
+        for elem in obj:
+            _feed_string_repr(elem, write)
+    elif isinstance(obj, dict):
+        for elem in obj.values():
+            if isinstance(elem, str):
+                write(elem)
+            else:
+                _feed_string_repr(elem, write)
+    else:
+        try:
+            write(str(obj))
+        except Exception:
+            pass
+
+
+class _HashFeeder(object):
+
+    """ Collect small text pieces and feed them to hasher by large UTF-8 encoded blocks """
+
+    __slots__ = ('hasher', 'parts', 'append')
+
+    def __init__(self, hasher):
+        self.hasher = hasher
+        self.parts = []
+        self.append = self.parts.append
+
+    def write(self, data: str) -> None:
+        self.append(data)
+        if len(self.parts) >= _FEED_PARTS:
+            self.flush()
+
+    def flush(self) -> None:
+        self.hasher.update(''.join(self.parts).encode('utf-8', 'surrogatepass'))
+        self.parts.clear()
+
+
+def _encode_key(key) -> str:
+    if isinstance(key, str):
+        return f'{len(key)}:{key}'
+    parts = []
+    _encode(key, parts.append)
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=256)
+def _get_key_order(keys: tuple, key_types: tuple) -> tuple:
+
+    """
+    Return (encoded key, key) pairs ordered by encoded key, cached for dicts of the same shape
+
+    .. note::
+        Equal keys of different types (1, 1.0, True) are encoded differently,
+        so key types are a part of cache key.
     """
 
-    hash_string = get_string_repr(obj).encode('utf-8')
-    return int(hashlib.sha1(hash_string).hexdigest(), 16) % 10 ** 10
+    return tuple(sorted((_encode_key(key), key) for key in keys))
+
+
+def _encode(obj, write) -> None:
+
+    """
+    Write unambiguous type-tagged text encoding of obj
+
+    .. note::
+        Strings are length-prefixed, containers are delimited,
+        dict items are ordered by encoded key, so equal objects always give equal encoding
+        and different objects never do: {'a': '12'} and {'a': '1', 'b': '2'} differ.
+        Lists, tuples and other iterables (generators too) are encoded as lists.
+    """
+
+    if isinstance(obj, str):
+        write(f'{len(obj)}:{obj}')
+    elif isinstance(obj, dict):
+        write('d')
+        for encoded_key, key in _get_key_order(tuple(obj), tuple(map(type, obj))):
+            val = obj[key]
+            if isinstance(val, str):
+                write(f'{encoded_key}{len(val)}:{val}')
+            else:
+                write(encoded_key)
+                _encode(val, write)
+        write('e')
+    elif isinstance(obj, bool):
+        write('b1' if obj else 'b0')
+    elif isinstance(obj, int):
+        write(f'i{obj}e')
+    elif obj is None:
+        write('n')
+    elif isinstance(obj, (bytes, bytearray)):
+        write(f'y{len(obj)}:{obj.hex()}')
+    elif hasattr(obj, '__iter__'):
+        write('l')
+        for elem in obj:
+            _encode(elem, write)
+        write('e')
+    else:
+        data = f'{type(obj).__name__}:{obj}'
+        write(f'o{len(data)}:{data}')
+
+
+def get_fingerprint(obj, algorithm: str = 'sha1') -> str:
+
+    """
+    Create stable fingerprint of obj, feeding hasher incrementally
+
+    :param obj: list|dict|str|generator|any, given obj, generators are consumed without materialising
+    :param algorithm: str, hashlib algorithm name
+    :return: str, hex digest
+
+    .. note::
+        Unlike `get_unique_hash` it does not depend on dict keys order
+        and does not collide for objects with equal concatenated values.
+    """
+
+    return _get_hasher(obj, algorithm).hexdigest()
+
+
+def _get_hasher(obj, algorithm: str):
+    import hashlib
+    hasher = hashlib.new(algorithm)
+    feeder = _HashFeeder(hasher)
+    _encode(obj, feeder.write)
+    feeder.flush()
+    return hasher
+
+
+def _chunk_digest(chunk: list, algorithm: str) -> bytes:
+    return _get_hasher(chunk, algorithm).digest()
+
+
+def get_chunked_fingerprint(iterable, chunk_size: int = 10000, executor=None, algorithm: str = 'sha1') -> str:
+
+    """
+    Create stable fingerprint of iterable items, hashing chunks independently
+
+    :param iterable: any iterable or generator, e.g. recipients list
+    :param chunk_size: int, number of items per chunk, result depends on it
+    :param executor: None|concurrent.futures.Executor, hash chunks in parallel,
+                     `ProcessPoolExecutor` gives real parallelism for large chunks
+    :param algorithm: str, hashlib algorithm name
+    :return: str, hex digest
+
+    .. note::
+        Result is the hash of ordered chunk digests, so it is the same for serial and parallel computation
+        with the same `chunk_size`, but differs from `get_fingerprint` of the same items.
+        Only a few chunks per executor worker are kept in memory.
+        `ProcessPoolExecutor` pickles every chunk, so it pays off for large items only,
+        small recipient dicts are hashed faster serially.
+    """
+
+    import hashlib
+    hasher = hashlib.new(algorithm)
+    hasher.update(b'c%d:' % chunk_size)
+    chunks = iter_chunks(iterable, chunk_size)
+    if executor is None:
+        for chunk in chunks:
+            hasher.update(_chunk_digest(chunk, algorithm))
+        return hasher.hexdigest()
+
+    window = max(2, getattr(executor, '_max_workers', 1) * 2)
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(_chunk_digest, chunk, algorithm))
+        if len(pending) >= window:
+            hasher.update(pending.popleft().result())
+    while pending:
+        hasher.update(pending.popleft().result())
+    return hasher.hexdigest()
 
 
 def to_camel_case(snake_case_str: str) -> str:
@@ -44,3 +232,20 @@ def to_camel_case(snake_case_str: str) -> str:
 
     parts = snake_case_str.split('_')
     return parts[0] + ''.join(w.capitalize() or '_' for w in parts[1:])
+
+
+def iter_chunks(iterable, size: int):
+
+    """
+    Split iterable to lists of `size` elements without materialising it
+
+    :param iterable: any iterable or generator
+    :param size: int, max chunk size
+    :return: generator of lists
+    """
+
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))